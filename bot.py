@@ -11,9 +11,16 @@ from dotenv import load_dotenv
 import asyncio
 
 from src.commands import fish, balance, sell, inventory, upgrade, rod, shop, buy, leaderboard
-from src.commands import setemojis, setcooldown, setrates
-from src.commands import chop, axe
-from src.lib.config import load_all_configs
+from src.commands import setemojis, setcooldown, setrates, botstats, economyreport
+from src.commands import chop, axe, expedition
+from src.lib.config import get_config_snapshot, get_config_watcher
+from src.lib.persistence import get_user_store
+from src.lib.executor import shutdown_scan_pool
+from src.lib.replay import get_command_recorder, close_command_recorder
+from src.lib.expeditions import get_expedition_scheduler, rebuild_expeditions
+from src.lib.leaderboards import (
+    rebuild_leaderboard_index, add_guild_member, seed_guild_members, remove_guild_member, remove_guild
+)
 
 # Load environment variables
 load_dotenv()
@@ -30,19 +37,15 @@ intents.members = True
 
 bot = commands.Bot(command_prefix='!', intents=intents)
 
-# Load all configurations on startup
 @bot.event
 async def on_ready():
     """Bot startup event"""
     print(f'🎣 {bot.user} is now online!')
     print(f'📊 Connected to {len(bot.guilds)} guild(s)')
     
-    # Load configurations
-    try:
-        load_all_configs()
-        print('✅ Configurations loaded successfully')
-    except Exception as e:
-        print(f'⚠️ Error loading configurations: {e}')
+    # Seed per-guild leaderboards with the players among cached members
+    for guild in bot.guilds:
+        seed_guild_members(guild.id, (member.id for member in guild.members))
     
     # Sync slash commands
     try:
@@ -51,6 +54,27 @@ async def on_ready():
     except Exception as e:
         print(f'❌ Failed to sync commands: {e}')
 
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    """Track which guilds players use the bot in, for per-guild leaderboards"""
+    if interaction.guild_id is not None:
+        add_guild_member(interaction.guild_id, interaction.user.id)
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    """A returning player joined a guild"""
+    seed_guild_members(member.guild.id, (member.id,))
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    """A member left a guild"""
+    remove_guild_member(member.guild.id, member.id)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    """The bot was removed from a guild"""
+    remove_guild(guild.id)
+
 @bot.event
 async def on_command_error(ctx, error):
     """Global error handler"""
@@ -72,6 +96,7 @@ async def setup_commands():
     await bot.add_cog(rod.Rod(bot))
     await bot.add_cog(chop.Chop(bot))
     await bot.add_cog(axe.Axe(bot))
+    await bot.add_cog(expedition.Expedition(bot))
     await bot.add_cog(shop.Shop(bot))
     await bot.add_cog(buy.Buy(bot))
     await bot.add_cog(leaderboard.Leaderboard(bot))
@@ -80,13 +105,36 @@ async def setup_commands():
     await bot.add_cog(setemojis.SetEmojis(bot))
     await bot.add_cog(setcooldown.SetCooldown(bot))
     await bot.add_cog(setrates.SetRates(bot))
+    await bot.add_cog(botstats.BotStats(bot))
+    await bot.add_cog(economyreport.EconomyReport(bot))
 
 # Main execution
 async def main():
     """Main async function to run the bot"""
     async with bot:
         await setup_commands()
-        await bot.start(TOKEN)
+        
+        # Recover from the journal and start the write-back user store
+        user_store = get_user_store()
+        await user_store.open()
+        user_store.recorder = get_command_recorder()
+        index = await rebuild_leaderboard_index()
+        print(f'✅ Ranked {len(index)} user(s) for the leaderboards')
+        print(f'✅ Resumed {await rebuild_expeditions()} expedition(s)')
+        scheduler = get_expedition_scheduler()
+        scheduler.start()
+        # Configurations were loaded on import; reload them whenever the files change
+        watcher = get_config_watcher()
+        watcher.start()
+        print(f'✅ Watching configurations (version {get_config_snapshot().version})')
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await watcher.close()
+            await scheduler.close()
+            await user_store.close()
+            close_command_recorder()
+            shutdown_scan_pool()
 
 if __name__ == '__main__':
     try:
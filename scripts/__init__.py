@@ -0,0 +1,3 @@
+"""
+Maintenance scripts for the Discord Fishing Bot
+"""
@@ -0,0 +1,65 @@
+"""
+Benchmark user record serialization formats
+
+Usage: python -m scripts.bench_serialization [--iterations 2000]
+Reports bytes on disk and encode/decode time per record for each format,
+over records with empty, typical and large inventories.
+"""
+
+import argparse
+import random
+import timeit
+
+from src.lib import persistence
+from src.lib.fishing import FISH_TYPES
+from src.lib.woodcutting import LOG_TYPES
+from src.lib.persistence import SERIALIZERS, decode_payload, _default_user_data
+
+def build_record(user_id: int, item_kinds: int, rng: random.Random) -> dict:
+    """Build a user record holding up to item_kinds stacks per activity"""
+    user_data = _default_user_data(user_id, f"Player{user_id}")
+    user_data['currency'] = rng.randint(0, 250_000)
+    user_data['stats'].update({
+        'totalCatches': rng.randint(0, 20_000),
+        'totalChops': rng.randint(0, 20_000),
+        'lastFishTimestamp': 1_764_000_000 + rng.randint(0, 100_000),
+        'lastChopTimestamp': 1_764_000_000 + rng.randint(0, 100_000)
+    })
+
+    fish = [(rarity, name) for rarity, names in FISH_TYPES.items() for name in names]
+    logs = [(rarity, name) for rarity, names in LOG_TYPES.items() for name in names]
+    for rarity, name in rng.sample(fish, min(item_kinds, len(fish))):
+        user_data['inventory'][rarity][name] = rng.randint(1, 500)
+    for rarity, name in rng.sample(logs, min(item_kinds, len(logs))):
+        user_data['inventory']['woodcutting'].setdefault(rarity, {})[name] = rng.randint(1, 500)
+    return user_data
+
+def bench(iterations: int):
+    rng = random.Random(42)
+    profiles = {
+        'new user': build_record(1062499849142022234, 0, rng),
+        'typical': build_record(881533862977609728, 5, rng),
+        'full inventory': build_record(123456789012345678, 10, rng)
+    }
+
+    print(f"orjson: {'yes' if persistence.orjson else 'no'}, msgpack: {'yes' if persistence.msgpack else 'no (struct layout)'}")
+    print(f"{'profile':<16} {'format':<8} {'bytes':>7} {'encode µs':>10} {'decode µs':>10}")
+    for profile, record in profiles.items():
+        for name, serializer_class in SERIALIZERS.items():
+            serializer = serializer_class()
+            payload = serializer.dumps(record)
+            assert decode_payload(payload) == record
+
+            encode = timeit.timeit(lambda: serializer.dumps(record), number=iterations)
+            decode = timeit.timeit(lambda: decode_payload(payload), number=iterations)
+            print(f"{profile:<16} {name:<8} {len(payload):>7} "
+                  f"{encode / iterations * 1e6:>10.1f} {decode / iterations * 1e6:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark user record serialization")
+    parser.add_argument('--iterations', type=int, default=2000, help="Timed runs per format")
+    args = parser.parse_args()
+    bench(args.iterations)
+
+if __name__ == '__main__':
+    main()
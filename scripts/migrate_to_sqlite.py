@@ -0,0 +1,35 @@
+"""
+One-shot migration of per-user JSON files into the SQLite backend
+
+Usage: python -m scripts.migrate_to_sqlite [--db data/users.db] [--source DIR ...]
+Afterwards set "storageBackend": "sqlite" in config/settings.json.
+"""
+
+import argparse
+import time
+
+from src.lib.config import get_sqlite_path
+from src.lib.persistence import (
+    SQLiteBackend, migrate_json_files, resolve_project_path, LEGACY_DATA_DIR, DATA_DIR
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import user JSON files into SQLite")
+    parser.add_argument('--db', default=get_sqlite_path(), help="SQLite database path")
+    parser.add_argument('--source', action='append', help="Directory of <user_id>.json files (repeatable)")
+    parser.add_argument('--batch-size', type=int, default=500, help="Records per transaction")
+    args = parser.parse_args()
+
+    source_dirs = args.source or [LEGACY_DATA_DIR, DATA_DIR]
+    backend = SQLiteBackend(resolve_project_path(args.db))
+
+    start = time.perf_counter()
+    try:
+        imported = migrate_json_files(backend, source_dirs, args.batch_size)
+    finally:
+        backend.close()
+
+    print(f"Imported {imported} user(s) into {args.db} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
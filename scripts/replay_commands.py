@@ -0,0 +1,30 @@
+"""
+Replay a recorded command log and check it reproduces the same outcomes
+
+Usage: python -m scripts.replay_commands data/commands.jsonl
+Record a log by setting commandLogPath in settings.json (and rngSeed for
+streams that are reproducible from fresh records too). Run with the rates
+and settings the log was recorded with. Exits non-zero on any mismatch.
+"""
+
+import argparse
+import sys
+import time
+
+from src.lib.replay import replay_commands
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a command log deterministically")
+    parser.add_argument('path', help="Command log written with commandLogPath")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = replay_commands(args.path)
+    for mismatch in result.mismatches:
+        print(mismatch)
+    print(f"Replayed {result.commands} command(s) for {result.users} user(s) in "
+          f"{time.perf_counter() - start:.2f}s: {len(result.mismatches)} mismatch(es)")
+    sys.exit(1 if result.mismatches else 0)
+
+if __name__ == '__main__':
+    main()
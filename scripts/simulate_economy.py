@@ -0,0 +1,233 @@
+"""
+Monte-Carlo economy simulator for balancing rates.json and costs.json
+
+Usage: python -m scripts.simulate_economy [--players 1000] [--days 30] [--workers 4]
+                                          [--strategies grinder casual] [--seed 1]
+Simulates populations of players following fixed strategies with the bot's
+own roll, value, price, cost and cooldown rules, and reports how long each
+rod/axe tier takes, where currency ends up and how fast the money supply grows.
+Install NumPy for large runs: batches are then drawn in O(outcomes) per hour.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.lib.config import get_fish_cooldown, get_wood_cooldown
+from src.lib.economy import (
+    ROD_TIERS, AXE_TIERS, get_next_rod_tier, get_next_axe_tier, get_upgrade_cost
+)
+from src.lib.fishing import roll_catches
+from src.lib.prices import get_item_price
+from src.lib.woodcutting import roll_harvests
+
+class Strategy(NamedTuple):
+    """How a simulated player spends their time and money"""
+    fish_hours: int  # hours per day spent fishing
+    chop_hours: int  # hours per day spent chopping
+    cadence: float  # fraction of the cooldown-limited casts actually made
+    buy_policy: str  # 'tiers' first, 'upgrades' first, 'cheapest' first or 'none'
+    sells: bool  # sells the inventory at costs.json prices after each hour
+
+STRATEGIES: Dict[str, Strategy] = {
+    'casual': Strategy(fish_hours=1, chop_hours=0, cadence=0.5, buy_policy='tiers', sells=True),
+    'grinder': Strategy(fish_hours=4, chop_hours=4, cadence=1.0, buy_policy='cheapest', sells=True),
+    'lumberjack': Strategy(fish_hours=0, chop_hours=2, cadence=0.8, buy_policy='upgrades', sells=True),
+    'hoarder': Strategy(fish_hours=2, chop_hours=0, cadence=0.8, buy_policy='tiers', sells=False),
+}
+
+class ChunkResult(NamedTuple):
+    """What a worker reports for a chunk of players"""
+    rod_days: List[List[int]]  # per rod tier, the day each player reached it
+    axe_days: List[List[int]]
+    final_currency: List[int]
+    supply: List[int]  # per day, currency plus held inventory value of the chunk
+    minted: List[int]  # per day, currency created by catches, chops and sales
+
+class _Player:
+    __slots__ = ('currency', 'held', 'rod', 'axe', 'upgrades')
+
+    def __init__(self):
+        self.currency = 0
+        self.held = 0  # sell value of the unsold inventory
+        self.rod = ROD_TIERS[0]
+        self.axe = AXE_TIERS[0]
+        self.upgrades = {'hookSharpness': 0, 'lineStrength': 0, 'bladeSharpness': 0, 'handleStrength': 0}
+
+def _sell_value(category: str, counts: Dict[Tuple[str, str], int]) -> int:
+    return sum(get_item_price(category, item_type) * count for (_, item_type), count in counts.items())
+
+def _purchases(player: _Player, strategy: Strategy) -> List[Tuple[int, int, str, str]]:
+    """Affordable-or-not next purchases as (priority, cost, kind, key)"""
+    options = []
+    if strategy.fish_hours:
+        tier, cost = get_next_rod_tier(player.rod)
+        if tier:
+            options.append((cost, 'rod', tier))
+        for key in ('hookSharpness', 'lineStrength'):
+            cost = get_upgrade_cost(key, player.upgrades[key])
+            if cost is not None:
+                options.append((cost, 'upgrade', key))
+    if strategy.chop_hours:
+        tier, cost = get_next_axe_tier(player.axe)
+        if tier:
+            options.append((cost, 'axe', tier))
+        for key in ('bladeSharpness', 'handleStrength'):
+            cost = get_upgrade_cost(key, player.upgrades[key])
+            if cost is not None:
+                options.append((cost, 'upgrade', key))
+
+    if strategy.buy_policy == 'tiers':
+        rank = lambda kind: kind == 'upgrade'
+    elif strategy.buy_policy == 'upgrades':
+        rank = lambda kind: kind != 'upgrade'
+    else:
+        rank = lambda kind: 0
+    return sorted((rank(kind), cost, kind, key) for cost, kind, key in options)
+
+def _spend(player: _Player, strategy: Strategy) -> List[Tuple[str, str]]:
+    """Buy in policy order until the next purchase is unaffordable, returns the (kind, key) bought"""
+    bought = []
+    if strategy.buy_policy == 'none':
+        return bought
+    while True:
+        options = _purchases(player, strategy)
+        if not options or options[0][1] > player.currency:
+            return bought
+        _, cost, kind, key = options[0]
+        player.currency -= cost
+        if kind == 'rod':
+            player.rod = key
+        elif kind == 'axe':
+            player.axe = key
+        else:
+            player.upgrades[key] += 1
+        bought.append((kind, key))
+
+def _simulate_chunk(strategy: Strategy, players: int, days: int, seed: int) -> ChunkResult:
+    """Simulate a chunk of players with one strategy (runs in a worker process)"""
+    rng = random.Random(seed)
+    fish_casts = int(3600 / max(get_fish_cooldown(), 1) * strategy.cadence)
+    chop_swings = int(3600 / max(get_wood_cooldown(), 1) * strategy.cadence)
+
+    rod_days = [[] for _ in ROD_TIERS]
+    axe_days = [[] for _ in AXE_TIERS]
+    supply = [0] * days
+    minted = [0] * days
+    final_currency = []
+
+    for _ in range(players):
+        player = _Player()
+        rod_days[0].append(0)
+        axe_days[0].append(0)
+        for day in range(days):
+            hours = [('fish', fish_casts)] * strategy.fish_hours + [('chop', chop_swings)] * strategy.chop_hours
+            for activity, n in hours:
+                if activity == 'fish':
+                    batch = roll_catches(
+                        player.rod, player.upgrades['hookSharpness'], player.upgrades['lineStrength'], n, rng
+                    )
+                    held = _sell_value('fish', batch.counts)
+                else:
+                    batch = roll_harvests(
+                        player.axe, player.upgrades['bladeSharpness'], player.upgrades['handleStrength'], n, rng
+                    )
+                    held = _sell_value('logs', batch.counts)
+
+                # Like /fish and /chop, a catch pays out and also lands in the inventory
+                player.currency += batch.value
+                minted[day] += batch.value
+                if strategy.sells:
+                    player.currency += held
+                    minted[day] += held
+                else:
+                    player.held += held
+
+                for kind, key in _spend(player, strategy):
+                    if kind == 'rod':
+                        rod_days[ROD_TIERS.index(key)].append(day + 1)
+                    elif kind == 'axe':
+                        axe_days[AXE_TIERS.index(key)].append(day + 1)
+            supply[day] += player.currency + player.held
+        final_currency.append(player.currency)
+
+    return ChunkResult(rod_days, axe_days, final_currency, supply, minted)
+
+def _merge(results: List[ChunkResult]) -> ChunkResult:
+    merged = ChunkResult(
+        [[] for _ in ROD_TIERS], [[] for _ in AXE_TIERS], [],
+        [0] * len(results[0].supply), [0] * len(results[0].minted)
+    )
+    for result in results:
+        for merged_days, days in zip(merged.rod_days + merged.axe_days, result.rod_days + result.axe_days):
+            merged_days.extend(days)
+        merged.final_currency.extend(result.final_currency)
+        for day, value in enumerate(result.supply):
+            merged.supply[day] += value
+        for day, value in enumerate(result.minted):
+            merged.minted[day] += value
+    return merged
+
+def _percentile(sorted_values: List[int], fraction: float) -> Optional[int]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+def report(name: str, strategy: Strategy, result: ChunkResult, players: int):
+    print(f"\n== {name}: {strategy.fish_hours}h fishing, {strategy.chop_hours}h chopping, "
+          f"cadence {strategy.cadence:.0%}, buys {strategy.buy_policy}, "
+          f"{'sells' if strategy.sells else 'holds'} inventory ==")
+
+    print(f"{'Tier':<20} {'Reached':>8} {'p50 day':>8} {'p90 day':>8}")
+    for tiers, reached in ((ROD_TIERS, result.rod_days), (AXE_TIERS, result.axe_days)):
+        for tier, days in zip(tiers[1:], reached[1:]):
+            if not days:
+                continue
+            days = sorted(days)
+            print(f"{tier:<20} {len(days) / players:>8.0%} {_percentile(days, 0.5):>8} {_percentile(days, 0.9):>8}")
+
+    currency = sorted(result.final_currency)
+    print("Final currency: " + ", ".join(
+        f"p{int(fraction * 100)} {_percentile(currency, fraction):,}" for fraction in (0.1, 0.5, 0.9, 0.99)
+    ) + f", max {currency[-1]:,}")
+
+    print(f"{'Day':>5} {'Supply/player':>14} {'Minted/player':>14} {'Growth':>8}")
+    days = len(result.supply)
+    step = max(days // 10, 1)
+    for day in list(range(0, days, step)) + ([days - 1] if (days - 1) % step else []):
+        previous = result.supply[day - 1] if day else 0
+        growth = f"{result.supply[day] / previous - 1:>8.1%}" if previous else f"{'-':>8}"
+        print(f"{day + 1:>5} {result.supply[day] // players:>14,} {result.minted[day] // players:>14,} {growth}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the economy under the current rates and costs")
+    parser.add_argument('--players', type=int, default=1000, help="Players per strategy")
+    parser.add_argument('--days', type=int, default=30, help="Days of play to simulate")
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=sorted(STRATEGIES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--chunk-size', type=int, default=100, help="Players per worker task")
+    parser.add_argument('--seed', type=int, default=1, help="Base seed; the same seed gives the same report")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for index, name in enumerate(args.strategies):
+            chunks = []
+            for offset in range(0, args.players, args.chunk_size):
+                players = min(args.chunk_size, args.players - offset)
+                seed = args.seed * 1_000_003 + index * 10_007 + offset
+                chunks.append(pool.submit(_simulate_chunk, STRATEGIES[name], players, args.days, seed))
+            futures[name] = chunks
+
+        for name, chunks in futures.items():
+            report(name, STRATEGIES[name], _merge([chunk.result() for chunk in chunks]), args.players)
+
+    player_days = args.players * args.days * len(args.strategies)
+    print(f"\nSimulated {player_days:,} player-days in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
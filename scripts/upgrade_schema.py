@@ -0,0 +1,35 @@
+"""
+Offline upgrade of every stored user record to the current schema version
+
+Usage: python -m scripts.upgrade_schema [--workers 4] [--batch-size 500]
+Run it while the bot is stopped. The bot also upgrades records lazily on first
+read, so this is only needed to avoid paying that cost during play.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.lib.persistence import get_backend
+from src.lib.schema import SCHEMA_VERSION
+
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade stored user records to the current schema")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--batch-size', type=int, default=500, help="Records per worker task")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        backend = get_backend()
+        try:
+            scanned, upgraded = backend.upgrade_all(pool, args.batch_size)
+        finally:
+            backend.close()
+
+    print(f"Upgraded {upgraded} of {scanned} user(s) in the {backend.name} backend to schema "
+          f"v{SCHEMA_VERSION} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
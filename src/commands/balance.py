@@ -38,6 +38,15 @@ class Balance(commands.Cog):
             inline=True
         )
         
+        # Running totals kept on the record, so no inventory scan
+        fish = user_data['inventoryStats']['fish']
+        logs = user_data['inventoryStats']['logs']
+        embed.add_field(
+            name="Inventory",
+            value=f"{fish['items']:,} fish · {logs['items']:,} logs\nWorth {format_currency(user_data['inventoryValue'])}",
+            inline=False
+        )
+        
         await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
@@ -0,0 +1,52 @@
+"""
+/botstats command - Admin command to view operational metrics
+"""
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from src.lib.validation import require_admin
+from src.lib.metrics import get_counters, hit_rate
+
+class BotStats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="botstats", description="[ADMIN] View bot performance metrics")
+    async def botstats(self, interaction: discord.Interaction):
+        """Bot stats admin command"""
+        if not await require_admin(interaction):
+            return
+        
+        counters = get_counters()
+        embed = discord.Embed(
+            title="📊 Bot Metrics",
+            color=0x3498db
+        )
+        
+        # One hit-rate field per cache
+        caches = sorted({name.rsplit('.', 1)[0] for name in counters if name.endswith(('.hits', '.misses'))})
+        for cache in caches:
+            hits = counters.get(f"{cache}.hits", 0)
+            misses = counters.get(f"{cache}.misses", 0)
+            embed.add_field(
+                name=cache,
+                value=f"**{hit_rate(cache):.1%}** hit rate\n{hits:,} hits / {misses:,} misses",
+                inline=True
+            )
+        
+        others = [name for name in sorted(counters) if not name.endswith(('.hits', '.misses'))]
+        if others:
+            embed.add_field(
+                name="Counters",
+                value="\n".join(f"{name}: **{counters[name]:,}**" for name in others),
+                inline=False
+            )
+        
+        if not embed.fields:
+            embed.description = "No metrics recorded yet."
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(BotStats(bot))
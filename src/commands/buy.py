@@ -5,8 +5,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from src.lib.persistence import load_user_data, save_user_data
-from src.lib.economy import get_shop_items, get_upgrade_cost
+from src.lib.persistence import user_transaction, record_event
+from src.lib.economy import get_shop_items, get_upgrade_cost, apply_purchase
 from src.lib.emojis import format_currency
 
 # Woodcutting upgrades (from shop.py)
@@ -34,8 +34,6 @@ class Buy(commands.Cog):
         user_id = interaction.user.id
         username = interaction.user.display_name
         
-        user_data = await load_user_data(user_id, username)
-        
         # Normalize upgrade name
         upgrade = upgrade.lower().replace(' ', '').replace('_', '').replace('-', '')
         
@@ -65,6 +63,17 @@ class Buy(commands.Cog):
         
         # Get upgrade info
         item_info = all_shop_items[upgrade_key]
+        
+        async with user_transaction(user_id, username) as user_data:
+            embed, ephemeral = self._purchase(user_data, upgrade_key, item_info)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
+    
+    def _purchase(self, user_data: dict, upgrade_key: str, item_info: dict):
+        """
+        Apply a purchase to the user's record
+        Returns (embed, ephemeral)
+        """
         current_level = user_data['upgrades'].get(upgrade_key, 0)
         cost = get_upgrade_cost(upgrade_key, current_level)
         
@@ -74,8 +83,7 @@ class Buy(commands.Cog):
                 description=f"Your {item_info['name']} is already at maximum level!",
                 color=0x95a5a6
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Check if user can afford
         if user_data['currency'] < cost:
@@ -84,15 +92,11 @@ class Buy(commands.Cog):
                 description=f"You need {format_currency(cost)} to upgrade {item_info['name']}.\nYour balance: {format_currency(user_data['currency'])}",
                 color=0xe74c3c
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Perform purchase
-        user_data['currency'] -= cost
-        user_data['upgrades'].setdefault(upgrade_key, 0)
-        user_data['upgrades'][upgrade_key] += 1
-        
-        await save_user_data(user_id, user_data)
+        apply_purchase(user_data, upgrade_key, cost)
+        record_event(user_data['user_id'], 'buy', upgrade=upgrade_key, cost=cost)
         
         # Success message
         new_level = current_level + 1
@@ -112,7 +116,7 @@ class Buy(commands.Cog):
             inline=False
         )
         
-        await interaction.response.send_message(embed=embed)
+        return embed, False
 
 async def setup(bot):
     await bot.add_cog(Buy(bot))
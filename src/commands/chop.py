@@ -5,44 +5,110 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from src.lib.persistence import load_user_data, save_user_data
-from src.lib.woodcutting import attempt_chop
+from src.lib.persistence import user_transaction, record_event
+from src.lib.cooldowns import get_cooldown_index
+from src.lib.catalog import get_catalog
+from src.lib.woodcutting import attempt_chop, attempt_chop_batch
 from src.lib.emojis import get_log_emoji, get_axe_emoji, get_rarity_color, format_currency
 
+def cooldown_embed(remaining: int) -> discord.Embed:
+    """Tell the player how long until they can chop again"""
+    minutes = remaining // 60
+    seconds = remaining % 60
+    return discord.Embed(
+        title="<:deny:1444147699699023954> On Cooldown",
+        description=f"Your axe needs a rest!\nTry again in **{minutes}m {seconds}s**",
+        color=0x95a5a6
+    )
+
+def batch_embed(result: dict, axe_emoji: str, axe_name: str) -> discord.Embed:
+    """Summarize a multi-swing in one message"""
+    catalog = get_catalog()
+    harvested = sorted(
+        (catalog.lookup('logs', rarity, log_type), count) for rarity, log_type, count in result['items']
+    )
+    description = f"You swing your {axe_emoji} **{axe_name}** {result['swings']} times and harvested:\n\n"
+    description += "\n".join(
+        f"{item.emoji} **{item.display_name}** ({item.rarity}) x{count}" for item, count in harvested
+    )
+    description += f"\n\n{format_currency(result['value'])}"
+    if result['bites']:
+        description += f"\n*{result['bites']} Timber Bite{'s' if result['bites'] != 1 else ''} doubled those rewards!*"
+    if result['banked']:
+        description += f"\n\nSwings still banked: **{result['banked']}**"
+
+    best = harvested[-1][0].rarity if harvested else 'Common'
+    return discord.Embed(
+        title="<:confirm:1444147698386079875> Woodcutting Success!",
+        description=description,
+        color=get_rarity_color(best)
+    )
+
 class Chop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
     @app_commands.command(name="chop", description="Swing your axe and harvest logs!")
-    async def chop(self, interaction: discord.Interaction):
+    @app_commands.describe(swings="Banked swings to spend at once (defaults to 1)")
+    async def chop(self, interaction: discord.Interaction, swings: app_commands.Range[int, 1, 100] = 1):
         """Chop command"""
+        # Turn players on cooldown away before touching storage
+        remaining = get_cooldown_index().remaining(interaction.user.id, 'chop')
+        if remaining:
+            await interaction.response.send_message(embed=cooldown_embed(remaining), ephemeral=True)
+            return
+
         await interaction.response.defer()
         try:
             user_id = interaction.user.id
             username = interaction.user.display_name
             
-            # Load user data
-            user_data = await load_user_data(user_id, username)
-            
-            # Ensure lastChopTimestamp exists for new users
-            user_data.setdefault('lastChopTimestamp', 0)
-            
-            # Attempt to chop
-            result = attempt_chop(user_data)
-            
-            if not result['success']:
-                # On cooldown
-                remaining = result['remaining_seconds']
-                minutes = remaining // 60
-                seconds = remaining % 60
+            # Load, chop and save in one transaction
+            async with user_transaction(user_id, username) as user_data:
+                # Attempt to chop
+                if swings == 1:
+                    result = attempt_chop(user_data)
+                    if result['success']:
+                        record_event(
+                            user_id, 'chop',
+                            rarity=result['rarity'], item=result['log_type'],
+                            value=result['value'], ts=result['timestamp'],
+                            rng=result['rng'], credit=result['credit']
+                        )
+                else:
+                    result = attempt_chop_batch(user_data, swings)
+                    if result['success']:
+                        record_event(
+                            user_id, 'chops',
+                            items=result['items'], value=result['value'], ts=result['timestamp'],
+                            swings=result['swings'], rng=result['rng'], credit=result['credit']
+                        )
                 
+                axe_tier = user_data['axe']['tier']
+                total_chops = user_data['stats']['totalChops']
+                balance = user_data['currency']
+            
+            if not result['success'] and result.get('on_expedition'):
                 embed = discord.Embed(
-                    title="<:deny:1444147699699023954> On Cooldown",
-                    description=f"Your axe needs a rest!\nTry again in **{minutes}m {seconds}s**",
+                    title="<:deny:1444147699699023954> On an Expedition",
+                    description=f"You're away on a **Woodcutting** expedition, ending <t:{result['ends']}:R>.\n"
+                                f"Use `/expedition stop` to come back early.",
                     color=0x95a5a6
                 )
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
+
+            if not result['success']:
+                # On cooldown (the index had no entry, e.g. just after a restart): remember it
+                get_cooldown_index().update(user_id, user_data)
+                await interaction.followup.send(embed=cooldown_embed(result['remaining_seconds']), ephemeral=True)
+                return
+            
+            if swings > 1:
+                embed = batch_embed(result, get_axe_emoji(axe_tier.lower()), axe_tier.title())
+                embed.set_footer(text=f"Total chops: {total_chops} | Balance: {balance:,}")
+                await interaction.followup.send(embed=embed)
+                return
             
             # Successful harvest
             rarity = result['rarity']
@@ -51,7 +117,6 @@ class Chop(commands.Cog):
             is_timber = result['is_timber_bite']
             
             # Get emojis (with case-insensitive lookup for axe)
-            axe_tier = user_data['axe']['tier']
             axe_emoji = get_axe_emoji(axe_tier.lower())
             log_emoji = get_log_emoji(log_type, rarity)
             
@@ -74,10 +139,7 @@ class Chop(commands.Cog):
             )
             
             # Add stats footer
-            embed.set_footer(text=f"Total chops: {user_data['stats']['totalChops']} | Balance: {user_data['currency']:,}")
-            
-            # Save user data
-            await save_user_data(user_id, user_data)
+            embed.set_footer(text=f"Total chops: {total_chops} | Balance: {balance:,}")
             
             await interaction.followup.send(embed=embed)
 
@@ -0,0 +1,46 @@
+"""
+/economyreport command - Admin command to summarize the economy
+"""
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from src.lib.validation import require_admin
+from src.lib.reports import build_economy_report
+from src.lib.economy import ROD_TIERS, AXE_TIERS
+from src.lib.emojis import format_currency
+
+class EconomyReport(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="economyreport", description="[ADMIN] Summarize currency and progress across all players")
+    async def economyreport(self, interaction: discord.Interaction):
+        """Economy report admin command"""
+        if not await require_admin(interaction):
+            return
+        
+        # Scanning every user can take a while on large datasets
+        await interaction.response.defer(ephemeral=True)
+        report = await build_economy_report()
+        
+        embed = discord.Embed(
+            title="📈 Economy Report",
+            description=f"**{report['players']:,}** players, **{report['activePlayers']:,}** active",
+            color=0x3498db
+        )
+        embed.add_field(name="Total Currency", value=format_currency(report['totalCurrency']), inline=True)
+        embed.add_field(name="Average", value=format_currency(report['averageCurrency']), inline=True)
+        embed.add_field(name="Richest", value=format_currency(report['richest']), inline=True)
+        embed.add_field(name="Total Catches", value=f"{report['totalCatches']:,}", inline=True)
+        embed.add_field(name="Total Chops", value=f"{report['totalChops']:,}", inline=True)
+        
+        rods = "\n".join(f"{tier}: **{report['rodTiers'][tier]:,}**" for tier in ROD_TIERS if tier in report['rodTiers'])
+        axes = "\n".join(f"{tier}: **{report['axeTiers'][tier]:,}**" for tier in AXE_TIERS if tier in report['axeTiers'])
+        embed.add_field(name="Rods", value=rods or "None", inline=False)
+        embed.add_field(name="Axes", value=axes or "None", inline=False)
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(EconomyReport(bot))
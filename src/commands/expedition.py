@@ -0,0 +1,167 @@
+"""
+/expedition commands - Gather fish or logs while idle
+"""
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from src.lib.persistence import user_transaction, record_event
+from src.lib.catalog import get_catalog
+from src.lib.expeditions import (
+    EXPEDITIONS, start_expedition, settle_expedition, stop_expedition, collect_expedition, record_haul
+)
+from src.lib.emojis import get_rarity_color, format_currency
+
+ACTIVITY_NAMES = {
+    'fishing': ('Fishing', 'fish', 'casts'),
+    'woodcutting': ('Woodcutting', 'logs', 'swings'),
+}
+
+def haul_items(haul: dict) -> list:
+    """The (catalog item, count) pairs of one settle, rarest last"""
+    category = ACTIVITY_NAMES[haul['activity']][1]
+    catalog = get_catalog()
+    return sorted((catalog.lookup(category, rarity, item_type), count) for rarity, item_type, count in haul['items'])
+
+def haul_description(found: list) -> str:
+    return "\n".join(
+        f"{item.emoji} **{item.display_name}** ({item.rarity}) x{count}" for item, count in found
+    )
+
+class Expedition(commands.Cog):
+    expedition = app_commands.Group(name="expedition", description="Gather fish or logs while you're away")
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @expedition.command(name="start", description="Head out on an expedition that gathers on its own")
+    @app_commands.describe(activity="What to gather")
+    @app_commands.choices(activity=[
+        app_commands.Choice(name="Fishing", value="fishing"),
+        app_commands.Choice(name="Woodcutting", value="woodcutting")
+    ])
+    async def start(self, interaction: discord.Interaction, activity: app_commands.Choice[str]):
+        """Start an expedition"""
+        try:
+            user_id = interaction.user.id
+            async with user_transaction(user_id, interaction.user.display_name) as user_data:
+                result = start_expedition(user_data, activity.value)
+                if result['success']:
+                    state = result['expedition']
+                    record_event(
+                        user_id, 'expedition',
+                        activity=activity.value, ts=state['started'], state=state, credit=result['credit']
+                    )
+
+            state = result['expedition']
+            if not result['success']:
+                name = ACTIVITY_NAMES[state['activity']][0]
+                embed = discord.Embed(
+                    title="<:deny:1444147699699023954> Already Out",
+                    description=f"You're already on a **{name}** expedition, ending <t:{state['ends']}:R>.\n"
+                                f"Use `/expedition stop` to come back early.",
+                    color=0x95a5a6
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            name, _, unit = ACTIVITY_NAMES[activity.value]
+            embed = discord.Embed(
+                title=f"<:confirm:1444147698386079875> {name} Expedition Started",
+                description=f"You'll keep making {unit} every **{EXPEDITIONS[activity.value].cooldown()}s** "
+                            f"until <t:{state['ends']}:t> (<t:{state['ends']}:R>).\n"
+                            f"Check in with `/expedition status`, or come back with `/expedition stop`.",
+                color=0x2ecc71
+            )
+            await interaction.response.send_message(embed=embed)
+
+        except Exception as e:
+            print(f"Error in /expedition start command: {e}")
+            await interaction.response.send_message("<:deny:1444147699699023954> An error occurred while starting your expedition. Please try again later.", ephemeral=True)
+
+    @expedition.command(name="status", description="See what your expedition has gathered so far")
+    async def status(self, interaction: discord.Interaction):
+        """Show the running expedition, settling it first"""
+        try:
+            user_id = interaction.user.id
+            async with user_transaction(user_id, interaction.user.display_name) as user_data:
+                state = user_data.get('expedition')
+                haul = settle_expedition(user_data)
+                if haul is not None:
+                    record_haul(user_id, haul)
+                    state = haul['totals']
+                finished = user_data.get('expedition') is None
+                if finished:
+                    # Shown once: here, or by a tick that ended it while the player was away
+                    last = collect_expedition(user_id, user_data)
+                    state = state or last
+
+            if state is None:
+                await interaction.response.send_message(
+                    "You're not on an expedition. Start one with `/expedition start`.", ephemeral=True
+                )
+                return
+
+            name, _, unit = ACTIVITY_NAMES[state['activity']]
+            when = "Ended" if finished else "Ends"
+            description = f"Started <t:{state['started']}:R> · {when} <t:{state['ends']}:R>\n\n"
+            description += f"**{state['rolls']}** {unit} so far, worth {format_currency(state['value'])}"
+            if haul is not None and haul['items']:
+                description += f"\n\nSince you last looked:\n{haul_description(haul_items(haul))}"
+            elif finished and haul is None:
+                description += "\n\nEverything it gathered is already in your inventory."
+
+            embed = discord.Embed(
+                title=f"{name} Expedition",
+                description=description,
+                color=0x3498db
+            )
+            await interaction.response.send_message(embed=embed)
+
+        except Exception as e:
+            print(f"Error in /expedition status command: {e}")
+            await interaction.response.send_message("<:deny:1444147699699023954> An error occurred while checking your expedition. Please try again later.", ephemeral=True)
+
+    @expedition.command(name="stop", description="Come back from your expedition early")
+    async def stop(self, interaction: discord.Interaction):
+        """Stop the running expedition"""
+        try:
+            user_id = interaction.user.id
+            async with user_transaction(user_id, interaction.user.display_name) as user_data:
+                haul = stop_expedition(user_data)
+                if haul is not None:
+                    record_haul(user_id, haul)
+                    totals = haul['totals']
+                else:
+                    # It already ran out; show its totals if the player hasn't seen them
+                    totals = collect_expedition(user_id, user_data)
+                balance = user_data['currency']
+
+            if totals is None:
+                await interaction.response.send_message("You're not on an expedition.", ephemeral=True)
+                return
+
+            name, _, unit = ACTIVITY_NAMES[totals['activity']]
+            description = f"You made **{totals['rolls']}** {unit} while away, "
+            description += f"worth {format_currency(totals['value'])} in total."
+            found = haul_items(haul) if haul is not None else []
+            if found:
+                description += f"\n\nOn the way back:\n{haul_description(found)}"
+            elif haul is None:
+                description += "\n\nEverything it gathered is already in your inventory."
+
+            best = found[-1][0].rarity if found else 'Common'
+            embed = discord.Embed(
+                title=f"<:confirm:1444147698386079875> {name} Expedition Over",
+                description=description,
+                color=get_rarity_color(best)
+            )
+            embed.set_footer(text=f"Balance: {balance:,}")
+            await interaction.response.send_message(embed=embed)
+
+        except Exception as e:
+            print(f"Error in /expedition stop command: {e}")
+            await interaction.response.send_message("<:deny:1444147699699023954> An error occurred while ending your expedition. Please try again later.", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Expedition(bot))
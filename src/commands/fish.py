@@ -5,44 +5,110 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from src.lib.persistence import load_user_data, save_user_data
-from src.lib.fishing import attempt_fish
+from src.lib.persistence import user_transaction, record_event
+from src.lib.cooldowns import get_cooldown_index
+from src.lib.catalog import get_catalog
+from src.lib.fishing import attempt_fish, attempt_fish_batch
 from src.lib.emojis import get_fish_emoji, get_rod_emoji, get_rarity_color, format_currency
 
+def cooldown_embed(remaining: int) -> discord.Embed:
+    """Tell the player how long until they can fish again"""
+    minutes = remaining // 60
+    seconds = remaining % 60
+    return discord.Embed(
+        title="<:deny:1444147699699023954> On Cooldown",
+        description=f"Your fishing rod needs a rest!\nTry again in **{minutes}m {seconds}s**",
+        color=0x95a5a6
+    )
+
+def batch_embed(result: dict, rod_emoji: str, rod_tier: str) -> discord.Embed:
+    """Summarize a multi-cast in one message"""
+    catalog = get_catalog()
+    caught = sorted(
+        (catalog.lookup('fish', rarity, fish_type), count) for rarity, fish_type, count in result['items']
+    )
+    description = f"You cast your {rod_emoji} **{rod_tier}** {result['casts']} times and caught:\n\n"
+    description += "\n".join(
+        f"{item.emoji} **{item.display_name}** ({item.rarity}) x{count}" for item, count in caught
+    )
+    description += f"\n\n{format_currency(result['value'])}"
+    if result['bites']:
+        description += f"\n*{result['bites']} Golden Bite{'s' if result['bites'] != 1 else ''} doubled those rewards!*"
+    if result['banked']:
+        description += f"\n\nCasts still banked: **{result['banked']}**"
+
+    best = caught[-1][0].rarity if caught else 'Common'
+    return discord.Embed(
+        title="<:confirm:1444147698386079875> Fishing Success!",
+        description=description,
+        color=get_rarity_color(best)
+    )
+
 class Fish(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
     @app_commands.command(name="fish", description="Cast your rod and catch a fish!")
-    async def fish(self, interaction: discord.Interaction):
+    @app_commands.describe(casts="Banked casts to spend at once (defaults to 1)")
+    async def fish(self, interaction: discord.Interaction, casts: app_commands.Range[int, 1, 100] = 1):
         """Fish command"""
+        # Turn players on cooldown away before touching storage
+        remaining = get_cooldown_index().remaining(interaction.user.id, 'fish')
+        if remaining:
+            await interaction.response.send_message(embed=cooldown_embed(remaining), ephemeral=True)
+            return
+
         await interaction.response.defer()
         try:
             user_id = interaction.user.id
             username = interaction.user.display_name
             
-            # Load user data
-            user_data = await load_user_data(user_id, username)
-            
-            # Ensure lastFishTimestamp exists for new users
-            user_data.setdefault('lastFishTimestamp', 0)
-            
-            # Attempt to fish
-            result = attempt_fish(user_data)
-            
-            if not result['success']:
-                # On cooldown
-                remaining = result['remaining_seconds']
-                minutes = remaining // 60
-                seconds = remaining % 60
+            # Load, fish and save in one transaction
+            async with user_transaction(user_id, username) as user_data:
+                # Attempt to fish
+                if casts == 1:
+                    result = attempt_fish(user_data)
+                    if result['success']:
+                        record_event(
+                            user_id, 'catch',
+                            rarity=result['rarity'], item=result['fish_type'],
+                            value=result['value'], ts=result['timestamp'],
+                            rng=result['rng'], credit=result['credit']
+                        )
+                else:
+                    result = attempt_fish_batch(user_data, casts)
+                    if result['success']:
+                        record_event(
+                            user_id, 'catches',
+                            items=result['items'], value=result['value'], ts=result['timestamp'],
+                            casts=result['casts'], rng=result['rng'], credit=result['credit']
+                        )
                 
+                rod_tier = user_data['rod']['tier']
+                total_catches = user_data['stats']['totalCatches']
+                balance = user_data['currency']
+            
+            if not result['success'] and result.get('on_expedition'):
                 embed = discord.Embed(
-                    title="<:deny:1444147699699023954> On Cooldown",
-                    description=f"Your fishing rod needs a rest!\nTry again in **{minutes}m {seconds}s**",
+                    title="<:deny:1444147699699023954> On an Expedition",
+                    description=f"You're away on a **Fishing** expedition, ending <t:{result['ends']}:R>.\n"
+                                f"Use `/expedition stop` to come back early.",
                     color=0x95a5a6
                 )
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
+
+            if not result['success']:
+                # On cooldown (the index had no entry, e.g. just after a restart): remember it
+                get_cooldown_index().update(user_id, user_data)
+                await interaction.followup.send(embed=cooldown_embed(result['remaining_seconds']), ephemeral=True)
+                return
+            
+            if casts > 1:
+                embed = batch_embed(result, get_rod_emoji(rod_tier), rod_tier)
+                embed.set_footer(text=f"Total catches: {total_catches} | Balance: {balance:,}")
+                await interaction.followup.send(embed=embed)
+                return
             
             # Successful catch
             rarity = result['rarity']
@@ -51,7 +117,7 @@ class Fish(commands.Cog):
             is_golden = result['is_golden_bite']
             
             # Get emojis
-            rod_emoji = get_rod_emoji(user_data['rod']['tier'])
+            rod_emoji = get_rod_emoji(rod_tier)
             fish_emoji = get_fish_emoji(fish_type, rarity)
             
             # Build description
@@ -59,7 +125,7 @@ class Fish(commands.Cog):
             if is_golden:
                 title = "<:plus:1444147702005891153> GOLDEN BITE! <:plus:1444147702005891153>"
             
-            description = f"You cast your {rod_emoji} **{user_data['rod']['tier']}** and caught:\n\n"
+            description = f"You cast your {rod_emoji} **{rod_tier}** and caught:\n\n"
             description += f"{fish_emoji} **{fish_type.title()}** ({rarity})\n"
             description += f"{format_currency(value)}"
             
@@ -73,10 +139,7 @@ class Fish(commands.Cog):
             )
             
             # Add stats footer
-            embed.set_footer(text=f"Total catches: {user_data['stats']['totalCatches']} | Balance: {user_data['currency']:,}")
-            
-            # Save user data
-            await save_user_data(user_id, user_data)
+            embed.set_footer(text=f"Total catches: {total_catches} | Balance: {balance:,}")
             
             await interaction.followup.send(embed=embed)
 
@@ -7,7 +7,9 @@ from discord import app_commands
 from discord.ext import commands
 from src.lib.persistence import load_user_data
 from src.lib.economy import calculate_inventory_value
-from src.lib.emojis import get_fish_emoji, get_rarity_color
+from src.lib.catalog import get_catalog
+from src.lib.prices import get_item_buckets
+from src.lib.emojis import get_rarity_color, format_currency
 
 class Inventory(commands.Cog):
     def __init__(self, bot):
@@ -22,8 +24,8 @@ class Inventory(commands.Cog):
         user_data = await load_user_data(user_id, username)
         inventory = user_data['inventory']
         
-        # Calculate total value
-        total_value = calculate_inventory_value(inventory)
+        # Maintained on every catch and sale, so no recount is needed
+        total_value = calculate_inventory_value(user_data, 'fish')
         
         embed = discord.Embed(
             title=f"<:inventory:1444147700902920302> {username}'s Inventory",
@@ -31,27 +33,37 @@ class Inventory(commands.Cog):
             color=0x3498db
         )
         
-        # Add fish by rarity
-        has_fish = False
+        # Add fish by rarity, rarest first
+        catalog = get_catalog()
+        fish_by_rarity = {}
+        for item in catalog.of_category('fish'):
+            count = inventory[item.rarity].get(item.name, 0)
+            if count > 0:
+                fish_by_rarity.setdefault(item.rarity, []).append(f"{item.emoji} {item.display_name}: **{count}**")
+        # Fish the catalog doesn't list under that rarity (e.g. legacy names) still count towards the value
+        for rarity, items in get_item_buckets(user_data, 'fish').items():
+            for fish_type, count in items.items():
+                known = catalog.get('fish', fish_type)
+                if count > 0 and (known is None or known.rarity != rarity):
+                    item = known or catalog.lookup('fish', rarity, fish_type)
+                    fish_by_rarity.setdefault(rarity, []).append(f"{item.emoji} {item.display_name}: **{count}**")
+        
+        has_fish = bool(fish_by_rarity)
         for rarity in ['Mythic', 'Legendary', 'Epic', 'Rare', 'Uncommon', 'Common']:
-            if rarity in inventory and inventory[rarity]:
-                fish_list = []
-                for fish_type, count in inventory[rarity].items():
-                    if count > 0:
-                        emoji = get_fish_emoji(fish_type, rarity)
-                        fish_list.append(f"{emoji} {fish_type.title()}: **{count}**")
-                        has_fish = True
-                
-                if fish_list:
-                    embed.add_field(
-                        name=f"{rarity} Fish",
-                        value="\n".join(fish_list),
-                        inline=False
-                    )
+            if rarity in fish_by_rarity:
+                embed.add_field(
+                    name=f"{rarity} Fish",
+                    value="\n".join(fish_by_rarity[rarity]),
+                    inline=False
+                )
         
         if not has_fish:
             embed.description = "Your inventory is empty. Go fishing with `/fish`!"
         
+        logs = user_data['inventoryStats']['logs']
+        if logs['items']:
+            embed.set_footer(text=f"Also holding {logs['items']:,} logs worth {format_currency(logs['value'])}")
+        
         await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
@@ -1,68 +1,197 @@
 """
-/leaderboard command - Show rankings
+/leaderboard and /rank commands - Show rankings
 """
 
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Literal
-from src.lib.leaderboards import get_richest_leaderboard, get_catches_leaderboard, get_rod_leaderboard
-from src.lib.emojis import format_currency, get_rod_emoji
+from typing import Literal, List, Tuple
+from src.lib.leaderboards import get_leaderboard_snapshot, get_ranking_version, get_user_rank, LeaderboardSnapshot
+from src.lib.economy import ROD_TIERS, AXE_TIERS
+from src.lib.emojis import format_currency, get_rod_emoji, get_axe_emoji
+from src.lib.config import get_leaderboard_cache_ttl
+from src.lib.render_cache import RenderCache
+
+Category = Literal["richest", "networth", "catches", "chops", "rods", "axes"]
+
+# category -> (metric, title)
+CATEGORIES = {
+    "richest": ("currency", "<:chum_bucket:1444145395214323764> Richest Players"),
+    "networth": ("netWorth", "<:chum_bucket:1444145395214323764> Highest Net Worth"),
+    "catches": ("totalCatches", "<:inventory:1444147700902920302> Most Catches"),
+    "chops": ("totalChops", "<:inventory:1444147700902920302> Most Chops"),
+    "rods": ("rodTier", "<:rod_of_the_sea:1443784013167984711> Best Rods"),
+    "axes": ("axeTier", "<:silva_dominus:1444906277364039763> Best Axes"),
+}
+
+def format_score(category: str, score: int) -> str:
+    """Render a metric value for a leaderboard row"""
+    if category in ("richest", "networth"):
+        return format_currency(score)
+    if category == "catches":
+        return f"**{score:,}** fish"
+    if category == "chops":
+        return f"**{score:,}** logs"
+    if category == "axes":
+        axe_tier = AXE_TIERS[score]
+        return f"{get_axe_emoji(axe_tier)} {axe_tier}"
+    rod_tier = ROD_TIERS[score]
+    return f"{get_rod_emoji(rod_tier)} {rod_tier}"
+
+def format_rows(category: str, rows: List[Tuple[int, str, int, int]], highlight_id: int = None) -> str:
+    """One line per (position, username, user_id, score) row"""
+    description = ""
+    for position, username, user_id, score in rows:
+        medal = "<:profile:1444147703067181237>" if position <= 3 else f"**{position}.**"
+        name = f"__{username}__" if user_id == highlight_id else username
+        description += f"{medal} {name}: {format_score(category, score)}\n"
+    return description
+
+def build_leaderboard_embed(category: str, snapshot: LeaderboardSnapshot, page: int) -> discord.Embed:
+    """Embed for one page of a leaderboard snapshot"""
+    description = format_rows(category, snapshot.page(page))
+    if not description:
+        description = "No data available yet. Start fishing!"
+
+    embed = discord.Embed(
+        title=CATEGORIES[category][1],
+        description=description,
+        color=0xf39c12
+    )
+    embed.set_footer(text=f"Page {page}/{snapshot.page_count} • Keep fishing to climb the ranks!")
+    return embed
+
+# (category, guild_id, page) -> (snapshot, embed), dropped when the ranking changes
+_page_cache = RenderCache('leaderboard_cache', get_leaderboard_cache_ttl)
+
+def render_page(category: str, snapshot: LeaderboardSnapshot, page: int) -> discord.Embed:
+    """Build a page's embed, or reuse it if this snapshot version was rendered already"""
+    key = (category, snapshot.guild_id, page)
+    cached = _page_cache.get(key, snapshot.version)
+    if cached is not None:
+        return cached[1]
+    embed = build_leaderboard_embed(category, snapshot, page)
+    _page_cache.put(key, snapshot.version, (snapshot, embed))
+    return embed
+
+class LeaderboardView(discord.ui.View):
+    """Previous/next buttons paging through a leaderboard snapshot"""
+
+    def __init__(self, category: str, snapshot: LeaderboardSnapshot, page: int, owner_id: int):
+        super().__init__(timeout=120)
+        self.category = category
+        self.snapshot = snapshot
+        self.page = page
+        self.owner_id = owner_id
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= self.snapshot.page_count
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message(
+                "❌ Use `/leaderboard` to browse your own copy!", ephemeral=True
+            )
+            return False
+        return True
+
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        # Pages outside the snapshot window take a fresh snapshot from there
+        if not self.snapshot.has_page(page):
+            self.snapshot = await get_leaderboard_snapshot(self.snapshot.metric, page, self.snapshot.guild_id)
+        self.page = min(page, self.snapshot.page_count)
+        self._update_buttons()
+        await interaction.response.edit_message(
+            embed=render_page(self.category, self.snapshot, self.page), view=self
+        )
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show_page(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
 
 class Leaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-    
+
     @app_commands.command(name="leaderboard", description="View server leaderboards")
-    @app_commands.describe(category="Leaderboard category to view")
+    @app_commands.describe(category="Leaderboard category to view", page="Page to start on")
     async def leaderboard(
         self,
         interaction: discord.Interaction,
-        category: Literal["richest", "catches", "rods"] = "richest"
+        category: Category = "richest",
+        page: app_commands.Range[int, 1] = 1
     ):
         """Leaderboard command"""
-        
+
         await interaction.response.defer()
-        
-        if category == "richest":
-            data = await get_richest_leaderboard()
-            title = "<:chum_bucket:1444145395214323764> Richest Players"
-            
-            description = ""
-            for i, (username, user_id, currency) in enumerate(data, 1):
-                medal = "<:profile:1444147703067181237>" if i == 1 else "<:profile:1444147703067181237>" if i == 2 else "<:profile:1444147703067181237>" if i == 3 else f"**{i}.**"
-                description += f"{medal} {username}: {format_currency(currency)}\n"
-            
-        elif category == "catches":
-            data = await get_catches_leaderboard()
-            title = "<:inventory:1444147700902920302> Most Catches"
-            
-            description = ""
-            for i, (username, user_id, catches) in enumerate(data, 1):
-                medal = "<:profile:1444147703067181237>" if i == 1 else "<:profile:1444147703067181237>" if i == 2 else "<:profile:1444147703067181237>" if i == 3 else f"**{i}.**"
-                description += f"{medal} {username}: **{catches:,}** fish\n"
-            
-        else:  # rods
-            data = await get_rod_leaderboard()
-            title = "<:rod_of_the_sea:1443784013167984711> Best Rods"
-            
-            description = ""
-            for i, (username, user_id, rod_tier, tier_index) in enumerate(data, 1):
-                medal = "<:profile:1444147703067181237>" if i == 1 else "<:profile:1444147703067181237>" if i == 2 else "<:profile:1444147703067181237>" if i == 3 else f"**{i}.**"
-                rod_emoji = get_rod_emoji(rod_tier)
-                description += f"{medal} {username}: {rod_emoji} {rod_tier}\n"
-        
-        if not description:
-            description = "No data available yet. Start fishing!"
-        
+
+        # Rank this server's players; in DMs fall back to everyone
+        metric = CATEGORIES[category][0]
+        guild_id = interaction.guild_id
+
+        cached = _page_cache.get((category, guild_id, page), await get_ranking_version(metric, guild_id))
+        if cached is not None:
+            snapshot, embed = cached
+            page = min(page, snapshot.page_count)
+        else:
+            snapshot = await get_leaderboard_snapshot(metric, page, guild_id)
+            embed = build_leaderboard_embed(category, snapshot, min(page, snapshot.page_count))
+            # Also kept under the requested page, so asking past the end hits too
+            _page_cache.put((category, guild_id, page), snapshot.version, (snapshot, embed))
+            page = min(page, snapshot.page_count)
+            _page_cache.put((category, guild_id, page), snapshot.version, (snapshot, embed))
+        if snapshot.page_count <= 1:
+            await interaction.followup.send(embed=embed)
+            return
+
+        view = LeaderboardView(category, snapshot, page, interaction.user.id)
+        view.message = await interaction.followup.send(embed=embed, view=view, wait=True)
+
+    @app_commands.command(name="rank", description="See where you stand on a leaderboard")
+    @app_commands.describe(category="Leaderboard category", user="Player to look up (defaults to you)")
+    async def rank(
+        self,
+        interaction: discord.Interaction,
+        category: Category = "richest",
+        user: discord.User = None
+    ):
+        """Rank command"""
+        target = user or interaction.user
+        metric, title = CATEGORIES[category]
+
+        result = await get_user_rank(metric, target.id, interaction.guild_id)
+        if result is None:
+            await interaction.response.send_message(
+                f"❌ {target.display_name} isn't on this leaderboard yet. Start fishing!",
+                ephemeral=True
+            )
+            return
+
+        position, score, total, neighbours = result
         embed = discord.Embed(
-            title=title,
-            description=description,
+            title=f"{title} • {target.display_name}",
+            description=f"Rank **#{position:,}** of {total:,} with {format_score(category, score)}",
             color=0xf39c12
         )
-        embed.set_footer(text="Keep fishing to climb the ranks!")
-        
-        await interaction.followup.send(embed=embed)
+        embed.add_field(name="Nearby", value=format_rows(category, neighbours, highlight_id=target.id), inline=False)
+
+        await interaction.response.send_message(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Leaderboard(bot))
@@ -7,14 +7,14 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional
 
-from src.lib.persistence import load_user_data, save_user_data
-from src.lib.config import get_costs_config
+from src.lib.persistence import user_transaction, record_event
+from src.lib.economy import get_inventory_items, apply_sale
+from src.lib.catalog import get_catalog
 from src.lib.emojis import format_currency
 
 class Sell(commands.GroupCog, name="sell"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.costs = get_costs_config()
         super().__init__()
 
     async def _sell_items(self, interaction: discord.Interaction, item_category: str, item_type: Optional[str], amount: Optional[int]):
@@ -23,67 +23,71 @@ class Sell(commands.GroupCog, name="sell"):
 
         user_id = interaction.user.id
         username = interaction.user.display_name
-        user_data = await load_user_data(user_id, username)
 
-        inventory_key = f"{item_category}" # "logs" or "fish"
-        values_key = f"{item_category}Values" # "logValues" or "fishValues"
+        async with user_transaction(user_id, username) as user_data:
+            error, total_value, sold_description = self._apply_sale(user_data, item_category, item_type, amount)
+            balance = user_data['currency']
 
-        if inventory_key not in user_data.get('inventory', {}):
-            user_data['inventory'][inventory_key] = {}
+        if error:
+            await interaction.followup.send(error, ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="<:confirm:1444147698386079875> Items Sold!",
+            description="\n".join(sold_description),
+            color=0x2ecc71
+        )
+        embed.add_field(name="Total Earnings", value=format_currency(total_value))
+        embed.set_footer(text=f"New Balance: {format_currency(balance)}")
+
+        await interaction.followup.send(embed=embed)
 
-        inventory = user_data['inventory'][inventory_key]
-        item_values = self.costs[values_key]
+    def _apply_sale(self, user_data: dict, item_category: str, item_type: Optional[str], amount: Optional[int]):
+        """
+        Remove sold items from the inventory and credit the user.
+        Returns (error_message, total_value, sold_description)
+        """
+        inventory = get_inventory_items(user_data, item_category)
+        catalog = get_catalog()
 
-        items_to_sell = {}
+        items_to_sell = []
         
         # Determine which items and amounts to sell
         if item_type:
             # Selling a specific type of item
             item_type = item_type.lower()
-            if item_type not in inventory or inventory[item_type] == 0:
-                await interaction.followup.send(f"You don't have any **{item_type.title()}** to sell.", ephemeral=True)
-                return
+            if item_type not in inventory:
+                return f"You don't have any **{item_type.title()}** to sell.", 0, []
             
-            amount_to_sell = inventory[item_type] if amount is None else amount
-            if amount_to_sell > inventory[item_type]:
-                await interaction.followup.send(f"You only have **{inventory[item_type]}** {item_type.title()} to sell.", ephemeral=True)
-                return
+            rarity, available = inventory[item_type]
+            amount_to_sell = available if amount is None else amount
+            if amount_to_sell > available:
+                return f"You only have **{available}** {item_type.title()} to sell.", 0, []
             
-            items_to_sell[item_type] = amount_to_sell
+            items_to_sell.append((rarity, item_type, amount_to_sell))
         else:
             # Selling all items in the category
-            if not inventory:
-                await interaction.followup.send(f"You don't have any {inventory_key} to sell.", ephemeral=True)
-                return
-            for i_type, i_amount in inventory.items():
-                if i_amount > 0:
-                    items_to_sell[i_type] = i_amount
+            if not user_data['inventoryStats'][item_category]['items']:
+                return f"You don't have any {item_category} to sell.", 0, []
+            for i_type, (rarity, i_amount) in inventory.items():
+                items_to_sell.append((rarity, i_type, i_amount))
 
         if not items_to_sell:
-            await interaction.followup.send(f"You don't have any {inventory_key} to sell.", ephemeral=True)
-            return
+            return f"You don't have any {item_category} to sell.", 0, []
 
         # Calculate total value and update inventory
         total_value = 0
         sold_description = []
-        for i_type, i_amount in items_to_sell.items():
-            value = item_values.get(i_type, 0) * i_amount
+        for rarity, i_type, i_amount in items_to_sell:
+            item = catalog.get(item_category, i_type)
+            value = item.sell_value * i_amount if item else 0
             total_value += value
-            inventory[i_type] -= i_amount
-            sold_description.append(f"**{i_amount}** {i_type.title()} for {format_currency(value)}")
-
-        user_data['currency'] += total_value
-        await save_user_data(user_id, user_data)
-
-        embed = discord.Embed(
-            title="<:confirm:1444147698386079875> Items Sold!",
-            description="\n".join(sold_description),
-            color=0x2ecc71
-        )
-        embed.add_field(name="Total Earnings", value=format_currency(total_value))
-        embed.set_footer(text=f"New Balance: {format_currency(user_data['currency'])}")
+            name = item.display_name if item else i_type.title()
+            sold_description.append(f"**{i_amount}** {name} for {format_currency(value)}")
 
-        await interaction.followup.send(embed=embed)
+        apply_sale(user_data, item_category, items_to_sell, total_value)
+        record_event(user_data['user_id'], 'sell', category=item_category, items=items_to_sell, value=total_value)
+        return None, total_value, sold_description
 
     @app_commands.command(name="logs", description="Sell your harvested logs.")
     @app_commands.describe(
@@ -95,10 +99,9 @@ class Sell(commands.GroupCog, name="sell"):
 
     @sell_logs.autocomplete('item_type')
     async def logs_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        log_types = list(self.costs['logValues'].keys())
         return [
-            app_commands.Choice(name=log.title(), value=log)
-            for log in log_types if current.lower() in log.lower()
+            app_commands.Choice(name=item.display_name, value=item.name)
+            for item in get_catalog().of_category('logs') if current.lower() in item.name
         ][:25]
 
     @app_commands.command(name="fish", description="Sell your caught fish.")
@@ -111,10 +114,9 @@ class Sell(commands.GroupCog, name="sell"):
 
     @sell_fish.autocomplete('item_type')
     async def fish_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        fish_types = list(self.costs['fishValues'].keys())
         return [
-            app_commands.Choice(name=fish.title(), value=fish)
-            for fish in fish_types if current.lower() in fish.lower()
+            app_commands.Choice(name=item.display_name, value=item.name)
+            for item in get_catalog().of_category('fish') if current.lower() in item.name
         ][:25]
 
 async def setup(bot: commands.Bot):
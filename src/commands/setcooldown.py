@@ -35,10 +35,10 @@ class SetCooldown(commands.Cog):
             return
         
         # Update settings
-        settings = get_settings_config()
+        settings = dict(get_settings_config()) # The loaded config is read-only
         cooldown_key = f"{category.value}Cooldown" # e.g., "fishCooldown" or "chopCooldown"
         settings[cooldown_key] = seconds
-        success = update_settings_config(settings)
+        success = await update_settings_config(settings)
         
         if success:
             embed = discord.Embed(
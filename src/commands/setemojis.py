@@ -2,6 +2,7 @@
 /setemojis command - Admin command to set custom emojis
 """
 
+import copy
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -30,7 +31,7 @@ class SetEmojis(commands.Cog):
             return
         
         # Get current config
-        emoji_config = get_emoji_config()
+        emoji_config = copy.deepcopy(get_emoji_config()) # The loaded config is read-only
         
         # Initialize category if needed
         if category not in emoji_config:
@@ -40,7 +41,7 @@ class SetEmojis(commands.Cog):
         emoji_config[category][name] = emoji
         
         # Save config
-        success = update_emoji_config(emoji_config)
+        success = await update_emoji_config(emoji_config)
         
         if success:
             embed = discord.Embed(
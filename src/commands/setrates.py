@@ -2,6 +2,7 @@
 /setrates command - Admin command to adjust catch rates
 """
 
+import copy
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -40,7 +41,7 @@ class SetRates(commands.Cog):
             return
         
         # Update rates
-        rates = get_rates_config()
+        rates = copy.deepcopy(get_rates_config()) # The loaded config is read-only
         
         if 'rodTiers' not in rates:
             rates['rodTiers'] = {}
@@ -51,7 +52,7 @@ class SetRates(commands.Cog):
         
         rates['rodTiers'][rod_tier]['weights'][rarity] = weight
         
-        success = update_rates_config(rates)
+        success = await update_rates_config(rates)
         
         if success:
             embed = discord.Embed(
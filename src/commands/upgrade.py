@@ -5,8 +5,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from src.lib.persistence import load_user_data, save_user_data
-from src.lib.economy import get_next_rod_tier, get_next_axe_tier
+from src.lib.persistence import user_transaction, record_event
+from src.lib.economy import get_next_rod_tier, get_next_axe_tier, apply_tier_upgrade
 from src.lib.emojis import get_rod_emoji, get_axe_emoji, format_currency
 
 class Upgrade(commands.Cog):
@@ -24,15 +24,19 @@ class Upgrade(commands.Cog):
         user_id = interaction.user.id
         username = interaction.user.display_name
         
-        user_data = await load_user_data(user_id, username)
+        async with user_transaction(user_id, username) as user_data:
+            if item.value == "rod":
+                embed, ephemeral = self.upgrade_rod(user_data)
+            else:
+                embed, ephemeral = self.upgrade_axe(user_data)
         
-        if item.value == "rod":
-            await self.upgrade_rod(interaction, user_data)
-        elif item.value == "axe":
-            await self.upgrade_axe(interaction, user_data)
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
 
-    async def upgrade_rod(self, interaction: discord.Interaction, user_data: dict):
-        """Upgrade the fishing rod"""
+    def upgrade_rod(self, user_data: dict):
+        """
+        Upgrade the fishing rod
+        Returns (embed, ephemeral)
+        """
         current_tier = user_data['rod']['tier']
         next_tier, cost = get_next_rod_tier(current_tier)
         
@@ -42,8 +46,7 @@ class Upgrade(commands.Cog):
                 description="You already have the best fishing rod available!",
                 color=0x95a5a6
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Check if user can afford
         if user_data['currency'] < cost:
@@ -52,15 +55,11 @@ class Upgrade(commands.Cog):
                 description=f"You need {format_currency(cost)} to upgrade to the {next_tier} rod.\nYour balance: {format_currency(user_data['currency'])}",
                 color=0xe74c3c
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Perform upgrade
-        user_data['currency'] -= cost
-        user_data['rod']['tier'] = next_tier
-        user_data['rod']['level'] += 1
-        
-        await save_user_data(interaction.user.id, user_data)
+        apply_tier_upgrade(user_data, 'rod', next_tier, cost)
+        record_event(user_data['user_id'], 'tier', item='rod', tier=next_tier, cost=cost)
         
         # Success message
         rod_emoji = get_rod_emoji(next_tier)
@@ -72,10 +71,13 @@ class Upgrade(commands.Cog):
         embed.add_field(name="Benefits", value="• Improved bite rate\n• Better catch chances\n• Increased Rare+ probabilities", inline=False)
         embed.add_field(name="New Balance", value=format_currency(user_data['currency']), inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        return embed, False
 
-    async def upgrade_axe(self, interaction: discord.Interaction, user_data: dict):
-        """Upgrade the woodcutting axe"""
+    def upgrade_axe(self, user_data: dict):
+        """
+        Upgrade the woodcutting axe
+        Returns (embed, ephemeral)
+        """
         current_tier = user_data['axe']['tier']
         next_tier, cost = get_next_axe_tier(current_tier)
         
@@ -85,8 +87,7 @@ class Upgrade(commands.Cog):
                 description="You already have the best woodcutting axe available!",
                 color=0x95a5a6
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Check if user can afford
         if user_data['currency'] < cost:
@@ -95,14 +96,11 @@ class Upgrade(commands.Cog):
                 description=f"You need {format_currency(cost)} to upgrade to the {next_tier.title()} axe.\nYour balance: {format_currency(user_data['currency'])}",
                 color=0xe74c3c
             )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+            return embed, True
         
         # Perform upgrade
-        user_data['currency'] -= cost
-        user_data['axe']['tier'] = next_tier
-        
-        await save_user_data(interaction.user.id, user_data)
+        apply_tier_upgrade(user_data, 'axe', next_tier, cost)
+        record_event(user_data['user_id'], 'tier', item='axe', tier=next_tier, cost=cost)
         
         # Success message
         axe_emoji = get_axe_emoji(next_tier)
@@ -114,7 +112,7 @@ class Upgrade(commands.Cog):
         embed.add_field(name="Benefits", value="• Improved chop speed\n• Better log chances\n• Increased Rare+ probabilities", inline=False)
         embed.add_field(name="New Balance", value=format_currency(user_data['currency']), inline=False)
         
-        await interaction.response.send_message(embed=embed)
+        return embed, False
 
 async def setup(bot):
     await bot.add_cog(Upgrade(bot))
@@ -0,0 +1,109 @@
+"""
+Item catalog: every fish and log with its id, rarity, values, emoji and name
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .config import add_config_listener, get_config_version, get_costs_config
+
+# Inventory category -> emoji.json section
+EMOJI_SECTIONS = {
+    'fish': 'fish',
+    'logs': 'logs'
+}
+
+# Names older versions stored in inventories -> their current item name
+LEGACY_ITEM_NAMES = {
+    'logs': {'ash': 'ashwood', 'eternal': 'angelwood'}
+}
+
+class Item(NamedTuple):
+    """One catchable or choppable item, precomputed from code and config"""
+    id: int
+    category: str  # 'fish' or 'logs'
+    name: str  # key in inventories, costs.json and emoji.json
+    rarity: str
+    value: int  # paid on a catch or chop, before golden/timber bites
+    sell_value: int  # costs.json price
+    emoji: str
+    display_name: str
+
+class ItemCatalog:
+    """Immutable set of items, looked up by id or by (category, name)"""
+
+    def __init__(self, items: List[Item], version: int):
+        self.version = version
+        self.items: Tuple[Item, ...] = tuple(items)
+        self._by_name: Dict[Tuple[str, str], Item] = {(item.category, item.name): item for item in items}
+        self._by_category: Dict[str, Tuple[Item, ...]] = {
+            category: tuple(item for item in items if item.category == category) for category in EMOJI_SECTIONS
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, category: str, name: str) -> Optional[Item]:
+        return self._by_name.get((category, name))
+
+    def lookup(self, category: str, rarity: str, name: str) -> Item:
+        """The item, or a stand-in sorting after every known one for a name not in the catalog"""
+        item = self.get(category, name)
+        if item is None:
+            from .emojis import get_emoji
+            item = Item(
+                id=len(self.items), category=category, name=name, rarity=rarity, value=0, sell_value=0,
+                emoji=get_emoji(EMOJI_SECTIONS[category], f"{name}_{rarity.lower()}"), display_name=name.title()
+            )
+        return item
+
+    def by_id(self, item_id: int) -> Item:
+        return self.items[item_id]
+
+    def of_category(self, category: str) -> Tuple[Item, ...]:
+        """A category's items, in rarity order from Common up"""
+        return self._by_category.get(category, ())
+
+def build_catalog(version: int = 0) -> ItemCatalog:
+    """Compile the catalog from the item tables and the current config"""
+    # Imported here: fishing, woodcutting and emojis read from the catalog
+    from .emojis import get_emoji
+    from .fishing import FISH_TYPES, BASE_VALUES as FISH_BASE_VALUES, FISH_MULTIPLIERS
+    from .woodcutting import LOG_TYPES, BASE_VALUES as LOG_BASE_VALUES, LOG_MULTIPLIERS
+
+    costs = get_costs_config()
+    sources = (
+        ('fish', FISH_TYPES, FISH_BASE_VALUES, FISH_MULTIPLIERS, costs.get('fishValues', {})),
+        ('logs', LOG_TYPES, LOG_BASE_VALUES, LOG_MULTIPLIERS, costs.get('logValues', {})),
+    )
+    items = []
+    for category, item_types, base_values, multipliers, prices in sources:
+        for rarity, names in item_types.items():
+            for name in names:
+                items.append(Item(
+                    id=len(items),
+                    category=category,
+                    name=name,
+                    rarity=rarity,
+                    value=int(base_values[rarity] * multipliers.get(name, 1.0)),
+                    sell_value=prices.get(name, 0),
+                    emoji=get_emoji(EMOJI_SECTIONS[category], f"{name}_{rarity.lower()}"),
+                    display_name=name.title()
+                ))
+    return ItemCatalog(items, version)
+
+_catalog: Optional[ItemCatalog] = None
+
+def get_catalog() -> ItemCatalog:
+    """The catalog for the current config, rebuilt and swapped in whole after a config change"""
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        catalog = _catalog = build_catalog(get_config_version())
+    return catalog
+
+def _drop_catalog():
+    global _catalog
+    _catalog = None
+
+# Prices come from costs.json and emojis from emoji.json
+add_config_listener(_drop_catalog, ('costs', 'emoji'))
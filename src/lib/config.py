@@ -1,5 +1,19 @@
+"""
+Configuration snapshots, reloaded when the files in config/ change
+
+All four files are held in one immutable ConfigSnapshot, swapped in whole
+so a command never sees settings from one version and rates from another.
+The ConfigWatcher polls the files' modification times, parses and validates
+changed ones on the I/O threads, and swaps in a new snapshot; derived caches
+register with add_config_listener to be dropped when their sections change.
+"""
+
+import asyncio
 import json
 import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .executor import run_io
 
 # Define paths to configuration files
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'config')
@@ -8,11 +22,112 @@ RATES_FILE = os.path.join(CONFIG_DIR, 'rates.json')
 EMOJI_FILE = os.path.join(CONFIG_DIR, 'emoji.json')
 COSTS_FILE = os.path.join(CONFIG_DIR, 'costs.json')
 
-# Global variables to store loaded configurations
-_settings_config = {}
-_rates_config = {}
-_emoji_config = {}
-_costs_config = {}
+# Snapshot section -> file it is loaded from
+CONFIG_FILES = {
+    'settings': SETTINGS_FILE,
+    'rates': RATES_FILE,
+    'emoji': EMOJI_FILE,
+    'costs': COSTS_FILE
+}
+
+# Settings that must be positive numbers for the bot to work at all
+POSITIVE_SETTINGS = (
+    'fishCooldown', 'chopCooldown', 'castCreditCap', 'expeditionTickSeconds', 'expeditionHours',
+    'configPollSeconds', 'userCacheSize', 'durabilityWindowMs', 'flushThreshold', 'ioWorkers',
+    'leaderboardCacheTtl', 'journalCompactionInterval', 'journalSegmentBytes'
+)
+# Settings where 0 turns a feature off
+NON_NEGATIVE_SETTINGS = ('scanWorkers',)
+# Settings read once at startup (pools, storage, journal, recorder): a reload keeps the running values
+RESTART_SETTINGS = (
+    'ioWorkers', 'scanWorkers', 'storageBackend', 'sqlitePath', 'journalEnabled', 'journalSegmentBytes',
+    'commandLogPath'
+)
+
+class FrozenConfig(dict):
+    """A read-only config mapping; copy.deepcopy() one to get a plain, editable dict"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only; edit a copy.deepcopy() of it instead")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __deepcopy__(self, memo):
+        return thaw_config(self)
+
+    def __reduce__(self):
+        return (FrozenConfig, (dict(self),))
+
+def freeze_config(value: Any) -> Any:
+    """Deep read-only copy of parsed JSON: dicts become FrozenConfig, lists tuples"""
+    if isinstance(value, dict):
+        return FrozenConfig((key, freeze_config(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+def thaw_config(value: Any) -> Any:
+    """Deep editable copy of a frozen config"""
+    if isinstance(value, dict):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_config(item) for item in value]
+    return value
+
+class ConfigSnapshot(NamedTuple):
+    """Every configuration file as loaded at one version"""
+    version: int  # bumped on every swap
+    settings: FrozenConfig
+    rates: FrozenConfig
+    emoji: FrozenConfig
+    costs: FrozenConfig
+    stamps: FrozenConfig  # section -> (mtime_ns, size) of the file it was read from
+
+_snapshot = ConfigSnapshot(0, FrozenConfig(), FrozenConfig(), FrozenConfig(), FrozenConfig(), FrozenConfig())
+
+# RESTART_SETTINGS as first loaded; the getters of those settings read these
+_startup_settings: Optional[FrozenConfig] = None
+
+# (listener, sections it depends on, or None for all)
+_listeners: List[Tuple[Callable[[], None], Optional[Tuple[str, ...]]]] = []
+
+def add_config_listener(listener: Callable[[], None], sections: Tuple[str, ...] = None):
+    """Call listener() after every swap that replaces one of sections (any section if None)"""
+    _listeners.append((listener, sections))
+
+def _swap_snapshot(sections: Dict[str, FrozenConfig], stamps: Dict[str, Tuple[int, int]]) -> ConfigSnapshot:
+    """Swap in a snapshot with the given sections replaced, then notify their listeners"""
+    global _snapshot, _startup_settings
+    if 'settings' in sections:
+        settings = sections['settings']
+        if _startup_settings is None:
+            _startup_settings = FrozenConfig((key, settings[key]) for key in RESTART_SETTINGS if key in settings)
+        else:
+            pending = [key for key in RESTART_SETTINGS if settings.get(key) != _startup_settings.get(key)]
+            if pending:
+                print(f"Restart the bot to apply {', '.join(pending)}")
+    snapshot = _snapshot._replace(
+        version=_snapshot.version + 1,
+        stamps=FrozenConfig({**_snapshot.stamps, **stamps}),
+        **sections
+    )
+    _snapshot = snapshot
+    for listener, depends_on in _listeners:
+        if depends_on is None or any(section in sections for section in depends_on):
+            try:
+                listener()
+            except Exception as e:
+                print(f"Error in config listener {listener!r}: {e}")
+    return snapshot
+
+def _file_stamp(file_path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
 def _load_config_file(file_path):
     """Helper function to load a JSON configuration file."""
@@ -21,101 +136,312 @@ def _load_config_file(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def _require_numbers(path: str, values: Any, positive: bool = False):
+    if not isinstance(values, dict):
+        raise ValueError(f"{path} must be an object")
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or (positive and value == 0):
+            raise ValueError(f"{path}.{key} must be a {'positive' if positive else 'non-negative'} number")
+
+def validate_config(section: str, data: Any):
+    """Raise ValueError if parsed config data would break the bot"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{section} configuration must be a JSON object")
+    if section == 'settings':
+        _require_numbers(section, {key: data[key] for key in POSITIVE_SETTINGS if key in data}, positive=True)
+        _require_numbers(section, {key: data[key] for key in NON_NEGATIVE_SETTINGS if key in data})
+    elif section == 'rates':
+        for tiers_key, tiers in data.items():
+            if not isinstance(tiers, dict):
+                raise ValueError(f"rates.{tiers_key} must be an object")
+            for tier, rates in tiers.items():
+                if not isinstance(rates, dict):
+                    raise ValueError(f"rates.{tiers_key}.{tier} must be an object")
+                if 'weights' in rates:
+                    _require_numbers(f"rates.{tiers_key}.{tier}.weights", rates['weights'])
+    elif section == 'costs':
+        for table, prices in data.items():
+            _require_numbers(f"costs.{table}", prices)
+    elif section == 'emoji':
+        for category, emojis in data.items():
+            if not isinstance(emojis, dict) or not all(isinstance(emoji, str) for emoji in emojis.values()):
+                raise ValueError(f"emoji.{category} must map names to emoji strings")
+
+def _read_config_files(known: Dict[str, Tuple[int, int]] = None):
+    """
+    Parse and validate every config file whose stamp differs from known
+    (all of them if known is None). Blocking; run it off the event loop.
+    Returns (sections, stamps, errors) with errors as section -> (stamp, message)
+    """
+    sections, stamps, errors = {}, {}, {}
+    for section, file_path in CONFIG_FILES.items():
+        stamp = _file_stamp(file_path)
+        if known is not None and (stamp is None or stamp == known.get(section)):
+            continue
+        try:
+            data = _load_config_file(file_path)
+            validate_config(section, data)
+        except (OSError, ValueError) as e:
+            if known is None:
+                raise
+            error = str(e)
+        else:
+            error = None
+        if known is not None and _file_stamp(file_path) != stamp:
+            continue # Still being written; read it again on the next poll
+        if error is not None:
+            errors[section] = (stamp, error)
+            continue
+        sections[section] = freeze_config(data)
+        stamps[section] = stamp
+    return sections, stamps, errors
+
 def load_all_configs():
-    """Loads all configuration files into global variables."""
-    global _settings_config, _rates_config, _emoji_config, _costs_config
-    
+    """Loads all configuration files and swaps them in as one snapshot."""
     print("Loading configurations...")
-    _settings_config = _load_config_file(SETTINGS_FILE)
-    print(f"  Loaded {SETTINGS_FILE}")
-    _rates_config = _load_config_file(RATES_FILE)
-    print(f"  Loaded {RATES_FILE}")
-    _emoji_config = _load_config_file(EMOJI_FILE)
-    print(f"  Loaded {EMOJI_FILE}")
-    _costs_config = _load_config_file(COSTS_FILE)
-    print(f"  Loaded {COSTS_FILE}")
+    sections, stamps, _ = _read_config_files()
+    for file_path in CONFIG_FILES.values():
+        print(f"  Loaded {file_path}")
+    _swap_snapshot(sections, stamps)
     print("All configurations loaded.")
 
 # --- Getters ---
+def get_config_snapshot() -> ConfigSnapshot:
+    """Returns the current configuration snapshot."""
+    return _snapshot
+
 def get_settings_config():
-    """Returns the loaded settings configuration."""
-    return _settings_config
+    """Returns the loaded settings configuration (read-only)."""
+    return _snapshot.settings
 
 def get_rates_config():
-    """Returns the loaded rates configuration."""
-    return _rates_config
+    """Returns the loaded rates configuration (read-only)."""
+    return _snapshot.rates
+
+def get_config_version():
+    """Returns a counter that changes whenever any configuration does."""
+    return _snapshot.version
 
 def get_emoji_config():
-    """Returns the loaded emoji configuration."""
-    return _emoji_config
+    """Returns the loaded emoji configuration (read-only)."""
+    return _snapshot.emoji
 
 def get_costs_config():
-    """Returns the loaded costs configuration."""
-    return _costs_config
+    """Returns the loaded costs configuration (read-only)."""
+    return _snapshot.costs
 
 # --- Updaters ---
-def update_settings_config(new_settings):
+def _write_config_file(file_path, data) -> Tuple[int, int]:
+    """Helper function to write a JSON configuration file, returns its new stamp."""
+    # Replaced whole, so the watcher never parses a half-written file
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, file_path)
+    return _file_stamp(file_path)
+
+async def _update_config(section, data):
+    """Validate, save and swap in one section; the watcher skips the file's new stamp."""
+    validate_config(section, data)
+    stamp = await run_io(_write_config_file, CONFIG_FILES[section], data)
+    _swap_snapshot({section: freeze_config(data)}, {section: stamp})
+
+async def update_settings_config(new_settings):
     """Updates the settings configuration and saves it to file."""
-    global _settings_config
     try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(new_settings, f, indent=2)
-        _settings_config = new_settings # Update in-memory config
+        await _update_config('settings', new_settings)
         return True
     except Exception as e:
         print(f"Error saving settings config: {e}")
         return False
 
-def update_emoji_config(new_emojis):
+async def update_emoji_config(new_emojis):
     """Updates the emoji configuration and saves it to file."""
-    global _emoji_config
     try:
-        with open(EMOJI_FILE, 'w', encoding='utf-8') as f:
-            json.dump(new_emojis, f, indent=2)
-        _emoji_config = new_emojis # Update in-memory config
+        await _update_config('emoji', new_emojis)
         return True
     except Exception as e:
         print(f"Error saving emoji config: {e}")
         return False
 
-def update_rates_config(new_rates):
+async def update_rates_config(new_rates):
     """Updates the rates configuration and saves it to file."""
-    global _rates_config
     try:
-        with open(RATES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(new_rates, f, indent=2)
-        _rates_config = new_rates # Update in-memory config
+        await _update_config('rates', new_rates) # Listeners drop samplers compiled from the old rates
         return True
     except Exception as e:
         print(f"Error saving rates config: {e}")
         return False
 
+# --- Watcher ---
+class ConfigWatcher:
+    """
+    Polls the config files every configPollSeconds and swaps in a snapshot
+    with the ones whose modification time or size changed. Files are parsed
+    and validated on the I/O threads; a file that fails is reported once and
+    the previous values stay in effect until it changes again.
+    """
+
+    def __init__(self):
+        # section -> stamp of a rejected file, so it is not re-read every poll
+        self._rejected: Dict[str, Tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> Optional[ConfigSnapshot]:
+        """Reload changed files now, returns the new snapshot or None if nothing changed"""
+        snapshot = _snapshot
+        sections, stamps, errors = await run_io(_read_config_files, {**snapshot.stamps, **self._rejected})
+        for section, (stamp, error) in errors.items():
+            self._rejected[section] = stamp
+            print(f"Ignoring invalid {section} configuration: {error}")
+        if not sections or _snapshot is not snapshot:
+            # An update was saved meanwhile; compare against it on the next poll
+            return None
+        for section in sections:
+            self._rejected.pop(section, None)
+        snapshot = _swap_snapshot(sections, stamps)
+        print(f"Reloaded {', '.join(sections)} configuration (version {snapshot.version})")
+        return snapshot
+
+    async def _run(self):
+        """Background task polling every configPollSeconds"""
+        while True:
+            await asyncio.sleep(get_config_poll_interval())
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error reloading configuration: {e}")
+
+    def start(self):
+        """Start polling (requires a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+_watcher: Optional[ConfigWatcher] = None
+
+def get_config_watcher() -> ConfigWatcher:
+    global _watcher
+    if _watcher is None:
+        _watcher = ConfigWatcher()
+    return _watcher
+
 # --- Specific Setting Getters ---
 
+def _startup_setting(key, default=None):
+    """A RESTART_SETTINGS value as the bot started with it"""
+    return (_startup_settings or {}).get(key, default)
+
+def get_currency_name():
+    """Returns the display name of the currency."""
+    return _snapshot.settings.get('currencyName', 'Coins')
+
 def get_fish_cooldown():
     """Returns the fishing cooldown in seconds."""
-    return _settings_config.get('fishCooldown', 60) # Default to 60 seconds
+    return _snapshot.settings.get('fishCooldown', 60) # Default to 60 seconds
 
 def get_wood_cooldown():
     """Returns the woodcutting cooldown in seconds."""
-    return _settings_config.get('chopCooldown', 60) # Default to 60 seconds
+    return _snapshot.settings.get('chopCooldown', 60) # Default to 60 seconds
 
 def get_golden_bite_chance():
     """Returns the golden bite chance as a percentage (e.g., 1.0 for 1%)."""
-    return _settings_config.get('goldenBiteChance', 1.0) # Default to 1%
+    return _snapshot.settings.get('goldenBiteChance', 1.0) # Default to 1%
+
+def get_cast_credit_cap():
+    """Returns how many casts or swings a player can bank while idle."""
+    return _snapshot.settings.get('castCreditCap', 10) # Default to 10
+
+def get_expedition_tick():
+    """Returns how often, in seconds, active expeditions are settled."""
+    return _snapshot.settings.get('expeditionTickSeconds', 60) # Default to 1 minute
+
+def get_expedition_hours():
+    """Returns how long an expedition gathers before it ends on its own."""
+    return _snapshot.settings.get('expeditionHours', 8) # Default to 8 hours
+
+def get_config_poll_interval():
+    """Returns how often, in seconds, the config files are checked for changes."""
+    return _snapshot.settings.get('configPollSeconds', 2) # Default to 2 seconds
 
 def get_timber_bite_chance():
     """Returns the timber bite chance as a percentage (e.g., 1.0 for 1%)."""
-    return _settings_config.get('timberBiteChance', 1.0) # Default to 1%
+    return _snapshot.settings.get('timberBiteChance', 1.0) # Default to 1%
+
+def get_user_cache_size():
+    """Returns the maximum number of user records kept in memory."""
+    return _snapshot.settings.get('userCacheSize', 5000)
+
+def get_durability_window():
+    """Returns how long (in seconds) a saved change may wait before it is durably written."""
+    return _snapshot.settings.get('durabilityWindowMs', 1000) / 1000 # Default to 1 second
+
+def get_flush_threshold():
+    """Returns how many changed user records trigger an early flush."""
+    return _snapshot.settings.get('flushThreshold', 100)
+
+def get_io_workers():
+    """Returns the size of the thread pool used for blocking file I/O."""
+    return _startup_setting('ioWorkers', 4)
+
+def get_scan_workers():
+    """Returns how many worker processes parse full-dataset scans (0 parses on the I/O threads)."""
+    return _startup_setting('scanWorkers', 2)
+
+def get_storage_backend_name():
+    """Returns the user storage backend ('json' or 'sqlite')."""
+    return _startup_setting('storageBackend', 'json')
+
+def get_sqlite_path():
+    """Returns the SQLite database path, relative to the project root."""
+    return _startup_setting('sqlitePath', 'data/users.db')
+
+def get_serialization_format():
+    """Returns the user record format ('json', 'compact' or 'binary')."""
+    return _snapshot.settings.get('serializationFormat', 'compact')
+
+def get_leaderboard_cache_ttl():
+    """Returns how long (in seconds) a rendered leaderboard page may be reused."""
+    return _snapshot.settings.get('leaderboardCacheTtl', 30)
+
+def get_journal_enabled():
+    """Returns whether game events are written to the append-only journal."""
+    return _startup_setting('journalEnabled', False)
+
+def get_journal_compaction_interval():
+    """Returns how often (in seconds) the journal is folded into snapshots."""
+    return _snapshot.settings.get('journalCompactionInterval', 300) # Default to 5 minutes
+
+def get_journal_segment_bytes():
+    """Returns the size at which a new journal segment is started."""
+    return _startup_setting('journalSegmentBytes', 4 * 1024 * 1024)
+
+def get_rng_seed():
+    """Returns the seed for per-user random streams, or None for a random one."""
+    return _snapshot.settings.get('rngSeed') # Default to a fresh seed per process
+
+def get_command_log_path():
+    """Returns where committed commands are recorded for replay, or None when off."""
+    return _startup_setting('commandLogPath')
 
 
 # Initial load when the module is imported.
-# This ensures configs are available immediately.
-# The load_all_configs() call in bot.py will re-load them on startup
-# and print the status messages.
+# This ensures configs are available immediately; after that the
+# ConfigWatcher started in bot.py picks up any changes to the files.
 try:
     load_all_configs()
 except FileNotFoundError as e:
-    print(f"Initial config load failed: {e}. Will retry on bot ready.")
+    print(f"Initial config load failed: {e}. Will retry once the file appears.")
 except Exception as e:
-    print(f"An unexpected error occurred during initial config load: {e}")
\ No newline at end of file
+    print(f"An unexpected error occurred during initial config load: {e}")
@@ -0,0 +1,85 @@
+"""
+In-memory cooldown index, checked before any storage access
+"""
+
+import math
+import time
+from typing import Any, Dict, Optional
+
+from .config import get_fish_cooldown, get_wood_cooldown
+from .persistence import get_user_store
+
+# activity -> (credit time in stats, cooldown getter)
+ACTIVITIES: Dict[str, tuple] = {
+    'fish': ('fishCreditTime', get_fish_cooldown),
+    'chop': ('chopCreditTime', get_wood_cooldown),
+}
+
+class CooldownIndex:
+    """
+    Each user's credit time, per activity, on the monotonic clock. A user
+    has a credit banked once a cooldown has passed since it, so entries are
+    dropped then and the table only holds players with no credit left right
+    now. Remaining time is computed against the current cooldown setting, so
+    /setcooldown applies at once. The records' credit times stay the source
+    of truth: the index only turns spam away early. It starts empty and
+    learns from commits, and from transactions whose own check caught a
+    cooldown the index missed (e.g. just after a restart).
+    """
+
+    def __init__(self):
+        self._last_action: Dict[str, Dict[int, float]] = {activity: {} for activity in ACTIVITIES}
+        # Sweep expired entries whenever the table doubles since the last sweep
+        self._sweep_at = 1024
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._last_action.values())
+
+    def remaining(self, user_id: int, activity: str) -> int:
+        """Whole seconds until the user may act again, 0 if they may now"""
+        entries = self._last_action[activity]
+        acted = entries.get(user_id)
+        if acted is None:
+            return 0
+        left = acted + ACTIVITIES[activity][1]() - time.monotonic()
+        if left <= 0:
+            del entries[user_id]
+            return 0
+        return math.ceil(left)
+
+    def record(self, user_id: int, activity: str, timestamp: int):
+        """Note a credit time, as the wall-clock timestamp stored in the record"""
+        acted = time.monotonic() - max(time.time() - timestamp, 0)
+        if acted + ACTIVITIES[activity][1]() <= time.monotonic():
+            self._last_action[activity].pop(user_id, None)
+            return
+        self._last_action[activity][user_id] = acted
+        if len(self) >= self._sweep_at:
+            self.sweep()
+
+    def update(self, user_id: int, user_data: Dict[str, Any]):
+        """Pick up new credit times from a committed record"""
+        stats = user_data['stats']
+        for activity, (field, _) in ACTIVITIES.items():
+            timestamp = stats.get(field, 0)
+            if timestamp:
+                self.record(user_id, activity, timestamp)
+
+    def sweep(self):
+        """Drop every entry whose cooldown has passed"""
+        now = time.monotonic()
+        for activity, entries in self._last_action.items():
+            cooldown = ACTIVITIES[activity][1]()
+            for user_id in [user_id for user_id, acted in entries.items() if acted + cooldown <= now]:
+                del entries[user_id]
+        self._sweep_at = max(2 * len(self), 1024)
+
+_index: Optional[CooldownIndex] = None
+
+def get_cooldown_index() -> CooldownIndex:
+    """The index, kept current from every commit once created"""
+    global _index
+    if _index is None:
+        _index = CooldownIndex()
+        get_user_store().add_commit_listener(_index.update)
+    return _index
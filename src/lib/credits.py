@@ -0,0 +1,40 @@
+"""
+Cooldown credits: a token bucket per activity
+
+A user's bucket is a single timestamp, the credit time. Every cooldown that
+passes after it adds one credit (one cast or swing), up to the cap, and
+spending n credits moves it n cooldowns forward. With a cap of 1 this is
+exactly a plain cooldown since the last action.
+"""
+
+from typing import Any, Dict, Optional
+
+from .config import get_cast_credit_cap
+
+def available_credits(credit_time: int, cooldown: int, now: int) -> int:
+    """Credits banked at now"""
+    cap = get_cast_credit_cap()
+    if cooldown <= 0:
+        return cap
+    return max(0, min(cap, (now - credit_time) // cooldown))
+
+def spend_credits(credit_time: int, cooldown: int, count: int, now: int) -> int:
+    """The credit time after spending count credits at now"""
+    # Credits beyond the cap were never banked
+    return max(credit_time, now - get_cast_credit_cap() * cooldown) + count * cooldown
+
+def expedition_in_progress(user_data: Dict[str, Any], activity: str) -> Optional[Dict[str, Any]]:
+    """
+    The failed result of a cast or swing while an expedition of that activity
+    runs: it spends the same credits, uncapped, so a manual one would clamp
+    away every roll it has not settled yet. None if there is no such expedition
+    """
+    state = user_data.get('expedition')
+    if not state or state['activity'] != activity:
+        return None
+    return {
+        'success': False,
+        'on_cooldown': False,
+        'on_expedition': True,
+        'ends': state['ends']
+    }
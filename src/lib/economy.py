@@ -2,9 +2,8 @@
 Economy calculations: upgrades, prices, selling
 """
 
-from typing import Dict, Tuple
-from .fishing import BASE_VALUES as FISH_BASE_VALUES, FISH_MULTIPLIERS
-from .woodcutting import BASE_VALUES as LOG_BASE_VALUES, LOG_MULTIPLIERS
+from typing import Dict, List, Tuple
+from .prices import get_item_price, get_item_buckets, add_inventory_items
 
 # Rod tier progression
 ROD_TIERS = ['Starter Rod', 'Speedster Rod', 'Challenge Rod', 'Legend Rod', 'Rod of The Sea', 'Yeti Rod', 'Bingo Rod', 'Bingo Rod Tier 2']
@@ -102,133 +101,76 @@ def get_upgrade_cost(upgrade_type: str, current_level: int) -> int | None:
     
     return cost_func(current_level)
 
-def calculate_inventory_value(inventory: Dict) -> int:
-    """Calculate total value of all fish in inventory"""
-    total_value = 0
-    
-    for rarity, fish_dict in inventory.get('Common', {}).items() if 'Common' in inventory else []:
-        base_value = FISH_BASE_VALUES.get(rarity, 0)
-        
-        for fish_type, count in fish_dict.items():
-            multiplier = FISH_MULTIPLIERS.get(fish_type, 1.0)
-            fish_value = int(base_value * multiplier)
-            total_value += fish_value * count
+def calculate_inventory_value(user_data: Dict, category: str = 'fish') -> int:
+    """Sell value of a user's fish or logs, from the maintained aggregates"""
+    return user_data['inventoryStats'][category]['value']
+
+def _sell_items(user_data: Dict, category: str, rarity: str = None, item_type: str = None, amount: int = None) -> Tuple[int, int]:
+    """Sell one item type, one rarity or everything of a category at costs.json prices"""
+    buckets = get_item_buckets(user_data, category)
+    if rarity and item_type:
+        available = buckets.get(rarity, {}).get(item_type, 0)
+        items = [(rarity, item_type, min(amount or available, available))]
+    elif rarity:
+        items = [(rarity, item_type, count) for item_type, count in buckets.get(rarity, {}).items()]
+    else:
+        items = [(rarity, item_type, count) for rarity, bucket in buckets.items() for item_type, count in bucket.items()]
+    items = [item for item in items if item[2] > 0]
     
-    return total_value
+    total_value = sum(get_item_price(category, item_type) * count for _, item_type, count in items)
+    apply_sale(user_data, category, items, total_value)
+    return total_value, sum(count for _, _, count in items)
 
 def sell_fish(user_data: Dict, rarity: str = None, fish_type: str = None, amount: int = None) -> Tuple[int, int]:
     """
     Sell fish from inventory
     Returns (total_value, fish_count)
     """
-    inventory = user_data['inventory']
-    total_value = 0
-    fish_count = 0
-    
-    if rarity and fish_type:
-        # Sell specific fish type
-        if rarity in inventory and fish_type in inventory[rarity]:
-            available = inventory[rarity][fish_type]
-            to_sell = min(amount or available, available)
-            
-            if to_sell > 0:
-                base_value = FISH_BASE_VALUES.get(rarity, 0)
-                multiplier = FISH_MULTIPLIERS.get(fish_type, 1.0)
-                fish_value = int(base_value * multiplier)
-                
-                total_value = fish_value * to_sell
-                fish_count = to_sell
-                
-                inventory[rarity][fish_type] -= to_sell
-                if inventory[rarity][fish_type] == 0:
-                    del inventory[rarity][fish_type]
-    
-    elif rarity:
-        # Sell all of a rarity
-        if rarity in inventory:
-            for fish_type, count in list(inventory[rarity].items()):
-                base_value = FISH_BASE_VALUES.get(rarity, 0)
-                multiplier = FISH_MULTIPLIERS.get(fish_type, 1.0)
-                fish_value = int(base_value * multiplier)
-                
-                total_value += fish_value * count
-                fish_count += count
-            
-            inventory[rarity] = {}
-    
-    else:
-        # Sell all fish
-        for rarity_tier in list(inventory.keys()):
-            if rarity_tier == 'woodcutting':
-                continue
-            for fish_type, count in list(inventory[rarity_tier].items()):
-                base_value = FISH_BASE_VALUES.get(rarity_tier, 0)
-                multiplier = FISH_MULTIPLIERS.get(fish_type, 1.0)
-                fish_value = int(base_value * multiplier)
-                
-                total_value += fish_value * count
-                fish_count += count
-            
-            inventory[rarity_tier] = {}
-    
-    user_data['currency'] += total_value
-    return total_value, fish_count
+    return _sell_items(user_data, 'fish', rarity, fish_type, amount)
 
 def sell_logs(user_data: Dict, rarity: str = None, log_type: str = None, amount: int = None) -> Tuple[int, int]:
     """
     Sell logs from inventory
     Returns (total_value, log_count)
     """
-    inventory = user_data['inventory'].get('woodcutting', {})
-    total_value = 0
-    log_count = 0
-    
-    if rarity and log_type:
-        # Sell specific log type
-        if rarity in inventory and log_type in inventory[rarity]:
-            available = inventory[rarity][log_type]
-            to_sell = min(amount or available, available)
-            
-            if to_sell > 0:
-                base_value = LOG_BASE_VALUES.get(rarity, 0)
-                multiplier = LOG_MULTIPLIERS.get(log_type, 1.0)
-                log_value = int(base_value * multiplier)
-                
-                total_value = log_value * to_sell
-                log_count = to_sell
-                
-                inventory[rarity][log_type] -= to_sell
-                if inventory[rarity][log_type] == 0:
-                    del inventory[rarity][log_type]
-    
-    elif rarity:
-        # Sell all of a rarity
-        if rarity in inventory:
-            for log_type, count in list(inventory[rarity].items()):
-                base_value = LOG_BASE_VALUES.get(rarity, 0)
-                multiplier = LOG_MULTIPLIERS.get(log_type, 1.0)
-                log_value = int(base_value * multiplier)
-                
-                total_value += log_value * count
-                log_count += count
-            
-            inventory[rarity] = {}
-    
+    return _sell_items(user_data, 'logs', rarity, log_type, amount)
+
+def get_inventory_items(user_data: Dict, category: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Get sellable items for 'fish' or 'logs'
+    Returns {item_type: (rarity, count)}
+    """
+    items = {}
+    for rarity, bucket in get_item_buckets(user_data, category).items():
+        for item_type, count in bucket.items():
+            if count > 0:
+                items[item_type] = (rarity, count)
+    return items
+
+def apply_sale(user_data: Dict, category: str, items: List[Tuple[str, str, int]], value: int):
+    """
+    Remove sold (rarity, item_type, count) entries and credit their value
+    Shared by /sell and journal replay
+    """
+    for rarity, item_type, count in items:
+        add_inventory_items(user_data, category, rarity, item_type, -count)
+    
+    user_data['currency'] += value
+
+def apply_purchase(user_data: Dict, upgrade_key: str, cost: int):
+    """Buy one level of a passive upgrade"""
+    user_data['currency'] -= cost
+    user_data['upgrades'].setdefault(upgrade_key, 0)
+    user_data['upgrades'][upgrade_key] += 1
+
+def apply_tier_upgrade(user_data: Dict, item: str, tier: str, cost: int):
+    """Move a rod or axe to a new tier"""
+    user_data['currency'] -= cost
+    if item == 'rod':
+        user_data['rod']['tier'] = tier
+        user_data['rod']['level'] = user_data['rod'].get('level', 1) + 1
     else:
-        # Sell all logs
-        for rarity_tier in list(inventory.keys()):
-            for log_type, count in list(inventory[rarity_tier].items()):
-                base_value = LOG_BASE_VALUES.get(rarity_tier, 0)
-                multiplier = LOG_MULTIPLIERS.get(log_type, 1.0)
-                log_value = int(base_value * multiplier)
-                
-                total_value += log_value * count
-                log_count += count
-            
-            inventory[rarity_tier] = {}
-    
-    user_data['currency'] += total_value
-    return total_value, log_count
+        user_data['axe']['tier'] = tier
 
 def get_shop_items() -> Dict:
     """Get available shop items with prices"""
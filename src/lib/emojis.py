@@ -4,6 +4,7 @@ Emoji resolution and formatting utilities
 
 from typing import Optional
 from .config import get_emoji_config
+from .catalog import get_catalog
 
 def get_emoji(category: str, name: str) -> str:
     """
@@ -27,10 +28,16 @@ def get_emoji(category: str, name: str) -> str:
 
 def get_fish_emoji(fish_type: str, rarity: str) -> str:
     """Get emoji for a specific fish"""
+    item = get_catalog().get('fish', fish_type)
+    if item is not None and item.rarity == rarity:
+        return item.emoji
     return get_emoji('fish', f"{fish_type}_{rarity.lower()}")
 
 def get_log_emoji(log_type: str, rarity: str) -> str:
     """Get emoji for a specific log"""
+    item = get_catalog().get('logs', log_type)
+    if item is not None and item.rarity == rarity:
+        return item.emoji
     return get_emoji('logs', f"{log_type}_{rarity.lower()}")
 
 def get_rod_emoji(rod_tier: str) -> str:
@@ -0,0 +1,63 @@
+"""
+Bounded thread pool for blocking file I/O, and the process pool for parsing scans
+"""
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_scan_pool: Optional[ProcessPoolExecutor] = None
+_scan_pool_disabled = False
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the shared I/O executor, sized from settings on first use"""
+    global _io_executor
+    if _io_executor is None:
+        from .config import get_io_workers
+        _io_executor = ThreadPoolExecutor(
+            max_workers=max(1, int(get_io_workers())),
+            thread_name_prefix='io'
+        )
+    return _io_executor
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking function on the I/O executor without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_io_executor(wait: bool = True):
+    """Shut down the I/O executor (it is recreated on next use)"""
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=wait)
+        _io_executor = None
+
+def get_scan_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process pool that parses full-dataset scans, or None if scanWorkers is 0"""
+    global _scan_pool
+    if _scan_pool is None and not _scan_pool_disabled:
+        from .config import get_scan_workers
+        workers = int(get_scan_workers())
+        if workers <= 0:
+            return None
+        # Spawned rather than forked, so workers don't inherit the bot's
+        # event loop, threads and open connections
+        _scan_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _scan_pool
+
+def shutdown_scan_pool(wait: bool = True):
+    """Shut down the scan process pool (it is recreated on next use)"""
+    global _scan_pool
+    if _scan_pool is not None:
+        _scan_pool.shutdown(wait=wait)
+        _scan_pool = None
+
+def disable_scan_pool(reason: Exception):
+    """Stop using worker processes for scans, e.g. after one failed to start"""
+    global _scan_pool_disabled
+    print(f"⚠️ Scan worker processes unavailable, parsing scans on I/O threads: {reason!r}")
+    _scan_pool_disabled = True
+    shutdown_scan_pool(wait=False)
@@ -0,0 +1,272 @@
+"""
+Idle expeditions, settled in batches by one central scheduler
+
+An expedition gathers as if the player cast or swung every cooldown: it runs
+on the same credit time as /fish and /chop, only without the cap, until it
+ends. Instead of a timer per player, a single scheduler task settles every
+active expedition each tick. Players are grouped by gear so each group's
+sampling table is looked up once, and settled records are committed together.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .config import (
+    get_fish_cooldown, get_wood_cooldown, get_cast_credit_cap, get_expedition_tick, get_expedition_hours
+)
+from .fishing import get_catch_sampler, apply_catches
+from .persistence import get_user_store, get_user_lock, load_users_data, record_event, scan_users
+from .rng import get_user_rng
+from .sampling import RollBatch
+from .woodcutting import get_harvest_sampler, apply_chops
+
+# Settled records committed per group before the tick yields to the event loop
+TICK_CHUNK = 1000
+
+class Expedition(NamedTuple):
+    """How one kind of expedition gathers"""
+    credit_field: str  # credit time in stats, shared with the active command
+    cooldown: Callable[[], int]
+    gear: Callable[[Dict[str, Any]], Tuple]  # (tier, upgrade levels) fed to sampler
+    sampler: Callable[..., Callable[..., RollBatch]]
+    apply: Callable[[Dict[str, Any], List[Tuple[str, str, int]], int, int], None]
+
+EXPEDITIONS: Dict[str, Expedition] = {
+    'fishing': Expedition(
+        'fishCreditTime', get_fish_cooldown,
+        lambda user_data: (
+            user_data['rod']['tier'],
+            user_data['upgrades'].get('hookSharpness', 0),
+            user_data['upgrades'].get('lineStrength', 0)
+        ),
+        get_catch_sampler, apply_catches
+    ),
+    'woodcutting': Expedition(
+        'chopCreditTime', get_wood_cooldown,
+        lambda user_data: (
+            user_data['axe']['tier'],
+            user_data['upgrades'].get('bladeSharpness', 0),
+            user_data['upgrades'].get('handleStrength', 0)
+        ),
+        get_harvest_sampler, apply_chops
+    ),
+}
+
+def start_expedition(user_data: Dict[str, Any], activity: str, now: int = None) -> Dict[str, Any]:
+    """
+    Send the user on an expedition; credits already banked go along with them
+    Returns result dict with the new expedition state
+    """
+    if user_data.get('expedition'):
+        return {'success': False, 'expedition': user_data['expedition']}
+
+    timestamp = int(time.time()) if now is None else now
+    expedition = EXPEDITIONS[activity]
+    stats = user_data['stats']
+    stats[expedition.credit_field] = max(
+        stats[expedition.credit_field], timestamp - get_cast_credit_cap() * expedition.cooldown()
+    )
+    user_data['expedition'] = {
+        'activity': activity,
+        'started': timestamp,
+        'ends': timestamp + int(get_expedition_hours() * 3600),
+        'rolls': 0,
+        'value': 0
+    }
+    user_data['lastExpedition'] = None
+    return {
+        'success': True,
+        'expedition': user_data['expedition'],
+        'credit': stats[expedition.credit_field]
+    }
+
+def settle_expedition(user_data: Dict[str, Any], now: int = None, sampler: Callable[..., RollBatch] = None,
+                      finish: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Roll every cooldown that has passed since the credit time, up to the end
+    of the expedition, and end it once that is reached (or now, if finish).
+    An expedition that runs out keeps its totals as lastExpedition until the
+    player collects them. sampler is the gear group's roller when the
+    scheduler already has it.
+    Returns the haul, or None when there is nothing to settle yet
+    """
+    state = user_data.get('expedition')
+    if not state:
+        return None
+
+    timestamp = int(time.time()) if now is None else now
+    expedition = EXPEDITIONS[state['activity']]
+    stats = user_data['stats']
+    cooldown = max(expedition.cooldown(), 1)
+    rolls = max(0, (min(timestamp, state['ends']) - stats[expedition.credit_field]) // cooldown)
+    finished = finish or timestamp >= state['ends']
+    if not rolls and not finished:
+        return None
+
+    if sampler is None:
+        sampler = expedition.sampler(*expedition.gear(user_data))
+    rng = get_user_rng(user_data)
+    batch = sampler(rolls, rng)
+    items = [(rarity, item_type, count) for (rarity, item_type), count in batch.counts.items()]
+    if items:
+        expedition.apply(user_data, items, batch.value, timestamp)
+    stats[expedition.credit_field] += rolls * cooldown
+
+    state = {**state, 'rolls': state['rolls'] + rolls, 'value': state['value'] + batch.value}
+    user_data['expedition'] = None if finished else state
+    haul = {
+        'activity': state['activity'],
+        'rolls': rolls,
+        'items': items,
+        'bites': batch.bites,
+        'value': batch.value,
+        'timestamp': timestamp,
+        'rng': rng.getstate(),
+        'credit': stats[expedition.credit_field],
+        'state': user_data['expedition'],
+        'totals': state
+    }
+    if finished and not finish:
+        # Usually settled by a tick while the player is away
+        user_data['lastExpedition'] = haul['last'] = state
+    return haul
+
+def stop_expedition(user_data: Dict[str, Any], now: int = None) -> Optional[Dict[str, Any]]:
+    """Settle and end the user's expedition, returns the final haul or None if there was none"""
+    return settle_expedition(user_data, now, finish=True)
+
+def collect_expedition(user_id: int, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Hand the totals of an expedition that ran out to the player, once,
+    inside their transaction. Returns them, or None if there are none
+    """
+    last = user_data.get('lastExpedition')
+    if last is not None:
+        user_data['lastExpedition'] = None
+        record_event(user_id, 'collect')
+    return last
+
+def record_haul(user_id: int, haul: Dict[str, Any]):
+    """Journal a settled haul inside the user's transaction"""
+    # Only an expedition that ran out carries 'last'
+    last = {'last': haul['last']} if 'last' in haul else {}
+    record_event(
+        user_id, 'haul',
+        activity=haul['activity'], items=haul['items'], value=haul['value'], ts=haul['timestamp'],
+        rolls=haul['rolls'], rng=haul['rng'], credit=haul['credit'], state=haul['state'], **last
+    )
+
+class ExpeditionScheduler:
+    """
+    The one task settling all active expeditions. Each tick loads the
+    uncached records in a single I/O job, groups them by activity and gear,
+    and commits each chunk of settled records as one group. Users with a
+    transaction in flight are skipped; being uncapped, their expedition
+    simply catches up on the next tick.
+    """
+
+    def __init__(self):
+        # user_id -> activity of every running expedition
+        self._active: Dict[int, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def update(self, user_id: int, user_data: Dict[str, Any]):
+        """Track expeditions started or ended by a committed record"""
+        state = user_data.get('expedition')
+        if state:
+            self._active[user_id] = state['activity']
+        else:
+            self._active.pop(user_id, None)
+
+    async def tick(self, now: int = None) -> int:
+        """Settle every active expedition, returns how many records changed"""
+        timestamp = int(time.time()) if now is None else now
+        store = get_user_store()
+        records = await load_users_data([
+            user_id for user_id in self._active if not get_user_lock(user_id).locked()
+        ])
+
+        groups: Dict[Tuple, List[int]] = defaultdict(list)
+        for user_id, user_data in records.items():
+            state = user_data.get('expedition')
+            if not state:
+                self._active.pop(user_id, None)
+                continue
+            groups[(state['activity'],) + EXPEDITIONS[state['activity']].gear(user_data)].append(user_id)
+
+        total = 0
+        settled = {}
+        for group, user_ids in groups.items():
+            sampler = EXPEDITIONS[group[0]].sampler(*group[1:])
+            for user_id in user_ids:
+                # The loaded copy may have been evicted, and reloaded by a command, meanwhile
+                user_data = store.get(user_id) or records[user_id]
+                state = user_data.get('expedition')
+                if get_user_lock(user_id).locked() or not state:
+                    continue
+                # A command between chunks may have changed gear or started another activity
+                expedition = EXPEDITIONS[state['activity']]
+                same_group = (state['activity'],) + expedition.gear(user_data) == group
+                if store.recorder is not None:
+                    store.recorder.begin(user_id, user_data)
+                haul = settle_expedition(user_data, timestamp, sampler if same_group else None)
+                if haul is None:
+                    continue
+                record_haul(user_id, haul)
+                settled[user_id] = user_data
+
+                if len(settled) >= TICK_CHUNK:
+                    store.commit_many(settled)
+                    total += len(settled)
+                    settled = {}
+                    await asyncio.sleep(0)
+        store.commit_many(settled)
+        return total + len(settled)
+
+    async def _run(self):
+        """Background task ticking every expeditionTickSeconds"""
+        while True:
+            await asyncio.sleep(get_expedition_tick())
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error settling expeditions: {e}")
+
+    def start(self):
+        """Start ticking (requires a running event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+_scheduler: Optional[ExpeditionScheduler] = None
+
+def get_expedition_scheduler() -> ExpeditionScheduler:
+    """The scheduler, kept current from every commit once created"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ExpeditionScheduler()
+        get_user_store().add_commit_listener(_scheduler.update)
+    return _scheduler
+
+async def rebuild_expeditions() -> int:
+    """Find the expeditions left running by the previous run, returns how many"""
+    scheduler = get_expedition_scheduler()
+    async for user_id, user_data in scan_users(['expedition']):
+        scheduler.update(user_id, user_data)
+    return len(scheduler)
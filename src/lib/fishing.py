@@ -4,8 +4,13 @@ Fishing mechanics: RNG, cooldowns, catch calculations
 
 import random
 import time
-from typing import Dict, Tuple, Optional
-from .config import get_rates_config, get_settings_config, get_fish_cooldown, get_golden_bite_chance
+from typing import Callable, Dict, List, Tuple, Optional
+from .config import add_config_listener, get_rates_config, get_settings_config, get_fish_cooldown, get_golden_bite_chance
+from .catalog import get_catalog
+from .credits import available_credits, expedition_in_progress, spend_credits
+from .prices import add_inventory_items
+from .rng import get_user_rng
+from .sampling import AliasTable, SamplerCache, RollBatch, build_item_table, roll_batch
 
 # Fish types by rarity
 FISH_TYPES = {
@@ -40,13 +45,13 @@ FISH_MULTIPLIERS = {
     'priceless': 1.0
 }
 
-def check_cooldown(last_fish_timestamp: int) -> Tuple[bool, int]:
+def check_cooldown(last_fish_timestamp: int, now: int = None) -> Tuple[bool, int]:
     """
     Check if user is on cooldown
     Returns (can_fish, remaining_seconds)
     """
     cooldown = get_fish_cooldown()
-    current_time = int(time.time())
+    current_time = int(time.time()) if now is None else now
     time_passed = current_time - last_fish_timestamp
     
     if time_passed >= cooldown:
@@ -88,49 +93,83 @@ def get_catch_weights(rod_tier: str, hook_sharpness: int, line_strength: int) ->
     
     return weights
 
-def roll_catch(rod_tier: str, hook_sharpness: int, line_strength: int) -> Tuple[str, str]:
+def _compile_catch_table(rod_tier: str, hook_sharpness: int, line_strength: int) -> AliasTable:
+    return build_item_table(get_catch_weights(rod_tier, hook_sharpness, line_strength), FISH_TYPES)
+
+# (tier, upgrade levels) -> compiled table, dropped whenever the rates change
+_catch_tables = SamplerCache(_compile_catch_table)
+add_config_listener(_catch_tables.clear, ('rates',))
+
+def roll_catch(rod_tier: str, hook_sharpness: int, line_strength: int, rng=random) -> Tuple[str, str]:
     """
     Roll for a catch
     Returns (rarity, fish_type)
     """
-    weights = get_catch_weights(rod_tier, hook_sharpness, line_strength)
-    
-    # Weighted random selection
-    rarities = list(weights.keys())
-    weight_values = list(weights.values())
-    
-    rarity = random.choices(rarities, weights=weight_values)[0]
-    fish_type = random.choice(FISH_TYPES[rarity])
-    
-    return rarity, fish_type
+    return _catch_tables.get(rod_tier, hook_sharpness, line_strength).sample(rng)
 
 def calculate_fish_value(rarity: str, fish_type: str, is_golden_bite: bool = False) -> int:
     """
     Calculate the value of a caught fish
     """
-    base_value = BASE_VALUES[rarity]
-    multiplier = FISH_MULTIPLIERS.get(fish_type, 1.0)
-    value = int(base_value * multiplier)
+    item = get_catalog().get('fish', fish_type)
+    if item is not None:
+        value = item.value
+    else:
+        value = int(BASE_VALUES[rarity] * FISH_MULTIPLIERS.get(fish_type, 1.0))
     
     if is_golden_bite:
         value *= 2
     
     return value
 
-def check_golden_bite() -> bool:
+def check_golden_bite(rng=random) -> bool:
     """
     Check if golden bite event triggers
     """
     chance = get_golden_bite_chance()
-    return random.random() < chance
+    return rng.random() < chance
+
+def get_catch_sampler(rod_tier: str, hook_sharpness: int, line_strength: int) -> Callable[..., RollBatch]:
+    """
+    Look up the table and values for one rod and upgrade combination once
+    Returns a function rolling (n, rng) catches with them, as roll_catches does
+    """
+    table = _catch_tables.get(rod_tier, hook_sharpness, line_strength)
+    values = [calculate_fish_value(rarity, item_type) for rarity, item_type in table.outcomes]
+    chance = get_golden_bite_chance()
+    return lambda n, rng=random: roll_batch(table, values, chance, n, rng)
+
+def roll_catches(rod_tier: str, hook_sharpness: int, line_strength: int, n: int, rng=random) -> RollBatch:
+    """
+    Roll n catches in one call
+    Returns counts per (rarity, type), the golden bite count and the total value
+    """
+    return get_catch_sampler(rod_tier, hook_sharpness, line_strength)(n, rng)
 
-def attempt_fish(user_data: Dict) -> Dict:
+def apply_catch(user_data: Dict, rarity: str, fish_type: str, value: int, timestamp: int):
     """
-    Perform a fishing attempt
-    Returns result dict with catch info
+    Apply a catch to a user's record
+    Shared by attempt_fish and journal replay
     """
-    # Check cooldown
-    can_fish, remaining = check_cooldown(user_data['stats']['lastFishTimestamp'])
+    user_data['stats']['totalCatches'] += 1
+    user_data['stats']['lastFishTimestamp'] = timestamp
+    user_data['currency'] += value
+    
+    # Add to inventory
+    add_inventory_items(user_data, 'fish', rarity, fish_type, 1)
+
+def attempt_fish(user_data: Dict, now: int = None) -> Dict:
+    """
+    Perform a fishing attempt, rolled from the user's own random stream
+    Returns result dict with catch info; now overrides the clock for replays
+    """
+    blocked = expedition_in_progress(user_data, 'fishing')
+    if blocked:
+        return blocked
+
+    # Check cooldown: at least one credit must be banked
+    timestamp = int(time.time()) if now is None else now
+    can_fish, remaining = check_cooldown(user_data['stats']['fishCreditTime'], timestamp)
     
     if not can_fish:
         return {
@@ -145,23 +184,18 @@ def attempt_fish(user_data: Dict) -> Dict:
     line_strength = user_data['upgrades'].get('lineStrength', 0)
     
     # Roll for catch
-    rarity, fish_type = roll_catch(rod_tier, hook_sharpness, line_strength)
+    rng = get_user_rng(user_data)
+    rarity, fish_type = roll_catch(rod_tier, hook_sharpness, line_strength, rng)
     
     # Check for golden bite
-    is_golden_bite = check_golden_bite()
+    is_golden_bite = check_golden_bite(rng)
     
     # Calculate value
     value = calculate_fish_value(rarity, fish_type, is_golden_bite)
     
     # Update user data
-    user_data['stats']['totalCatches'] += 1
-    user_data['stats']['lastFishTimestamp'] = int(time.time())
-    user_data['currency'] += value
-    
-    # Add to inventory
-    if fish_type not in user_data['inventory'][rarity]:
-        user_data['inventory'][rarity][fish_type] = 0
-    user_data['inventory'][rarity][fish_type] += 1
+    apply_catch(user_data, rarity, fish_type, value, timestamp)
+    user_data['stats']['fishCreditTime'] = spend_credits(user_data['stats']['fishCreditTime'], get_fish_cooldown(), 1, timestamp)
     
     return {
         'success': True,
@@ -169,5 +203,67 @@ def attempt_fish(user_data: Dict) -> Dict:
         'rarity': rarity,
         'fish_type': fish_type,
         'value': value,
-        'is_golden_bite': is_golden_bite
+        'is_golden_bite': is_golden_bite,
+        'timestamp': timestamp,
+        'rng': rng.getstate(),
+        'credit': user_data['stats']['fishCreditTime']
+    }
+
+def apply_catches(user_data: Dict, items: List[Tuple[str, str, int]], value: int, timestamp: int):
+    """
+    Apply a batch of (rarity, fish_type, count) catches to a user's record in one merge
+    Shared by attempt_fish_batch and journal replay
+    """
+    stats = user_data['stats']
+    stats['totalCatches'] += sum(count for _, _, count in items)
+    stats['lastFishTimestamp'] = timestamp
+    user_data['currency'] += value
+    
+    for rarity, fish_type, count in items:
+        add_inventory_items(user_data, 'fish', rarity, fish_type, count)
+
+def attempt_fish_batch(user_data: Dict, casts: int, now: int = None) -> Dict:
+    """
+    Spend up to casts banked credits in one go, rolled as one batch
+    Returns result dict with the aggregated catches; now overrides the clock for replays
+    """
+    blocked = expedition_in_progress(user_data, 'fishing')
+    if blocked:
+        return blocked
+
+    stats = user_data['stats']
+    timestamp = int(time.time()) if now is None else now
+    cooldown = get_fish_cooldown()
+    banked = available_credits(stats['fishCreditTime'], cooldown, timestamp)
+    if banked == 0:
+        _, remaining = check_cooldown(stats['fishCreditTime'], timestamp)
+        return {
+            'success': False,
+            'on_cooldown': True,
+            'remaining_seconds': remaining
+        }
+    
+    casts = min(casts, banked)
+    rng = get_user_rng(user_data)
+    batch = roll_catches(
+        user_data['rod']['tier'],
+        user_data['upgrades'].get('hookSharpness', 0),
+        user_data['upgrades'].get('lineStrength', 0),
+        casts, rng
+    )
+    items = [(rarity, fish_type, count) for (rarity, fish_type), count in batch.counts.items()]
+    apply_catches(user_data, items, batch.value, timestamp)
+    stats['fishCreditTime'] = spend_credits(stats['fishCreditTime'], cooldown, casts, timestamp)
+    
+    return {
+        'success': True,
+        'on_cooldown': False,
+        'casts': casts,
+        'banked': banked - casts,
+        'items': items,
+        'bites': batch.bites,
+        'value': batch.value,
+        'timestamp': timestamp,
+        'rng': rng.getstate(),
+        'credit': stats['fishCreditTime']
     }
@@ -0,0 +1,57 @@
+"""
+Guild membership index: which players belong to which guild
+"""
+
+from typing import Dict, List, Set
+
+_EMPTY: Set[int] = frozenset()
+
+class GuildMembership:
+    """
+    Guild -> members and member -> guilds, kept current from interactions and
+    member events. Only players are tracked, not every member of every guild.
+    """
+
+    def __init__(self):
+        self._members: Dict[int, Set[int]] = {}
+        self._guilds: Dict[int, Set[int]] = {}
+
+    def add(self, guild_id: int, user_id: int) -> bool:
+        """Record a membership, returns whether it was new"""
+        members = self._members.setdefault(guild_id, set())
+        if user_id in members:
+            return False
+        members.add(user_id)
+        self._guilds.setdefault(user_id, set()).add(guild_id)
+        return True
+
+    def remove(self, guild_id: int, user_id: int) -> bool:
+        """Forget a membership, returns whether it existed"""
+        members = self._members.get(guild_id)
+        if not members or user_id not in members:
+            return False
+        members.discard(user_id)
+        guilds = self._guilds[user_id]
+        guilds.discard(guild_id)
+        if not guilds:
+            del self._guilds[user_id]
+        return True
+
+    def remove_guild(self, guild_id: int) -> Set[int]:
+        """Forget a whole guild (the bot left it), returns its former members"""
+        members = self._members.pop(guild_id, set())
+        for user_id in members:
+            guilds = self._guilds[user_id]
+            guilds.discard(guild_id)
+            if not guilds:
+                del self._guilds[user_id]
+        return members
+
+    def guild_ids(self) -> List[int]:
+        return list(self._members)
+
+    def members(self, guild_id: int) -> Set[int]:
+        return self._members.get(guild_id, _EMPTY)
+
+    def guilds_of(self, user_id: int) -> Set[int]:
+        return self._guilds.get(user_id, _EMPTY)
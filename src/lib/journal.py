@@ -0,0 +1,195 @@
+"""
+Append-only journal of game events (catches, chops, sales, purchases, expeditions)
+"""
+
+import json
+import os
+from typing import Dict, Any, List, Iterator, Callable
+
+from .fishing import apply_catch, apply_catches
+from .woodcutting import apply_harvest, apply_chops
+from .economy import apply_sale, apply_purchase, apply_tier_upgrade
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+# Remembers the last sequence number once every segment has been removed
+CHECKPOINT_FILE = 'checkpoint'
+
+def _apply_haul(user_data: Dict[str, Any], e: Dict[str, Any]):
+    """An expedition settled: its catches or chops, then the expedition's new state"""
+    if e['items']:
+        apply = apply_catches if e['activity'] == 'fishing' else apply_chops
+        apply(user_data, e['items'], e['value'], e['ts'])
+    user_data['expedition'] = e['state']
+    if 'last' in e:
+        user_data['lastExpedition'] = e['last']
+
+def _apply_expedition(user_data: Dict[str, Any], e: Dict[str, Any]):
+    """An expedition started"""
+    user_data['expedition'] = e['state']
+    user_data['lastExpedition'] = None
+
+def _apply_meta(user_data: Dict[str, Any], e: Dict[str, Any]):
+    """A new user, name or schema upgrade; apply_event restores the username it carries"""
+
+def _apply_collect(user_data: Dict[str, Any], e: Dict[str, Any]):
+    """The player saw the totals of an expedition that ran out"""
+    user_data['lastExpedition'] = None
+
+# How each event kind is replayed onto a user record
+EVENT_APPLIERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {
+    'catch': lambda user_data, e: apply_catch(user_data, e['rarity'], e['item'], e['value'], e['ts']),
+    'chop': lambda user_data, e: apply_harvest(user_data, e['rarity'], e['item'], e['value'], e['ts']),
+    'catches': lambda user_data, e: apply_catches(user_data, e['items'], e['value'], e['ts']),
+    'chops': lambda user_data, e: apply_chops(user_data, e['items'], e['value'], e['ts']),
+    'sell': lambda user_data, e: apply_sale(user_data, e['category'], e['items'], e['value']),
+    'buy': lambda user_data, e: apply_purchase(user_data, e['upgrade'], e['cost']),
+    'tier': lambda user_data, e: apply_tier_upgrade(user_data, e['item'], e['tier'], e['cost']),
+    'haul': _apply_haul,
+    'expedition': _apply_expedition,
+    'collect': _apply_collect,
+    'meta': _apply_meta,
+}
+
+# Event kind, or expedition activity, -> the stats field its 'credit' restores
+CREDIT_FIELDS = {
+    'catch': 'fishCreditTime',
+    'catches': 'fishCreditTime',
+    'chop': 'chopCreditTime',
+    'chops': 'chopCreditTime',
+    'fishing': 'fishCreditTime',
+    'woodcutting': 'chopCreditTime',
+}
+
+def apply_event(user_data: Dict[str, Any], event: Dict[str, Any]):
+    """Replay one journal event onto a user record"""
+    EVENT_APPLIERS[event['kind']](user_data, event)
+    if 'rng' in event:
+        # Catches and chops record the user's random stream after their roll
+        user_data['rngState'] = list(event['rng'])
+    if 'credit' in event:
+        user_data['stats'][CREDIT_FIELDS[event.get('activity', event['kind'])]] = event['credit']
+    if 'username' in event:
+        user_data['username'] = event['username']
+    user_data['journalSeq'] = event['seq']
+
+def _encode_event(event: Dict[str, Any]) -> bytes:
+    """One compact JSON line per event"""
+    if orjson is not None:
+        return orjson.dumps(event) + b'\n'
+    return json.dumps(event, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+def _decode_event(line: bytes) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line.decode('utf-8'))
+
+class Journal:
+    """
+    Segmented append-only event log.
+    Events get a global sequence number when they are committed and are
+    appended in batches with one fsync per batch. Segments are named after the
+    first sequence number they hold; once their events are folded into
+    snapshots they are deleted.
+    All methods except next_seq() block and run on the I/O executor.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 4 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._last_seq = self._read_checkpoint()
+        for path in self.segments():
+            for event in self._read_segment(path):
+                self._last_seq = max(self._last_seq, event['seq'])
+        self._file = None
+        self._file_path = None
+
+    def next_seq(self) -> int:
+        """Allocate the next sequence number"""
+        self._last_seq += 1
+        return self._last_seq
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first"""
+        names = [
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        ]
+        return [os.path.join(self.directory, name) for name in sorted(names)]
+
+    def append(self, events: List[Dict[str, Any]]):
+        """Append a batch of events durably"""
+        if not events:
+            return
+        if self._file is None:
+            self._file_path = os.path.join(
+                self.directory, f"{SEGMENT_PREFIX}{events[0]['seq']:012d}{SEGMENT_SUFFIX}"
+            )
+            self._file = open(self._file_path, 'ab')
+
+        self._file.write(b''.join(_encode_event(event) for event in events))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        if self._file.tell() >= self.segment_bytes:
+            self.rotate()
+
+    def rotate(self) -> List[str]:
+        """Close the active segment; returns every segment that is now closed"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_path = None
+        return self.segments()
+
+    def _read_segment(self, path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    yield _decode_event(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append; nothing after it was acknowledged
+                    print(f"⚠️ Skipping unreadable journal entry in {path}")
+
+    def read_events(self, paths: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield events from the given (default: all) segments in order"""
+        for path in paths if paths is not None else self.segments():
+            yield from self._read_segment(path)
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(os.path.join(self.directory, CHECKPOINT_FILE), 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_checkpoint(self):
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(self._last_seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def remove_segments(self, paths: List[str]):
+        """Delete segments whose events have been folded into snapshots"""
+        # Sequence numbers must keep increasing after the segments are gone
+        self._write_checkpoint()
+        for path in paths:
+            if path == self._file_path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.rotate()
@@ -2,70 +2,342 @@
 Leaderboard generation and ranking
 """
 
-from typing import Dict, List, Tuple
-from .persistence import load_all_users
-from .economy import get_rod_tier_index
+import asyncio
+import itertools
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+from .persistence import scan_users, get_user_store
+from .economy import ROD_TIERS, AXE_TIERS, get_rod_tier_index, get_axe_tier_index
+from .guilds import GuildMembership
+from .ranking import RankedSet
 
-async def get_richest_leaderboard(limit: int = 10) -> List[Tuple[str, int, int]]:
+class Metric(NamedTuple):
+    """A ranked value: the record fields it reads and its score (higher ranks first)"""
+    fields: Tuple[str, ...]
+    score: Callable[[Dict[str, Any]], int]
+
+# Register new metrics with register_metric() before the index is built
+LEADERBOARD_METRICS: Dict[str, Metric] = {
+    'currency': Metric(('currency',), lambda user_data: user_data['currency']),
+    'totalCatches': Metric(('stats.totalCatches',), lambda user_data: user_data['stats']['totalCatches']),
+    'totalChops': Metric(('stats.totalChops',), lambda user_data: user_data['stats']['totalChops']),
+    'rodTier': Metric(('rod.tier',), lambda user_data: get_rod_tier_index(user_data['rod']['tier'])),
+    'axeTier': Metric(('axe.tier',), lambda user_data: get_axe_tier_index(user_data['axe']['tier'])),
+    # inventoryValue is maintained on every catch, chop and sale, so this ranks like currency
+    'netWorth': Metric(('currency', 'inventoryValue'), lambda user_data: user_data['currency'] + user_data['inventoryValue']),
+}
+
+def register_metric(name: str, fields: Tuple[str, ...], score: Callable[[Dict[str, Any]], int]):
+    """Add a ranked metric; an already built index picks it up on its next rebuild"""
+    LEADERBOARD_METRICS[name] = Metric(tuple(fields), score)
+
+# Ranking versions come from one counter, so a rebuilt or re-created index
+# never reuses a version an older one already handed out
+_versions = itertools.count(1)
+
+class LeaderboardIndex:
+    """
+    Per-metric rankings of a set of users, kept current from the save path.
+    Each metric is a RankedSet of (-score, user_id) keys, so ascending order
+    is best first and ties go to the earlier account.
+    """
+
+    def __init__(self, metrics: Dict[str, Metric] = None):
+        self.metrics = dict(metrics if metrics is not None else LEADERBOARD_METRICS)
+        self._rankings: Dict[str, RankedSet] = {name: RankedSet() for name in self.metrics}
+        self._scores: Dict[str, Dict[int, int]] = {name: {} for name in self.metrics}
+        self._usernames: Dict[int, str] = {}
+        # Changes whenever a metric's order or a ranked username changes
+        self.versions: Dict[str, int] = {name: next(_versions) for name in self.metrics}
+
+    def __len__(self) -> int:
+        return len(self._usernames)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._usernames
+
+    def update(self, user_id: int, user_data: Dict[str, Any]):
+        """Re-rank a user after their record changed"""
+        scores = {name: metric.score(user_data) for name, metric in self.metrics.items()}
+        self._set_scores(user_id, user_data['username'], scores)
+
+    def copy_user(self, source: 'LeaderboardIndex', user_id: int):
+        """Rank a user with the scores another index already holds for them"""
+        scores = {name: source._scores[name][user_id] for name in self.metrics}
+        self._set_scores(user_id, source.username(user_id), scores)
+
+    def _set_scores(self, user_id: int, username: str, new_scores: Dict[str, int]):
+        renamed = self._usernames.get(user_id) != username
+        self._usernames[user_id] = username
+        for name, score in new_scores.items():
+            scores = self._scores[name]
+            old_score = scores.get(user_id)
+            if old_score == score:
+                if renamed:
+                    self.versions[name] = next(_versions)
+                continue
+            ranking = self._rankings[name]
+            if old_score is not None:
+                ranking.discard((-old_score, user_id))
+            ranking.add((-score, user_id))
+            scores[user_id] = score
+            self.versions[name] = next(_versions)
+
+    @property
+    def fields(self) -> List[str]:
+        """Every record field the metrics read, plus the username"""
+        fields = {'username'}
+        for metric in self.metrics.values():
+            fields.update(metric.fields)
+        return sorted(fields)
+
+    def remove(self, user_id: int):
+        """Drop a user from every ranking"""
+        if self._usernames.pop(user_id, None) is None:
+            return
+        for name in self.metrics:
+            score = self._scores[name].pop(user_id, None)
+            if score is not None:
+                self._rankings[name].discard((-score, user_id))
+                self.versions[name] = next(_versions)
+
+    def username(self, user_id: int) -> str:
+        return self._usernames.get(user_id, f'User{user_id}')
+
+    def top(self, metric: str, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """Best (user_id, score) pairs, starting at a 0-based position"""
+        return [(user_id, -neg_score) for neg_score, user_id in self._rankings[metric].slice(offset, limit)]
+
+    def rank(self, metric: str, user_id: int) -> Optional[int]:
+        """A user's 0-based position, or None if they aren't ranked"""
+        score = self._scores[metric].get(user_id)
+        if score is None:
+            return None
+        return self._rankings[metric].rank((-score, user_id))
+
+    def around(self, metric: str, position: int, radius: int = 2) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Entries within radius of a 0-based position
+        Returns (position of the first entry, [(user_id, score)])
+        """
+        start = max(position - radius, 0)
+        return start, self.top(metric, position - start + radius + 1, start)
+
+    def score(self, metric: str, user_id: int) -> Optional[int]:
+        return self._scores[metric].get(user_id)
+
+    def size(self, metric: str) -> int:
+        return len(self._rankings[metric])
+
+# Rows per leaderboard page, and how many pages a snapshot holds
+PAGE_SIZE = 10
+SNAPSHOT_PAGES = 10
+
+class LeaderboardSnapshot:
+    """
+    A frozen window of one ranking that leaderboard pages are served from, so
+    paging back and forth is consistent and doesn't touch the index.
+    Rows are (position, username, user_id, score) with 1-based positions.
+    """
+
+    def __init__(self, metric: str, guild_id: Optional[int], start: int,
+                 rows: List[Tuple[int, str, int, int]], total: int, version: int):
+        self.metric = metric
+        self.guild_id = guild_id
+        self.start = start
+        self.rows = rows
+        self.total = total
+        self.version = version
+
+    @property
+    def page_count(self) -> int:
+        return max((self.total + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+
+    def has_page(self, page: int) -> bool:
+        """Whether a 1-based page lies inside this window"""
+        first = (page - 1) * PAGE_SIZE
+        return self.start <= first and (first + PAGE_SIZE <= self.start + len(self.rows) or
+                                        self.start + len(self.rows) >= self.total)
+
+    def page(self, page: int) -> List[Tuple[int, str, int, int]]:
+        first = (page - 1) * PAGE_SIZE - self.start
+        return self.rows[first:first + PAGE_SIZE]
+
+_index: Optional[LeaderboardIndex] = None
+_index_lock = asyncio.Lock()
+
+# Players per guild, and a LeaderboardIndex over each guild's players
+_membership = GuildMembership()
+_guild_indexes: Dict[int, LeaderboardIndex] = {}
+# Served for guilds with no indexed players yet
+_empty_index: Optional[LeaderboardIndex] = None
+
+async def rebuild_leaderboard_index() -> LeaderboardIndex:
+    """Build the index from every stored user and keep it current from then on"""
+    global _index
+    async with _index_lock:
+        index = LeaderboardIndex()
+        # Only the ranked fields are parsed out; cached records overlay storage
+        async for user_id, user_data in scan_users(index.fields):
+            index.update(user_id, user_data)
+
+        if _index is None:
+            get_user_store().add_commit_listener(_on_commit)
+        _index = index
+
+        _guild_indexes.clear()
+        for guild_id in _membership.guild_ids():
+            for user_id in _membership.members(guild_id):
+                if user_id in index:
+                    _get_guild_index(guild_id).copy_user(index, user_id)
+        return index
+
+async def get_leaderboard_index(guild_id: int = None) -> LeaderboardIndex:
+    """Get the global leaderboard index (built on first use), or a guild's"""
+    index = _index if _index is not None else await rebuild_leaderboard_index()
+    if guild_id is None:
+        return index
+    guild_index = _guild_indexes.get(guild_id)
+    if guild_index is None:
+        # A guild without players yet shares one empty index, so its versions stay put
+        return _get_empty_index()
+    return guild_index
+
+def _get_empty_index() -> LeaderboardIndex:
+    global _empty_index
+    if _empty_index is None or _empty_index.metrics != LEADERBOARD_METRICS:
+        _empty_index = LeaderboardIndex()
+    return _empty_index
+
+def _get_guild_index(guild_id: int) -> LeaderboardIndex:
+    guild_index = _guild_indexes.get(guild_id)
+    if guild_index is None:
+        guild_index = _guild_indexes[guild_id] = LeaderboardIndex()
+    return guild_index
+
+def _on_commit(user_id: int, user_data: Dict[str, Any]):
+    if _index is None:
+        return
+    _index.update(user_id, user_data)
+    for guild_id in _membership.guilds_of(user_id):
+        _get_guild_index(guild_id).update(user_id, user_data)
+
+def add_guild_member(guild_id: int, user_id: int):
+    """Note that a player belongs to a guild (from an interaction or a member event)"""
+    if not _membership.add(guild_id, user_id):
+        return
+    # Players without a record yet are ranked by their first commit
+    if _index is not None and user_id in _index:
+        _get_guild_index(guild_id).copy_user(_index, user_id)
+
+def seed_guild_members(guild_id: int, member_ids: Iterable[int]):
+    """Add the players among a guild's cached members (on startup)"""
+    if _index is None:
+        return
+    for user_id in member_ids:
+        if user_id in _index:
+            add_guild_member(guild_id, user_id)
+
+def remove_guild_member(guild_id: int, user_id: int):
+    """A member left the guild"""
+    if _membership.remove(guild_id, user_id):
+        guild_index = _guild_indexes.get(guild_id)
+        if guild_index is not None:
+            guild_index.remove(user_id)
+
+def remove_guild(guild_id: int):
+    """The bot left a guild"""
+    _membership.remove_guild(guild_id)
+    _guild_indexes.pop(guild_id, None)
+
+async def get_richest_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, int]]:
     """
-    Get top users by currency
+    Get top users by currency, across all guilds or within one
     Returns list of (username, user_id, currency)
     """
-    users = await load_all_users()
-    
-    sorted_users = sorted(
-        users.items(),
-        key=lambda x: x[1].get('currency', 0),
-        reverse=True
-    )
-    
-    leaderboard = []
-    for user_id, data in sorted_users[:limit]:
-        username = data.get('username', f'User{user_id}')
-        currency = data.get('currency', 0)
-        leaderboard.append((username, user_id, currency))
-    
-    return leaderboard
-
-async def get_catches_leaderboard(limit: int = 10) -> List[Tuple[str, int, int]]:
-    """
-    Get top users by total catches
+    index = await get_leaderboard_index(guild_id)
+    return [(index.username(user_id), user_id, currency) for user_id, currency in index.top('currency', limit)]
+
+async def get_catches_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, int]]:
+    """
+    Get top users by total catches, across all guilds or within one
     Returns list of (username, user_id, total_catches)
     """
-    users = await load_all_users()
-    
-    sorted_users = sorted(
-        users.items(),
-        key=lambda x: x[1].get('stats', {}).get('totalCatches', 0),
-        reverse=True
-    )
-    
-    leaderboard = []
-    for user_id, data in sorted_users[:limit]:
-        username = data.get('username', f'User{user_id}')
-        catches = data.get('stats', {}).get('totalCatches', 0)
-        leaderboard.append((username, user_id, catches))
-    
-    return leaderboard
-
-async def get_rod_leaderboard(limit: int = 10) -> List[Tuple[str, int, str, int]]:
-    """
-    Get top users by rod tier
+    index = await get_leaderboard_index(guild_id)
+    return [(index.username(user_id), user_id, catches) for user_id, catches in index.top('totalCatches', limit)]
+
+async def get_chops_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, int]]:
+    """
+    Get top users by total chops, across all guilds or within one
+    Returns list of (username, user_id, total_chops)
+    """
+    index = await get_leaderboard_index(guild_id)
+    return [(index.username(user_id), user_id, chops) for user_id, chops in index.top('totalChops', limit)]
+
+async def get_rod_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, str, int]]:
+    """
+    Get top users by rod tier, across all guilds or within one
     Returns list of (username, user_id, rod_tier, tier_index)
     """
-    users = await load_all_users()
-    
-    sorted_users = sorted(
-        users.items(),
-        key=lambda x: get_rod_tier_index(x[1].get('rod', {}).get('tier', 'Starter Rod')),
-        reverse=True
-    )
-    
-    leaderboard = []
-    for user_id, data in sorted_users[:limit]:
-        username = data.get('username', f'User{user_id}')
-        rod_tier = data.get('rod', {}).get('tier', 'Starter Rod')
-        tier_index = get_rod_tier_index(rod_tier)
-        leaderboard.append((username, user_id, rod_tier, tier_index))
-    
-    return leaderboard
+    index = await get_leaderboard_index(guild_id)
+    return [
+        (index.username(user_id), user_id, ROD_TIERS[tier_index], tier_index)
+        for user_id, tier_index in index.top('rodTier', limit)
+    ]
+
+async def get_axe_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, str, int]]:
+    """
+    Get top users by axe tier, across all guilds or within one
+    Returns list of (username, user_id, axe_tier, tier_index)
+    """
+    index = await get_leaderboard_index(guild_id)
+    return [
+        (index.username(user_id), user_id, AXE_TIERS[tier_index], tier_index)
+        for user_id, tier_index in index.top('axeTier', limit)
+    ]
+
+async def get_networth_leaderboard(limit: int = 10, guild_id: int = None) -> List[Tuple[str, int, int]]:
+    """
+    Get top users by net worth (currency plus inventory sell value), across all guilds or within one
+    Returns list of (username, user_id, net_worth)
+    """
+    index = await get_leaderboard_index(guild_id)
+    return [(index.username(user_id), user_id, net_worth) for user_id, net_worth in index.top('netWorth', limit)]
+
+async def get_leaderboard_snapshot(metric: str, page: int = 1, guild_id: int = None) -> LeaderboardSnapshot:
+    """
+    Snapshot SNAPSHOT_PAGES pages of a ranking, starting at a 1-based page
+    (clamped to the last page). Costs O(log N + rows).
+    """
+    index = await get_leaderboard_index(guild_id)
+    total = index.size(metric)
+    last_page = max((total + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+    start = (min(max(page, 1), last_page) - 1) * PAGE_SIZE
+
+    rows = [
+        (start + offset + 1, index.username(user_id), user_id, score)
+        for offset, (user_id, score) in enumerate(index.top(metric, PAGE_SIZE * SNAPSHOT_PAGES, start))
+    ]
+    return LeaderboardSnapshot(metric, guild_id, start, rows, total, index.versions[metric])
+
+async def get_ranking_version(metric: str, guild_id: int = None) -> int:
+    """Current version of a ranking, for invalidating anything rendered from it"""
+    index = await get_leaderboard_index(guild_id)
+    return index.versions[metric]
+
+async def get_user_rank(metric: str, user_id: int, guild_id: int = None, radius: int = 2):
+    """
+    Where a user stands in a ranking
+    Returns (position, score, total, neighbours) with 1-based positions and
+    neighbours as (position, username, user_id, score), or None if unranked
+    """
+    index = await get_leaderboard_index(guild_id)
+    position = index.rank(metric, user_id)
+    if position is None:
+        return None
+
+    start, entries = index.around(metric, position, radius)
+    neighbours = [
+        (start + offset + 1, index.username(other_id), other_id, score)
+        for offset, (other_id, score) in enumerate(entries)
+    ]
+    return position + 1, index.score(metric, user_id), index.size(metric), neighbours
@@ -0,0 +1,22 @@
+"""
+Process-wide counters for operational metrics
+"""
+
+from collections import defaultdict
+from typing import Dict, Optional
+
+_counters: Dict[str, int] = defaultdict(int)
+
+def increment(name: str, amount: int = 1):
+    """Add to a named counter"""
+    _counters[name] += amount
+
+def get_counters() -> Dict[str, int]:
+    """Snapshot of every counter"""
+    return dict(_counters)
+
+def hit_rate(name: str) -> Optional[float]:
+    """Share of '<name>.hits' among hits and '<name>.misses', or None before any lookup"""
+    hits = _counters.get(f"{name}.hits", 0)
+    lookups = hits + _counters.get(f"{name}.misses", 0)
+    return hits / lookups if lookups else None
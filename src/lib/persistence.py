@@ -2,132 +2,1449 @@
 Data persistence - User data loading and saving
 """
 
+import asyncio
+import copy
+import hashlib
 import json
 import os
-from typing import Dict, Any
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple, AsyncIterator, Callable
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'users')
+from .config import (
+    get_user_cache_size, get_durability_window, get_flush_threshold, get_io_workers,
+    get_scan_workers, get_storage_backend_name, get_sqlite_path, get_serialization_format,
+    get_journal_enabled, get_journal_compaction_interval, get_journal_segment_bytes, add_config_listener
+)
+from .economy import get_rod_tier_index
+from .executor import run_io, get_io_executor, get_scan_pool, disable_scan_pool
+from .journal import Journal, apply_event
+from .schema import SCHEMA_VERSION, RARITIES, migrate_user_data
+from .prices import get_prices_version, new_inventory_stats, revalue_inventory
+from .rng import new_rng_state
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional, the struct layout is used without it
+    msgpack = None
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+LEGACY_DATA_DIR = os.path.join(ROOT_DIR, 'data')
+DATA_DIR = os.path.join(LEGACY_DATA_DIR, 'users')
+JOURNAL_DIR = os.path.join(LEGACY_DATA_DIR, 'journal')
+
+# User files live two directory levels down, e.g. users/3f/a2/<user_id>.json,
+# so no directory grows past a few hundred entries even with millions of users
+SHARD_LEVELS = 2
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+# Shard directories already created by this process
+_known_shard_dirs = set()
 
 def ensure_data_dir():
     """Ensure the data directory exists"""
     os.makedirs(DATA_DIR, exist_ok=True)
 
+def get_shard(user_id: int) -> str:
+    """
+    Relative shard directory for a user.
+    The id is hashed because Discord snowflakes end in mostly-zero counter bits
+    and start with a timestamp, so neither end of the id spreads evenly.
+    """
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=SHARD_LEVELS).hexdigest()
+    return os.path.join(*(digest[i * 2:i * 2 + 2] for i in range(SHARD_LEVELS)))
+
 def get_user_file_path(user_id: int) -> str:
     """Get the file path for a user's data"""
+    return os.path.join(DATA_DIR, get_shard(user_id), f"{user_id}.json")
+
+def get_flat_user_file_path(user_id: int) -> str:
+    """Where a user's file lived before the data directory was sharded"""
     return os.path.join(DATA_DIR, f"{user_id}.json")
 
-async def load_user_data(user_id: int, username: str = None) -> Dict[str, Any]:
-    """Load user data, creating default if doesn't exist"""
-    ensure_data_dir()
-    file_path = get_user_file_path(user_id)
-    
-    if not os.path.exists(file_path):
-        # Create default user data
-        user_data = {
-            'user_id': user_id,
-            'username': username or f"User{user_id}",
-            'currency': 0,
-            'rod': {
-                'tier': 'Starter Rod',
-                'level': 1
-            },
-            'axe': {
-                'tier': 'Starter Axe'
-            },
-            'upgrades': {
-                'hookSharpness': 0,
-                'lineStrength': 0,
-                'bladeSharpness': 0,
-                'handleStrength': 0
-            },
-            'inventory': {
-                'Common': {},
-                'Uncommon': {},
-                'Rare': {},
-                'Epic': {},
-                'Legendary': {},
-                'Mythic': {},
-                'woodcutting': {}
-            },
-            'stats': {
-                'totalCatches': 0,
-                'totalChops': 0,
-                'lastFishTimestamp': 0,
-                'lastChopTimestamp': 0
-            }
-        }
-        await save_user_data(user_id, user_data)
-        return user_data
-    
+def _ensure_shard_dir(directory: str):
+    """Create a shard directory (and make its entry durable) the first time it's used"""
+    if directory in _known_shard_dirs:
+        return
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+        _fsync_directory(os.path.dirname(directory))
+        _fsync_directory(os.path.dirname(os.path.dirname(directory)))
+    _known_shard_dirs.add(directory)
+
+def _adopt_flat_file(user_id: int, file_path: str) -> bool:
+    """
+    Move a user's file from the flat layout into its shard.
+    This is the online migration: files move on first access, so existing data
+    directories keep working without a maintenance window.
+    Returns whether there was a file to move.
+    """
+    flat_path = get_flat_user_file_path(user_id)
+    if not os.path.exists(flat_path):
+        return False
+    _ensure_shard_dir(os.path.dirname(file_path))
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Ensure all required fields exist
-            data.setdefault('user_id', user_id)
-            data.setdefault('username', username or f"User{user_id}")
-            data.setdefault('currency', 0)
-            data.setdefault('rod', {'tier': 'Starter Rod', 'level': 1})
-            data.setdefault('axe', {'tier': 'Starter Axe'})
-            data.setdefault('upgrades', {})
-            data.setdefault('inventory', {
-                'Common': {}, 'Uncommon': {}, 'Rare': {}, 'Epic': {},
-                'Legendary': {}, 'Mythic': {}, 'woodcutting': {}
-            })
-            data.setdefault('stats', {
-                'totalCatches': 0, 'totalChops': 0,
-                'lastFishTimestamp': 0, 'lastChopTimestamp': 0
-            })
-            
-            # Update username if provided
-            if username and username != data['username']:
-                data['username'] = username
-                await save_user_data(user_id, data)
-                
-            return data
-    except Exception as e:
-        print(f"Error loading user data for {user_id}: {e}")
-        # Return default data
-        return await load_user_data(user_id, username)
+        os.replace(flat_path, file_path)
+    except FileNotFoundError:
+        # Moved by a concurrent reader in the meantime
+        return os.path.exists(file_path)
+    _fsync_directory(os.path.dirname(file_path))
+    _fsync_directory(DATA_DIR)
+    return True
 
-async def save_user_data(user_id: int, user_data: Dict[str, Any]) -> bool:
-    """Save user data to file"""
+def _is_shard_name(name: str) -> bool:
+    return len(name) == 2 and _HEX_DIGITS.issuperset(name)
+
+def _bounded_map(pool: Executor, func: Callable, items: Iterable, window: int) -> Iterator:
+    """Like pool.map(), but only pulls items while fewer than window results are in flight"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _parallel_map(func: Callable, items: Iterable, workers: int) -> Iterator:
+    """
+    Map over a private thread pool with at most 2 * workers results in flight,
+    so a slow consumer doesn't pile up memory. Full scans already run on the
+    I/O executor, which is why they don't submit to it themselves.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan') as pool:
+        yield from _bounded_map(pool, func, items, workers * 2)
+
+def _scan_shard(shard_dir: str) -> List[str]:
+    """All user files below one top-level shard directory"""
+    paths = []
+    with os.scandir(shard_dir) as subdirs:
+        for subdir in subdirs:
+            if not subdir.is_dir() or not _is_shard_name(subdir.name):
+                continue
+            with os.scandir(subdir.path) as entries:
+                paths.extend(
+                    entry.path for entry in entries
+                    if entry.name.endswith('.json') and entry.is_file()
+                )
+    return paths
+
+def walk_user_files(root: str = None, workers: int = None) -> Iterator[str]:
+    """
+    Yield the path of every user file under the data directory.
+    Files still in the flat layout come first; the top-level shards are then
+    listed in parallel.
+    """
+    root = root or DATA_DIR
+    if not os.path.isdir(root):
+        return
+
+    shard_dirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                yield entry.path
+            elif _is_shard_name(entry.name) and entry.is_dir():
+                shard_dirs.append(entry.path)
+
+    for paths in _parallel_map(_scan_shard, shard_dirs, workers or get_io_workers()):
+        yield from paths
+
+# --- Serialization ---
+
+class SerializationError(ValueError):
+    """Raised when a stored payload can't be decoded"""
+
+# Binary payloads start with this magic plus a layout byte, which can never
+# begin a JSON document - that is how mixed directories are read
+BINARY_MAGIC = b'\xffMF'
+_LAYOUT_MSGPACK = b'M'
+_LAYOUT_STRUCT = b'S'
+
+class Serializer:
+    """Turns user records into bytes and back"""
+
+    name = 'base'
+
+    def dumps(self, user_data: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        return decode_payload(payload)
+
+class JsonSerializer(Serializer):
+    """Indented JSON, the original human-readable format"""
+
+    name = 'json'
+
+    def dumps(self, user_data: Dict[str, Any]) -> bytes:
+        return json.dumps(user_data, indent=2, ensure_ascii=False).encode('utf-8')
+
+class CompactJsonSerializer(Serializer):
+    """JSON without whitespace, using orjson when it is installed"""
+
+    name = 'compact'
+
+    def dumps(self, user_data: Dict[str, Any]) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(user_data)
+        return json.dumps(user_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class BinarySerializer(Serializer):
+    """
+    Binary records: msgpack when installed, otherwise a tagged struct layout.
+    Both are prefixed with BINARY_MAGIC so they can be told apart on read.
+    """
+
+    name = 'binary'
+
+    def dumps(self, user_data: Dict[str, Any]) -> bytes:
+        if msgpack is not None:
+            return BINARY_MAGIC + _LAYOUT_MSGPACK + msgpack.packb(user_data, use_bin_type=True)
+        out = bytearray(BINARY_MAGIC + _LAYOUT_STRUCT)
+        _struct_pack(user_data, out)
+        return bytes(out)
+
+# Struct layout: a one-byte tag followed by the value. Lengths and counts are
+# unsigned varints and ints are zigzag varints, so the small numbers that make
+# up most of a record take a single byte
+_F64 = struct.Struct('<d')
+
+def _pack_varint(value: int, out: bytearray):
+    """Append an unsigned LEB128 varint"""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _unpack_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint, returns (value, next_position)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _struct_pack(value: Any, out: bytearray):
+    """Append one value in the struct layout"""
+    if value is None:
+        out += b'N'
+    elif value is True:
+        out += b'T'
+    elif value is False:
+        out += b'F'
+    elif isinstance(value, int):
+        out += b'i'
+        _pack_varint(value * 2 if value >= 0 else -value * 2 - 1, out)
+    elif isinstance(value, float):
+        out += b'f'
+        out += _F64.pack(value)
+    elif isinstance(value, str):
+        _struct_pack_text(value, out)
+    elif isinstance(value, dict):
+        out += b'd'
+        _pack_varint(len(value), out)
+        for key, item in value.items():
+            _struct_pack_text(str(key), out)
+            _struct_pack(item, out)
+    elif isinstance(value, (list, tuple)):
+        out += b'l'
+        _pack_varint(len(value), out)
+        for item in value:
+            _struct_pack(item, out)
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _struct_pack_text(text: str, out: bytearray):
+    """Append length-prefixed UTF-8 text"""
+    encoded = text.encode('utf-8')
+    out += b's'
+    _pack_varint(len(encoded), out)
+    out += encoded
+
+def _struct_unpack(buf: bytes, pos: int) -> Tuple[Any, int]:
+    """Read one value in the struct layout, returns (value, next_position)"""
+    tag = buf[pos]
+    pos += 1
+    if tag == 0x69:  # 'i'
+        zigzag, pos = _unpack_varint(buf, pos)
+        return (zigzag >> 1) ^ -(zigzag & 1), pos
+    if tag == 0x73:  # 's'
+        length, pos = _unpack_varint(buf, pos)
+        end = pos + length
+        if end > len(buf):
+            raise SerializationError("Truncated string")
+        return buf[pos:end].decode('utf-8'), end
+    if tag == 0x64:  # 'd'
+        count, pos = _unpack_varint(buf, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _struct_unpack(buf, pos)
+            result[key], pos = _struct_unpack(buf, pos)
+        return result, pos
+    if tag == 0x6c:  # 'l'
+        count, pos = _unpack_varint(buf, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _struct_unpack(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == 0x66:  # 'f'
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x4e:  # 'N'
+        return None, pos
+    if tag == 0x54:  # 'T'
+        return True, pos
+    if tag == 0x46:  # 'F'
+        return False, pos
+    raise SerializationError(f"Unknown struct tag {tag!r} at offset {pos - 1}")
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Decode a stored record in any supported format"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+
+    if payload.startswith(BINARY_MAGIC):
+        layout = payload[len(BINARY_MAGIC):len(BINARY_MAGIC) + 1]
+        body = payload[len(BINARY_MAGIC) + 1:]
+        try:
+            if layout == _LAYOUT_STRUCT:
+                value, end = _struct_unpack(body, 0)
+                if end != len(body):
+                    raise SerializationError("Trailing bytes after record")
+                return value
+            if layout == _LAYOUT_MSGPACK:
+                if msgpack is None:
+                    raise SerializationError("Record is msgpack encoded but msgpack is not installed")
+                return msgpack.unpackb(body, raw=False)
+        except (struct.error, UnicodeDecodeError, IndexError) as e:
+            raise SerializationError(f"Corrupt binary record: {e}") from e
+        raise SerializationError(f"Unknown binary layout {layout!r}")
+
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode('utf-8'))
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    CompactJsonSerializer.name: CompactJsonSerializer,
+    BinarySerializer.name: BinarySerializer
+}
+
+_serializer: Optional[Serializer] = None
+
+def get_serializer() -> Serializer:
+    """Get the serializer selected by serializationFormat in settings.json"""
+    global _serializer
+    if _serializer is None:
+        name = get_serialization_format()
+        if name not in SERIALIZERS:
+            print(f"⚠️ Unknown serializationFormat '{name}', using compact JSON")
+            name = CompactJsonSerializer.name
+        _serializer = SERIALIZERS[name]()
+    return _serializer
+
+def _drop_serializer():
+    """Pick serializationFormat up again; records of any format still load"""
+    global _serializer
+    _serializer = None
+
+add_config_listener(_drop_serializer, ('settings',))
+
+def _fsync_directory(directory: str):
+    """Make renames inside a directory durable (no-op where unsupported)"""
     try:
-        ensure_data_dir()
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_files(files: Dict[str, bytes]) -> Dict[str, Exception]:
+    """
+    Atomically replace a batch of files as one group commit.
+    Every payload goes to a temp file first; once all of them are fsynced they
+    are renamed over their targets and each touched directory is fsynced once.
+    A crash leaves each file either fully old or fully new, never truncated.
+    Returns the failures by target path.
+    """
+    failures = {}
+    staged = []
+
+    for path, payload in files.items():
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((tmp_path, path))
+        except Exception as e:
+            failures[path] = e
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    directories = set()
+    for tmp_path, path in staged:
+        try:
+            os.replace(tmp_path, path)
+            directories.add(os.path.dirname(path))
+        except Exception as e:
+            failures[path] = e
+
+    for directory in directories:
+        _fsync_directory(directory)
+
+    return failures
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of up to size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _backup_corrupt_file(file_path: str):
+    """Move an unreadable file aside as <file>.backup-<timestamp>"""
+    backup_path = f"{file_path}.backup-{int(time.time())}"
+    try:
+        os.replace(file_path, backup_path)
+        print(f"⚠️ Corrupted user file moved to {backup_path}")
+    except OSError as e:
+        print(f"⚠️ Could not back up corrupted file {file_path}: {e}")
+
+class StorageBackend:
+    """
+    Interface for user record storage.
+    encode() runs on the event loop; every other method is blocking and is
+    called through the I/O executor.
+    """
+
+    name = 'base'
+
+    def read(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Read one record, returns None if it doesn't exist"""
+        raise NotImplementedError
+
+    def encode(self, user_id: int, user_data: Dict[str, Any]) -> Any:
+        """Turn a live record into the payload consumed by write_many"""
+        raise NotImplementedError
+
+    def write_many(self, payloads: Dict[int, Any]) -> Dict[int, Exception]:
+        """Write a batch of encoded records, returns the failures by user id"""
+        raise NotImplementedError
+
+    def scan_batches(self, batch_size: int = 500) -> Iterator[Any]:
+        """Split the whole store into batches for load_batch, without decoding anything"""
+        raise NotImplementedError
+
+    @staticmethod
+    def load_batch(batch: Any) -> List[Tuple[int, Dict[str, Any]]]:
+        """Decode one scan batch (may run in a worker process)"""
+        raise NotImplementedError
+
+    def iter_all(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (user_id, record) for every stored user"""
+        for batch in self.scan_batches():
+            yield from self.load_batch(batch)
+
+    def upgrade_all(self, pool: Executor, batch_size: int = 500) -> Tuple[int, int]:
+        """
+        Migrate every stored record to the current schema (offline).
+        Returns (records scanned, records upgraded)
+        """
+        scanned = upgraded = 0
+        for records in _batched(self.iter_all(), batch_size):
+            payloads = {}
+            for user_id, user_data in records:
+                try:
+                    if migrate_user_data(user_data, user_id):
+                        payloads[user_id] = self.encode(user_id, user_data)
+                except ValueError as e:
+                    print(f"Skipping user {user_id}: {e}")
+            scanned += len(records)
+            upgraded += _write_migration_batch(self, payloads)
+        return scanned, upgraded
+
+    def close(self):
+        """Release any held resources"""
+
+class JsonFileBackend(StorageBackend):
+    """One JSON document per user under DATA_DIR"""
+
+    name = 'json'
+
+    def read(self, user_id: int) -> Optional[Dict[str, Any]]:
         file_path = get_user_file_path(user_id)
-        
-        # Make a clean copy without any non-serializable objects
-        clean_data = {}
-        for key, value in user_data.items():
-            if isinstance(value, dict):
-                clean_data[key] = {k: v for k, v in value.items()}
-            else:
-                clean_data[key] = value
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(clean_data, f, indent=2, ensure_ascii=False)
+        if not os.path.exists(file_path) and not _adopt_flat_file(user_id, file_path):
+            return None
+        try:
+            with open(file_path, 'rb') as f:
+                return decode_payload(f.read())
+        except ValueError as e:
+            # Keep the damaged file for inspection and start the user fresh
+            print(f"Error loading user data for {user_id}: {e}")
+            _backup_corrupt_file(file_path)
+            return None
+
+    def encode(self, user_id: int, user_data: Dict[str, Any]) -> bytes:
+        return get_serializer().dumps(user_data)
+
+    def write_many(self, payloads: Dict[int, bytes]) -> Dict[int, Exception]:
+        ensure_data_dir()
+        paths = {get_user_file_path(user_id): user_id for user_id in payloads}
+        failures = {}
+        for path in paths:
+            try:
+                _ensure_shard_dir(os.path.dirname(path))
+            except OSError as e:
+                failures[path] = e
+        failures.update(atomic_write_files({
+            path: payloads[user_id] for path, user_id in paths.items() if path not in failures
+        }))
+        return {paths[path]: e for path, e in failures.items()}
+
+    def scan_batches(self, batch_size: int = 500) -> Iterator[List[str]]:
+        # Batches of file paths; whoever loads a batch also does its reads
+        return _batched(walk_user_files(DATA_DIR), batch_size)
+
+    def iter_all(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        ensure_data_dir()
+        workers = get_io_workers()
+        for records in _parallel_map(self.load_batch, self.scan_batches(256), workers):
+            yield from records
+
+    def upgrade_all(self, pool: Executor, batch_size: int = 500) -> Tuple[int, int]:
+        # Each worker reads, migrates and rewrites its own batch of files
+        scanned = upgraded = 0
+        batches = self.scan_batches(batch_size)
+        for batch_scanned, batch_upgraded in _bounded_map(pool, _upgrade_user_files, batches, 16):
+            scanned += batch_scanned
+            upgraded += batch_upgraded
+        return scanned, upgraded
+
+    @staticmethod
+    def load_batch(paths: List[str]) -> List[Tuple[int, Dict[str, Any]]]:
+        records = []
+        for file_path in paths:
+            filename = os.path.basename(file_path)
+            try:
+                user_id = int(filename[:-5])  # Remove .json
+                if os.path.dirname(file_path) == DATA_DIR and os.path.exists(get_user_file_path(user_id)):
+                    # Flat leftover of a user that has already moved into its shard
+                    continue
+                with open(file_path, 'rb') as f:
+                    records.append((user_id, decode_payload(f.read())))
+            except ValueError as e:
+                print(f"Error loading {filename}: {e}")
+        return records
+
+class SQLiteBackend(StorageBackend):
+    """
+    Single SQLite database in WAL mode.
+    The document is stored with the configured serializer next to indexed
+    columns for the values the leaderboards rank by.
+    """
+
+    name = 'sqlite'
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            currency INTEGER NOT NULL DEFAULT 0,
+            total_catches INTEGER NOT NULL DEFAULT 0,
+            total_chops INTEGER NOT NULL DEFAULT 0,
+            rod_tier_index INTEGER NOT NULL DEFAULT 0,
+            data BLOB NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_users_currency ON users (currency)",
+        "CREATE INDEX IF NOT EXISTS idx_users_total_catches ON users (total_catches)",
+        "CREATE INDEX IF NOT EXISTS idx_users_total_chops ON users (total_chops)",
+        "CREATE INDEX IF NOT EXISTS idx_users_rod_tier_index ON users (rod_tier_index)",
+    )
+
+    # Statements are kept constant so sqlite3's statement cache reuses them
+    _SELECT_ONE = "SELECT data FROM users WHERE user_id = ?"
+    _UPSERT = (
+        "INSERT INTO users (user_id, username, currency, total_catches, total_chops, rod_tier_index, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (user_id) DO UPDATE SET "
+        "username = excluded.username, currency = excluded.currency, "
+        "total_catches = excluded.total_catches, total_chops = excluded.total_chops, "
+        "rod_tier_index = excluded.rod_tier_index, data = excluded.data"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The connection is shared by the I/O executor threads, guarded by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=32)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def read(self, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(self._SELECT_ONE, (user_id,)).fetchone()
+        if row is None:
+            return None
+        return decode_payload(row[0])
+
+    _SELECT_PAGE = "SELECT user_id, data FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?"
+
+    @staticmethod
+    def encode_row(user_id: int, user_data: Dict[str, Any]) -> Tuple:
+        """Build the upsert parameters for a record"""
+        stats = user_data.get('stats', {})
+        return (
+            user_id,
+            user_data.get('username'),
+            int(user_data.get('currency', 0)),
+            int(stats.get('totalCatches', 0)),
+            int(stats.get('totalChops', 0)),
+            get_rod_tier_index(user_data.get('rod', {}).get('tier', 'Starter Rod')),
+            get_serializer().dumps(user_data)
+        )
+
+    def encode(self, user_id: int, user_data: Dict[str, Any]) -> Tuple:
+        return self.encode_row(user_id, user_data)
+
+    def write_many(self, payloads: Dict[int, Tuple]) -> Dict[int, Exception]:
+        if not payloads:
+            return {}
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(self._UPSERT, payloads.values())
+            return {}
+        except Exception as e:
+            # The batch is one transaction, so every record in it failed
+            return {user_id: e for user_id in payloads}
+
+    def scan_batches(self, batch_size: int = 500) -> Iterator[List[Tuple[int, bytes]]]:
+        # Raw (user_id, payload) pages in id order, so the table is never held at once
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(self._SELECT_PAGE, (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def load_batch(rows: List[Tuple[int, bytes]]) -> List[Tuple[int, Dict[str, Any]]]:
+        records = []
+        for user_id, payload in rows:
+            try:
+                records.append((user_id, decode_payload(payload)))
+            except ValueError as e:
+                print(f"Error loading user {user_id}: {e}")
+        return records
+
+    def upgrade_all(self, pool: Executor, batch_size: int = 500) -> Tuple[int, int]:
+        # Workers decode, migrate and re-encode pages; this process does the writes
+        scanned = upgraded = 0
+        pages = self.scan_batches(batch_size)
+        for page_scanned, rows in _bounded_map(pool, _upgrade_sqlite_rows, pages, 16):
+            scanned += page_scanned
+            upgraded += _write_migration_batch(self, {row[0]: row for row in rows})
+        return scanned, upgraded
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def _upgrade_user_files(paths: List[str]) -> Tuple[int, int]:
+    """Migrate a batch of user files in place (runs in a worker process)"""
+    serializer = get_serializer()
+    payloads = {}
+    for file_path in paths:
+        try:
+            user_id = int(os.path.basename(file_path)[:-5])  # Remove .json
+            with open(file_path, 'rb') as f:
+                user_data = decode_payload(f.read())
+            if migrate_user_data(user_data, user_id):
+                payloads[file_path] = serializer.dumps(user_data)
+        except ValueError as e:
+            print(f"Skipping {file_path}: {e}")
+
+    failures = atomic_write_files(payloads)
+    for file_path, e in failures.items():
+        print(f"Error upgrading {file_path}: {e}")
+    return len(paths), len(payloads) - len(failures)
+
+def _upgrade_sqlite_rows(rows: List[Tuple[int, bytes]]) -> Tuple[int, List[Tuple]]:
+    """Migrate a page of SQLite rows, returns upsert rows for the changed ones (runs in a worker process)"""
+    upgraded = []
+    for user_id, payload in rows:
+        try:
+            user_data = decode_payload(payload)
+            if migrate_user_data(user_data, user_id):
+                upgraded.append(SQLiteBackend.encode_row(user_id, user_data))
+        except ValueError as e:
+            print(f"Skipping user {user_id}: {e}")
+    return len(rows), upgraded
+
+_backend: Optional[StorageBackend] = None
+
+def resolve_project_path(path: str) -> str:
+    """Resolve a settings path relative to the project root"""
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+
+def create_backend(name: str) -> StorageBackend:
+    """Create a storage backend by its settings name"""
+    if name == 'sqlite':
+        return SQLiteBackend(resolve_project_path(get_sqlite_path()))
+    if name == 'json':
+        return JsonFileBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
+
+def get_backend() -> StorageBackend:
+    """Get the storage backend selected in settings.json"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(get_storage_backend_name())
+    return _backend
+
+_journal: Optional[Journal] = None
+
+def get_journal() -> Optional[Journal]:
+    """Get the event journal, or None when journalEnabled is off (opening it reads the segments)"""
+    global _journal
+    if _journal is None and get_journal_enabled():
+        _journal = Journal(JOURNAL_DIR, get_journal_segment_bytes())
+    return _journal
+
+def _write_group(journal: Optional[Journal], events: List[Dict[str, Any]], payloads: Dict[int, Any]):
+    """
+    Write one group commit: journal events first, then snapshots.
+    Returns (journal_error, snapshot_failures)
+    """
+    journal_error = None
+    if events:
+        try:
+            journal.append(events)
+        except Exception as e:
+            journal_error = e
+    return journal_error, get_backend().write_many(payloads)
+
+class UserStore:
+    """
+    In-process write-back cache of user records.
+    Records are served from memory (LRU) and saves only mark them dirty. The
+    first save after a commit opens a group; a background task commits every
+    record saved within the durability window as one batch, or sooner once the
+    flush threshold is reached.
+    With the journal enabled, commits that recorded game events only append
+    those events, and commits whose only changes came from loading (a new
+    user, name or schema) append a 'meta' event; the full record is
+    rewritten when the journal is compacted.
+    """
+
+    def __init__(self, max_size: int = 5000, durability_window: float = 1.0, flush_threshold: int = 100,
+                 compaction_interval: float = 300):
+        self.max_size = max_size
+        self.durability_window = durability_window
+        self.flush_threshold = flush_threshold
+        self.compaction_interval = compaction_interval
+        self._records: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._dirty = set()
+        # Records whose changes so far are covered by journal events
+        self._journaled = set()
+        # Records whose snapshot is being written right now
+        self._writing = set()
+        # Records changed on load (new user, new name, schema upgrade) that the next commit persists
+        self._unsaved = set()
+        # Events recorded by open transactions, and committed events awaiting append
+        self._pending_events: Dict[int, List[Dict[str, Any]]] = {}
+        self._event_queue: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._compact_task: Optional[asyncio.Task] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._threshold_reached: Optional[asyncio.Event] = None
+        # Serializes flushes so an older payload never lands after a newer one
+        self._flush_lock = asyncio.Lock()
+        # One compaction at a time, e.g. a shielded periodic one and close()'s
+        self._compact_lock = asyncio.Lock()
+        self._last_flush_failed = False
+        # Called with (user_id, user_data) after every commit, e.g. to re-rank leaderboards
+        self._commit_listeners: List[Callable[[int, Dict[str, Any]], None]] = []
+        # Optional replay.CommandRecorder logging transactions for replay
+        self.recorder = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is active"""
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a cached record, marking it as recently used"""
+        user_data = self._records.get(user_id)
+        if user_data is not None:
+            self._records.move_to_end(user_id)
+        return user_data
+
+    def put(self, user_id: int, user_data: Dict[str, Any]):
+        """Insert or replace a cached record"""
+        self._records[user_id] = user_data
+        self._records.move_to_end(user_id)
+        self._evict()
+
+    def mark_dirty(self, user_id: int):
+        """Schedule a cached record to be written back"""
+        if user_id not in self._records:
+            return
+        self._dirty.add(user_id)
+        self._request_flush()
+
+    def mark_unsaved(self, user_id: int):
+        """Note a change made while loading a cached record, for the user's next commit to persist"""
+        if user_id in self._records:
+            self._unsaved.add(user_id)
+
+    def record_event(self, user_id: int, kind: str, fields: Dict[str, Any]):
+        """Hold a game event until the user's transaction commits"""
+        event = {'uid': user_id, 'kind': kind}
+        event.update(fields)
+        self._pending_events.setdefault(user_id, []).append(event)
+
+    def discard_events(self, user_id: int):
+        """Drop events of a transaction that failed"""
+        self._pending_events.pop(user_id, None)
+
+    def add_commit_listener(self, listener: Callable[[int, Dict[str, Any]], None]):
+        """Register a callback run on the event loop after each commit"""
+        self._commit_listeners.append(listener)
+
+    def commit(self, user_id: int, user_data: Dict[str, Any], changed: bool = True):
+        """
+        Commit a transaction: journal its events, or schedule a snapshot.
+        changed=False says the transaction itself modified nothing, so unless
+        it was loaded with unsaved changes there is nothing to write.
+        """
+        if self._commit(user_id, user_data, changed):
+            self._request_flush()
+
+    def commit_many(self, records: Dict[int, Dict[str, Any]]):
+        """Commit one transaction per record as a single group, e.g. a scheduler tick"""
+        for user_id, user_data in records.items():
+            self._commit(user_id, user_data)
+        if records:
+            self._request_flush()
+
+    def _commit(self, user_id: int, user_data: Dict[str, Any], changed: bool = True) -> bool:
+        """Returns whether anything was queued for writing"""
+        events = self._pending_events.pop(user_id, None)
+        unsaved = user_id in self._unsaved
+        if not events and not changed and not unsaved:
+            # e.g. a purchase the user couldn't afford
+            self.put(user_id, user_data)
+            return False
+        self._unsaved.discard(user_id)
+        if events and self.recorder is not None:
+            self.recorder.record(events)
+        journal = get_journal() if self.running else None
+
+        if journal is None or (changed and not events):
+            # No journal, or a change no game event describes: rewrite the record
+            self._dirty.add(user_id)
+        else:
+            if not events:
+                # Only load-time changes, which recovery redoes when it reads the snapshot
+                events = [{'uid': user_id, 'kind': 'meta'}]
+            if unsaved or 'journalSeq' not in user_data:
+                # Recovery may have no snapshot, or an old one, to take the name from
+                events[0]['username'] = user_data['username']
+            for event in events:
+                event['seq'] = journal.next_seq()
+            self._event_queue.extend(events)
+            user_data['journalSeq'] = events[-1]['seq']
+            self._journaled.add(user_id)
+
+        # Cached only once marked, so the eviction this may trigger keeps it
+        self.put(user_id, user_data)
+        for listener in self._commit_listeners:
+            try:
+                listener(user_id, user_data)
+            except Exception as e:
+                print(f"Error in commit listener for {user_id}: {e}")
+        return True
+
+    def _request_flush(self):
+        """Open (or fill) a group commit"""
+        if not self.running:
+            # No flusher (scripts, shutdown) - write through immediately
+            self.flush_sync()
+            return
+
+        self._flush_requested.set()
+        if len(self._dirty) + len(self._event_queue) >= self.flush_threshold:
+            self._threshold_reached.set()
+
+    def records(self) -> Dict[int, Dict[str, Any]]:
+        """Snapshot of all cached records"""
+        return dict(self._records)
+
+    def _evict(self):
+        """Drop least recently used clean records until within max size"""
+        if len(self._records) <= self.max_size:
+            return
+
+        for user_id in list(self._records.keys()):
+            if len(self._records) <= self.max_size:
+                break
+            # Dirty and journaled records stay until a snapshot has been written
+            if user_id not in self._dirty and user_id not in self._journaled and user_id not in self._writing:
+                del self._records[user_id]
+                self._unsaved.discard(user_id)
+
+    def _take_dirty(self) -> Dict[int, Any]:
+        """Serialize and clear the dirty set"""
+        backend = get_backend()
+        dirty, self._dirty = self._dirty, set()
+        payloads = {}
+        for user_id in dirty:
+            user_data = self._records.get(user_id)
+            if user_data is None:
+                continue
+            try:
+                payloads[user_id] = backend.encode(user_id, user_data)
+                # The snapshot includes every event committed so far
+                self._journaled.discard(user_id)
+            except Exception as e:
+                print(f"Error saving user data for {user_id}: {e}")
+        # Kept cached while in flight: a read now could still see the old file
+        self._writing.update(payloads)
+        return payloads
+
+    def _take_events(self) -> List[Dict[str, Any]]:
+        events, self._event_queue = self._event_queue, []
+        return events
+
+    def _finish_flush(self, events: List[Dict[str, Any]], journal_error: Optional[Exception],
+                      payloads: Dict[int, Any], failures: Dict[int, Exception]) -> int:
+        """Re-queue failed writes and evict what is now clean"""
+        if journal_error is not None:
+            print(f"Error appending {len(events)} journal event(s): {journal_error}")
+            self._event_queue[:0] = events
+        for user_id, e in failures.items():
+            print(f"Error saving user data for {user_id}: {e}")
+            self._dirty.add(user_id)
+        self._last_flush_failed = journal_error is not None or bool(failures)
+        self._writing.difference_update(payloads)
+        self._evict()
+        return len(payloads) - len(failures)
+
+    def flush_sync(self) -> int:
+        """Write all pending changes on the calling thread, returns the number of records written"""
+        events, payloads = self._take_events(), self._take_dirty()
+        journal_error, failures = _write_group(get_journal(), events, payloads)
+        return self._finish_flush(events, journal_error, payloads, failures)
+
+    async def flush(self) -> int:
+        """Write all pending changes on the I/O executor, returns the number of records written"""
+        async with self._flush_lock:
+            events, payloads = self._take_events(), self._take_dirty()
+            if not events and not payloads:
+                return 0
+            journal_error, failures = await run_io(_write_group, get_journal(), events, payloads)
+            return self._finish_flush(events, journal_error, payloads, failures)
+
+    async def compact(self) -> int:
+        """Fold the journal into snapshots and delete the folded segments"""
+        journal = get_journal()
+        if journal is None:
+            return 0
+
+        async with self._compact_lock:
+            async with self._flush_lock:
+                closed_segments = await run_io(journal.rotate)
+            self._dirty |= self._journaled
+            written = await self.flush()
+
+            if not self._last_flush_failed:
+                await run_io(journal.remove_segments, closed_segments)
+            return written
+
+    async def _flush_loop(self):
+        """Background task group-committing saved records"""
+        while True:
+            await self._flush_requested.wait()
+
+            # Let more saves join the group until the window closes or it's full.
+            # asyncio.wait, unlike wait_for, never swallows a cancel from close()
+            threshold = asyncio.ensure_future(self._threshold_reached.wait())
+            try:
+                await asyncio.wait((threshold,), timeout=self.durability_window)
+            finally:
+                threshold.cancel()
+            self._flush_requested.clear()
+            self._threshold_reached.clear()
+
+            try:
+                # Shielded so shutting down never abandons a commit half way
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error flushing user store: {e}")
+
+    async def _compact_loop(self):
+        """Background task periodically compacting the journal"""
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                await asyncio.shield(self.compact())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error compacting journal: {e}")
+
+    async def open(self):
+        """Recover from the journal left by the previous run, then start the background tasks"""
+        recovered = await run_io(recover_journal)
+        if recovered:
+            print(f"✅ Recovered {recovered} user(s) from the journal")
+        self.start()
+
+    def start(self):
+        """Start the background tasks (requires a running event loop)"""
+        if self.running:
+            return
+        self._flush_requested = asyncio.Event()
+        self._threshold_reached = asyncio.Event()
+        if self._dirty or self._event_queue:
+            self._flush_requested.set()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        if get_journal_enabled():
+            self._compact_task = asyncio.create_task(self._compact_loop())
+
+    async def close(self):
+        """Stop the background tasks, write any remaining changes and compact the journal"""
+        for task in (self._flush_task, self._compact_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        self._compact_task = None
+
+        await self.flush()
+        await self.compact()
+        journal = get_journal()
+        if journal is not None:
+            await run_io(journal.close)
+        await run_io(get_backend().close)
+
+_user_store: Optional[UserStore] = None
+
+def get_user_store() -> UserStore:
+    """Get the shared user store, creating it from settings on first use"""
+    global _user_store
+    if _user_store is None:
+        _user_store = UserStore(
+            max_size=get_user_cache_size(),
+            durability_window=get_durability_window(),
+            flush_threshold=get_flush_threshold(),
+            compaction_interval=get_journal_compaction_interval()
+        )
+    return _user_store
+
+def _apply_store_settings():
+    """Retune the running store; its loops read these on every pass"""
+    if _user_store is not None:
+        _user_store.max_size = get_user_cache_size()
+        _user_store.durability_window = get_durability_window()
+        _user_store.flush_threshold = get_flush_threshold()
+        _user_store.compaction_interval = get_journal_compaction_interval()
+
+add_config_listener(_apply_store_settings, ('settings',))
+
+def record_event(user_id: int, kind: str, **fields):
+    """
+    Record a game event (catch, chop, sell, buy, tier) inside a user transaction.
+    It is journaled when the transaction commits; see journal.EVENT_APPLIERS.
+    """
+    get_user_store().record_event(user_id, kind, fields)
+
+def recover_journal() -> int:
+    """
+    Rebuild users from their last snapshot plus the journal tail and write new
+    snapshots, then drop the folded segments. Blocking; runs before serving.
+    Returns the number of users recovered.
+    """
+    if not os.path.isdir(JOURNAL_DIR):
+        return 0
+    journal = get_journal() or Journal(JOURNAL_DIR, get_journal_segment_bytes())
+    segments = journal.rotate()
+    if not segments:
+        return 0
+
+    events_by_user: Dict[int, List[Dict[str, Any]]] = {}
+    for event in journal.read_events(segments):
+        events_by_user.setdefault(event['uid'], []).append(event)
+
+    backend = get_backend()
+    payloads = {}
+    for user_id, events in events_by_user.items():
+        user_data, _ = _read_user_data(user_id)
+        if user_data is None:
+            user_data = _default_user_data(user_id, events[0].get('username'))
+        last_seq = user_data.get('journalSeq', 0)
+        for event in events:
+            if event['seq'] > last_seq:
+                apply_event(user_data, event)
+        payloads[user_id] = backend.encode(user_id, user_data)
+
+    failures = backend.write_many(payloads)
+    if failures:
+        # Keep the segments so the next start can try again
+        for user_id, e in failures.items():
+            print(f"Error recovering user {user_id}: {e}")
+        return len(payloads) - len(failures)
+
+    journal.remove_segments(segments)
+    return len(payloads)
+
+def _default_user_data(user_id: int, username: str = None) -> Dict[str, Any]:
+    """Build a fresh user record"""
+    return {
+        'schemaVersion': SCHEMA_VERSION,
+        'user_id': user_id,
+        'username': username or f"User{user_id}",
+        'currency': 0,
+        'rod': {
+            'tier': 'Starter Rod',
+            'level': 1
+        },
+        'axe': {
+            'tier': 'Starter Axe'
+        },
+        'upgrades': {
+            'hookSharpness': 0,
+            'lineStrength': 0,
+            'bladeSharpness': 0,
+            'handleStrength': 0
+        },
+        'inventory': {
+            **{rarity: {} for rarity in RARITIES},
+            'woodcutting': {rarity: {} for rarity in RARITIES}
+        },
+        'stats': {
+            'totalCatches': 0,
+            'totalChops': 0,
+            'lastFishTimestamp': 0,
+            'lastChopTimestamp': 0,
+            'fishCreditTime': 0,
+            'chopCreditTime': 0
+        },
+        'inventoryValue': 0,
+        'inventoryStats': new_inventory_stats(),
+        'pricesVersion': get_prices_version(),
+        'rngState': new_rng_state(user_id),
+        'expedition': None,
+        'lastExpedition': None
+    }
+
+def _read_user_data(user_id: int) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Read a user from storage, upgraded to the current schema
+    Returns (record or None if no record exists, whether it was migrated)
+    """
+    # Unreadable records are handled by the backend; any other error (disk,
+    # permissions) propagates rather than silently resetting the user
+    data = get_backend().read(user_id)
+    if data is None:
+        return None, False
+    return data, migrate_user_data(data, user_id)
+
+async def load_user_data(user_id: int, username: str = None) -> Dict[str, Any]:
+    """
+    Load user data, creating default if doesn't exist.
+    A record in an older schema is migrated and, without a journal, scheduled
+    for writing once; otherwise nothing is written: a new user, a changed
+    username or (with the journal) an upgrade is persisted by the next save
+    or transaction commit.
+    """
+    store = get_user_store()
+    user_data = store.get(user_id)
+
+    if user_data is None:
+        disk_data, migrated = await run_io(_read_user_data, user_id)
+
+        # Another interaction may have loaded this user while we were reading
+        user_data = store.get(user_id)
+        if user_data is None:
+            # Create default user data if none is stored
+            user_data = disk_data if disk_data is not None else _default_user_data(user_id, username)
+            store.put(user_id, user_data)
+            if disk_data is None:
+                store.mark_unsaved(user_id)
+            elif migrated:
+                _save_upgrade(store, user_id)
+    elif revalue_inventory(user_data):
+        # Prices changed while the record was cached
+        _save_upgrade(store, user_id)
+
+    # Update username if provided
+    if username and username != user_data['username']:
+        user_data['username'] = username
+        store.mark_unsaved(user_id)
+
+    return user_data
+
+def _save_upgrade(store: UserStore, user_id: int):
+    """
+    Persist a migrated or revalued record. Reading redoes both, so with the
+    journal on the next commit only logs an event instead of a snapshot
+    """
+    if store.running and get_journal() is not None:
+        store.mark_unsaved(user_id)
+    else:
+        store.mark_dirty(user_id)
+
+def _read_users_data(user_ids: List[int]) -> Dict[int, Tuple[Optional[Dict[str, Any]], bool]]:
+    return {user_id: _read_user_data(user_id) for user_id in user_ids}
+
+async def load_users_data(user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Load many existing users at once, reading the uncached ones in a single
+    I/O job. Users with no stored record are left out.
+    """
+    store = get_user_store()
+    cached = {user_id: store.get(user_id) for user_id in user_ids}
+    missing = [user_id for user_id, user_data in cached.items() if user_data is None]
+    read = await run_io(_read_users_data, missing) if missing else {}
+
+    loaded = {}
+    for user_id in user_ids:
+        user_data = store.get(user_id)
+        if user_data is None:
+            # Evicted while reading means it was clean, so the copy held is current
+            user_data, migrated = cached[user_id], False
+            if user_data is None:
+                user_data, migrated = read.get(user_id, (None, False))
+                if user_data is None:
+                    continue
+            store.put(user_id, user_data)
+            if migrated:
+                _save_upgrade(store, user_id)
+        elif revalue_inventory(user_data):
+            _save_upgrade(store, user_id)
+        loaded[user_id] = user_data
+    return loaded
+
+# Per-user locks are striped over a fixed pool so memory doesn't grow with users
+USER_LOCK_STRIPES = 64
+_user_locks = [asyncio.Lock() for _ in range(USER_LOCK_STRIPES)]
+
+def get_user_lock(user_id: int) -> asyncio.Lock:
+    """Get the lock stripe guarding a user's record"""
+    return _user_locks[user_id % USER_LOCK_STRIPES]
+
+@asynccontextmanager
+async def user_transaction(user_id: int, username: str = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Load a user's record under their lock and commit it once on exit:
+
+        async with user_transaction(user_id, username) as user_data:
+            user_data['currency'] += 10
+
+    Concurrent transactions for the same user run one after another, so no
+    update is lost. If the block raises, nothing is committed and the record
+    is restored to how it was loaded; a block that changes nothing and
+    records no event writes nothing either.
+    Avoid awaiting network calls inside the block; build the response inside
+    and send it afterwards.
+    """
+    store = get_user_store()
+    async with get_user_lock(user_id):
+        user_data = await load_user_data(user_id, username)
+        if store.recorder is not None:
+            store.recorder.begin(user_id, user_data)
+        before = copy.deepcopy(user_data)
+        try:
+            yield user_data
+        except BaseException:
+            store.discard_events(user_id)
+            # Restored in place: the store and its listeners hold this dict
+            user_data.clear()
+            user_data.update(before)
+            raise
+        store.commit(user_id, user_data, changed=user_data != before)
+
+async def save_user_data(user_id: int, user_data: Dict[str, Any]) -> bool:
+    """Save user data (written back to disk by the user store)"""
+    try:
+        get_user_store().commit(user_id, user_data)
         return True
     except Exception as e:
         print(f"Error saving user data for {user_id}: {e}")
         return False
 
+def project_fields(user_data: Dict[str, Any], paths: Tuple[Tuple[str, ...], ...]) -> Dict[str, Any]:
+    """
+    Copy only the given (pre-split) field paths of a record, keeping their
+    nesting: ('stats', 'totalCatches') gives {'stats': {'totalCatches': 170}}.
+    Missing fields come out as None.
+    """
+    projected = {}
+    for path in paths:
+        value = user_data
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        target = projected
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+        target[path[-1]] = value
+    return projected
+
+def _project_batch(load_batch: Callable, batch: Any, paths: Optional[Tuple[Tuple[str, ...], ...]]):
+    """Decode, upgrade and project one scan batch (runs on the scan pool)"""
+    records = []
+    for user_id, user_data in load_batch(batch):
+        try:
+            migrate_user_data(user_data, user_id)
+        except ValueError as e:
+            print(f"Error loading user {user_id}: {e}")
+            continue
+        records.append((user_id, project_fields(user_data, paths) if paths else user_data))
+    return records
+
+async def scan_users(fields: Iterable[str] = None, batch_size: int = 500) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream every user as (user_id, record), upgraded to the current schema.
+    With fields (dotted paths such as 'currency' or 'stats.totalCatches') the
+    records hold only those fields. Batches are parsed on the scan process
+    pool with a bounded number in flight, so memory stays flat however many
+    users there are. Cached records take precedence over storage.
+    """
+    paths = tuple(tuple(field.split('.')) for field in fields) if fields else None
+    cached = get_user_store().records()
+    backend = get_backend()
+    batches = backend.scan_batches(batch_size)
+
+    loop = asyncio.get_running_loop()
+    pool = get_scan_pool()
+    if pool is not None:
+        window = 2 * get_scan_workers()
+    else:
+        pool, window = get_io_executor(), 2 * get_io_workers()
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            # Walking the store is blocking too, so it happens on the I/O executor
+            while not exhausted and len(pending) < window:
+                batch = await run_io(next, batches, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    future = loop.run_in_executor(pool, _project_batch, backend.load_batch, batch, paths)
+                    pending.append((batch, future))
+            if not pending:
+                break
+
+            batch, future = pending.popleft()
+            try:
+                records = await future
+            except BrokenProcessPool as e:
+                # Workers couldn't start (or died); finish the scan on the I/O threads
+                if get_scan_pool() is not None:
+                    disable_scan_pool(e)
+                pool, window = get_io_executor(), 2 * get_io_workers()
+                records = await run_io(_project_batch, backend.load_batch, batch, paths)
+            for user_id, record in records:
+                if user_id not in cached:
+                    yield user_id, record
+    finally:
+        batches.close()
+
+    for user_id, user_data in cached.items():
+        yield user_id, project_fields(user_data, paths) if paths else user_data
+
 async def load_all_users() -> Dict[int, Dict[str, Any]]:
-    """Load all user data files"""
-    ensure_data_dir()
-    users = {}
-    
-    if not os.path.exists(DATA_DIR):
-        return users
-    
-    for filename in os.listdir(DATA_DIR):
-        if filename.endswith('.json'):
+    """Load all user data files (prefer scan_users, which doesn't hold every record at once)"""
+    return {user_id: user_data async for user_id, user_data in scan_users()}
+
+def _iter_json_files(source_dirs: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream (user_id, record) from per-user JSON files, one file at a time"""
+    for source_dir in source_dirs:
+        for file_path in walk_user_files(source_dir):
             try:
-                user_id = int(filename[:-5])  # Remove .json
-                file_path = os.path.join(DATA_DIR, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    user_data = json.load(f)
-                    users[user_id] = user_data
-            except (ValueError, json.JSONDecodeError) as e:
-                print(f"Error loading {filename}: {e}")
+                with open(file_path, 'rb') as f:
+                    user_data = decode_payload(f.read())
+                # Older files only carry the id as a string 'id' field
+                raw_id = user_data.get('user_id', user_data.get('id', os.path.basename(file_path)[:-5]))
+                user_id = int(raw_id)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"Skipping {file_path}: {e}")
                 continue
-    
-    return users
+            yield user_id, user_data
+
+def migrate_json_files(backend: StorageBackend, source_dirs: Iterable[str] = None, batch_size: int = 500) -> int:
+    """
+    Import per-user JSON files into a storage backend.
+    Files are streamed and written in batches, so memory use doesn't grow with
+    the number of users. Later directories win when a user appears twice.
+    Returns the number of records imported.
+    """
+    if source_dirs is None:
+        source_dirs = [LEGACY_DATA_DIR, DATA_DIR]
+
+    imported = 0
+    batch = {}
+    for user_id, user_data in _iter_json_files(source_dirs):
+        try:
+            migrate_user_data(user_data, user_id)
+        except ValueError as e:
+            print(f"Skipping user {user_id}: {e}")
+            continue
+        batch[user_id] = backend.encode(user_id, user_data)
+        if len(batch) >= batch_size:
+            imported += _write_migration_batch(backend, batch)
+            batch = {}
+
+    if batch:
+        imported += _write_migration_batch(backend, batch)
+    return imported
+
+def _write_migration_batch(backend: StorageBackend, batch: Dict[int, Any]) -> int:
+    """Write one migration batch, reporting failures"""
+    failures = backend.write_many(batch)
+    for user_id, e in failures.items():
+        print(f"Error migrating user {user_id}: {e}")
+    return len(batch) - len(failures)
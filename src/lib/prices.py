@@ -0,0 +1,99 @@
+"""
+Item sell prices from costs.json, and the inventory aggregates valued with them
+"""
+
+import hashlib
+import json
+from typing import Dict, Any, Optional
+
+from .catalog import get_catalog
+from .config import add_config_listener, get_costs_config
+
+# Inventory category -> price table in costs.json
+PRICE_TABLES = {
+    'fish': 'fishValues',
+    'logs': 'logValues'
+}
+
+_prices_version: Optional[str] = None
+
+def get_item_price(category: str, item_type: str) -> int:
+    """Sell price of one item ('fish' or 'logs'), 0 if it has no price"""
+    item = get_catalog().get(category, item_type)
+    return item.sell_value if item is not None else 0
+
+def get_prices_version() -> str:
+    """Fingerprint of the price tables; records valued with other prices are revalued"""
+    global _prices_version
+    if _prices_version is None:
+        costs = get_costs_config()
+        tables = {table: costs.get(table, {}) for table in PRICE_TABLES.values()}
+        _prices_version = hashlib.blake2b(json.dumps(tables, sort_keys=True).encode(), digest_size=8).hexdigest()
+    return _prices_version
+
+def _drop_prices_version():
+    global _prices_version
+    _prices_version = None
+
+add_config_listener(_drop_prices_version, ('costs',))
+
+def new_inventory_stats() -> Dict[str, Dict[str, Any]]:
+    """Aggregates of an empty inventory, per category"""
+    return {category: {'counts': {}, 'items': 0, 'value': 0} for category in PRICE_TABLES}
+
+def get_item_buckets(user_data: Dict[str, Any], category: str) -> Dict[str, Dict[str, int]]:
+    """The rarity -> {item: count} buckets of 'fish' or 'logs'"""
+    inventory = user_data['inventory']
+    if category == 'logs':
+        return inventory['woodcutting']
+    return {rarity: items for rarity, items in inventory.items() if rarity != 'woodcutting'}
+
+def calculate_inventory_stats(user_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Count and value a user's whole inventory from scratch"""
+    stats = new_inventory_stats()
+    for category, totals in stats.items():
+        for rarity, items in get_item_buckets(user_data, category).items():
+            for item_type, count in items.items():
+                totals['counts'][rarity] = totals['counts'].get(rarity, 0) + count
+                totals['items'] += count
+                totals['value'] += get_item_price(category, item_type) * count
+    return stats
+
+def add_inventory_items(user_data: Dict[str, Any], category: str, rarity: str, item_type: str, count: int):
+    """
+    Add count items to the inventory (negative to remove them), updating
+    inventoryStats and inventoryValue in O(1) rather than recounting
+    """
+    inventory = user_data['inventory']
+    bucket = (inventory['woodcutting'] if category == 'logs' else inventory).setdefault(rarity, {})
+    held = bucket.get(item_type, 0)
+    count = max(count, -held)
+    if held + count > 0:
+        bucket[item_type] = held + count
+    else:
+        bucket.pop(item_type, None)
+
+    value = get_item_price(category, item_type) * count
+    totals = user_data['inventoryStats'][category]
+    counts = totals['counts']
+    if counts.get(rarity, 0) + count:
+        counts[rarity] = counts.get(rarity, 0) + count
+    else:
+        counts.pop(rarity, None)
+    totals['items'] += count
+    totals['value'] += value
+    user_data['inventoryValue'] += value
+
+def revalue_inventory(user_data: Dict[str, Any]) -> bool:
+    """
+    Recount inventoryStats and inventoryValue if they were maintained under
+    different prices
+    Returns whether the record changed
+    """
+    version = get_prices_version()
+    if user_data.get('pricesVersion') == version:
+        return False
+    user_data['inventoryStats'] = calculate_inventory_stats(user_data)
+    user_data['inventoryValue'] = sum(totals['value'] for totals in user_data['inventoryStats'].values())
+    user_data['pricesVersion'] = version
+    return True
@@ -0,0 +1,151 @@
+"""
+Order-statistics structures backing the leaderboards
+"""
+
+import random
+from typing import Any, Iterator, List, Optional
+
+# Enough levels for billions of entries at P = 1/4
+MAX_LEVEL = 16
+LEVEL_PROBABILITY = 0.25
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional['_Node']] = [None] * level
+        # width[l] = how many positions next[l] is ahead of this node
+        self.width = [1] * level
+
+class RankedSet:
+    """
+    Indexable skip list of unique, sortable keys.
+    Insert, remove, rank (position of a key) and select (key at a position)
+    run in O(log N) expected time; reading K keys from a position is
+    O(log N + K). Positions are 0-based in ascending key order.
+    """
+
+    def __init__(self, keys: Iterator = ()):
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        # Private generator so seeding the game RNG never shapes the index
+        self._random = random.Random()
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Any) -> bool:
+        return self.rank(key) is not None
+
+    def __iter__(self) -> Iterator:
+        return self.iter_from(0)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < LEVEL_PROBABILITY:
+            level += 1
+        return level
+
+    def add(self, key: Any):
+        """Insert a key (which must not already be present)"""
+        update = [self._head] * MAX_LEVEL
+        update_pos = [0] * MAX_LEVEL
+        node, pos = self._head, 0
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            update[level], update_pos[level] = node, pos
+
+        new_level = self._random_level()
+        if new_level > self._level:
+            for level in range(self._level, new_level):
+                # The head spans the whole list on levels that were empty
+                self._head.width[level] = self._size + 1
+            self._level = new_level
+
+        new_node = _Node(key, new_level)
+        for level in range(new_level):
+            prev = update[level]
+            skipped = pos - update_pos[level]
+            new_node.next[level] = prev.next[level]
+            new_node.width[level] = prev.width[level] - skipped
+            prev.next[level] = new_node
+            prev.width[level] = skipped + 1
+        for level in range(new_level, self._level):
+            update[level].width[level] += 1
+        self._size += 1
+
+    def discard(self, key: Any) -> bool:
+        """Remove a key if present, returns whether it was"""
+        update = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            update[level] = node
+
+        target = node.next[0]
+        if target is None or target.key != key:
+            return False
+
+        for level in range(self._level):
+            prev = update[level]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def rank(self, key: Any) -> Optional[int]:
+        """Position of a key, or None if it isn't present"""
+        node, pos = self._head, 0
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+        node = node.next[0]
+        if node is None or node.key != key:
+            return None
+        return pos
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        if index < 0 or index >= self._size:
+            return None
+        target, node, pos = index + 1, self._head, 0
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and pos + node.width[level] <= target:
+                pos += node.width[level]
+                node = node.next[level]
+        return node
+
+    def select(self, index: int) -> Any:
+        """Key at a position"""
+        node = self._node_at(index)
+        if node is None:
+            raise IndexError(f"RankedSet index out of range: {index}")
+        return node.key
+
+    def iter_from(self, index: int) -> Iterator:
+        """Yield keys in order starting at a position"""
+        node = self._node_at(max(index, 0))
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def slice(self, start: int, count: int) -> List:
+        """Up to count keys starting at a position"""
+        keys = []
+        for key in self.iter_from(start):
+            if len(keys) >= count:
+                break
+            keys.append(key)
+        return keys
@@ -0,0 +1,52 @@
+"""
+Cache for rendered command output that depends on a versioned source
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .metrics import increment
+
+class RenderCache:
+    """
+    LRU cache of rendered results. An entry is served while it is younger
+    than the TTL and was built from the same source version the caller
+    currently sees, so a change to the source invalidates it early.
+    Versions only grow: a caller still holding an older version misses
+    without evicting, or overwriting, the entry built from a newer one.
+    Hits and misses are counted as '<name>.hits' / '<name>.misses' metrics.
+    """
+
+    def __init__(self, name: str, ttl: Callable[[], float], max_entries: int = 1024):
+        self.name = name
+        # Read on every lookup so a settings change applies immediately
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            built_at, entry_version, value = entry
+            expired = time.monotonic() - built_at >= self.ttl()
+            if entry_version == version and not expired:
+                self._entries.move_to_end(key)
+                increment(f"{self.name}.hits")
+                return value
+            if expired or entry_version < version:
+                del self._entries[key]
+        increment(f"{self.name}.misses")
+        return None
+
+    def put(self, key: Hashable, version: int, value: Any):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > version:
+            return
+        self._entries[key] = (time.monotonic(), version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,140 @@
+"""
+Command recording and deterministic replay
+
+With commandLogPath set, every user's record is logged the first time a
+transaction touches it, followed by each committed game event. Rolls come
+from the per-user streams stored in the records, so re-running the log from
+those snapshots reproduces every catch and chop exactly, whatever order
+different users' commands were interleaved in.
+"""
+
+import copy
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from .config import get_command_log_path
+from .expeditions import settle_expedition, start_expedition
+from .fishing import attempt_fish, attempt_fish_batch
+from .journal import EVENT_APPLIERS
+from .persistence import resolve_project_path
+from .woodcutting import attempt_chop, attempt_chop_batch
+
+class CommandRecorder:
+    """Appends user snapshots and committed events to a JSON-lines log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._seen: Set[int] = set()
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def begin(self, user_id: int, user_data: Dict[str, Any]):
+        """Snapshot a user before the first transaction of theirs this log sees"""
+        if user_id in self._seen:
+            return
+        self._seen.add(user_id)
+        self._write({'op': 'user', 'uid': user_id, 'record': user_data})
+
+    def record(self, events: List[Dict[str, Any]]):
+        """Log a committed transaction's events"""
+        for event in events:
+            self._write({'op': 'event', **event})
+        # Small appends on a diagnostic path; flushed per commit so a crash
+        # loses at most the transaction in flight
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+_recorder: Optional[CommandRecorder] = None
+
+def get_command_recorder() -> Optional[CommandRecorder]:
+    """The active recorder, or None when commandLogPath is not set"""
+    global _recorder
+    if _recorder is None:
+        path = get_command_log_path()
+        if not path:
+            return None
+        _recorder = CommandRecorder(resolve_project_path(path))
+        print(f"Recording commands to {_recorder.path}")
+    return _recorder
+
+def close_command_recorder():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+class ReplayResult(NamedTuple):
+    users: int
+    commands: int
+    mismatches: List[str]
+
+# Rolled commands: how to re-run one, and the result fields its event recorded
+_ROLLS = {
+    'catch': (attempt_fish, 'fish_type'),
+    'chop': (attempt_chop, 'log_type'),
+}
+
+# Batched commands: how to re-run one, and the event field holding its size
+_BATCH_ROLLS = {
+    'catches': (attempt_fish_batch, 'casts'),
+    'chops': (attempt_chop_batch, 'swings'),
+}
+
+def replay_commands(path: str) -> ReplayResult:
+    """
+    Re-run a command log from its snapshots. Catches and chops, single,
+    batched or gathered on expeditions, are rolled again and compared with
+    what was recorded; other events are applied as logged. Rates and
+    settings must match the ones the log was recorded with.
+    """
+    records: Dict[int, Dict[str, Any]] = {}
+    commands = 0
+    mismatches = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            user_id = entry['uid']
+            if entry['op'] == 'user':
+                # A later snapshot (the bot restarted) supersedes the replayed state
+                records[user_id] = copy.deepcopy(entry['record'])
+                continue
+
+            user_data = records[user_id]
+            kind = entry['kind']
+            commands += 1
+            if kind in _ROLLS:
+                attempt, item_key = _ROLLS[kind]
+                result = attempt(user_data, now=entry['ts'])
+                replayed = (result.get('rarity'), result.get(item_key), result.get('value'))
+                recorded = (entry['rarity'], entry['item'], entry['value'])
+            elif kind in _BATCH_ROLLS or kind == 'haul':
+                if kind == 'haul':
+                    # A stopped expedition ends early; one that ran out records its 'last' totals
+                    finish = entry['state'] is None and 'last' not in entry
+                    result = settle_expedition(user_data, entry['ts'], finish=finish) or {}
+                else:
+                    attempt, size_key = _BATCH_ROLLS[kind]
+                    result = attempt(user_data, entry[size_key], now=entry['ts'])
+                # JSON turned the (rarity, item, count) tuples into lists
+                replayed = (sorted(map(list, result.get('items', []))), result.get('value'))
+                recorded = (sorted(entry['items']), entry['value'])
+            elif kind == 'expedition':
+                start_expedition(user_data, entry['activity'], now=entry['ts'])
+                continue
+            else:
+                EVENT_APPLIERS[kind](user_data, entry)
+                continue
+
+            if replayed != recorded:
+                mismatches.append(
+                    f"line {line_number}: user {user_id} {kind} recorded {recorded}, replayed {replayed}"
+                )
+            if 'rng' in entry and result.get('rng') != entry['rng']:
+                mismatches.append(f"line {line_number}: user {user_id} random stream diverged")
+    return ReplayResult(len(records), commands, mismatches)
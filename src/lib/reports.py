@@ -0,0 +1,48 @@
+"""
+Admin reports computed from streaming scans of every user
+"""
+
+from collections import Counter
+from typing import Dict, Any
+
+from .persistence import scan_users
+
+REPORT_FIELDS = ('currency', 'stats.totalCatches', 'stats.totalChops', 'rod.tier', 'axe.tier')
+
+async def build_economy_report() -> Dict[str, Any]:
+    """
+    Aggregate the economy over all users in one projected scan
+    Memory use is independent of the number of users (besides the tier tallies)
+    """
+    players = 0
+    active_players = 0
+    total_currency = 0
+    richest = 0
+    total_catches = 0
+    total_chops = 0
+    rod_tiers = Counter()
+    axe_tiers = Counter()
+
+    async for _, user_data in scan_users(REPORT_FIELDS):
+        stats = user_data['stats']
+        players += 1
+        if stats['totalCatches'] or stats['totalChops']:
+            active_players += 1
+        total_currency += user_data['currency']
+        richest = max(richest, user_data['currency'])
+        total_catches += stats['totalCatches']
+        total_chops += stats['totalChops']
+        rod_tiers[user_data['rod']['tier']] += 1
+        axe_tiers[user_data['axe']['tier']] += 1
+
+    return {
+        'players': players,
+        'activePlayers': active_players,
+        'totalCurrency': total_currency,
+        'averageCurrency': total_currency // players if players else 0,
+        'richest': richest,
+        'totalCatches': total_catches,
+        'totalChops': total_chops,
+        'rodTiers': dict(rod_tiers),
+        'axeTiers': dict(axe_tiers)
+    }
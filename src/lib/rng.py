@@ -0,0 +1,87 @@
+"""
+Per-user random streams for game rolls
+"""
+
+import hashlib
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from .config import get_rng_seed
+
+_MASK64 = (1 << 64) - 1
+# Odd 64-bit constant (2^64 / golden ratio) spacing successive counters apart
+_GAMMA = 0x9E3779B97F4A7C15
+
+def _mix64(z: int) -> int:
+    """SplitMix64 finalizer: a bijective scramble of a 64-bit integer"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+class CounterRandom(random.Random):
+    """
+    Counter-based generator: output n is a pure function of (key, n), so a
+    stream is fully described by its key and how far it has been read. The
+    state is the record's own [key, counter] list, updated in place, which
+    makes it persist and replay along with the rest of the record.
+    Every random.Random method (choice, randint, ...) works on top of it.
+    """
+
+    def __init__(self, state: List[int]):
+        self._state = state
+        super().__init__()
+
+    def seed(self, a: Any = None, version: int = 2):
+        # The stream is fixed by its key; called by random.Random.__init__
+        pass
+
+    def _next64(self) -> int:
+        key, counter = self._state
+        self._state[1] = counter + 1
+        return _mix64((key + counter * _GAMMA) & _MASK64)
+
+    def random(self) -> float:
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self._next64() << shift
+        return bits & ((1 << k) - 1)
+
+    def getstate(self) -> List[int]:
+        return list(self._state)
+
+    def setstate(self, state: List[int]):
+        self._state[:] = state
+
+    @property
+    def counter(self) -> int:
+        return self._state[1]
+
+_process_seed: Optional[int] = None
+
+def get_stream_seed() -> int:
+    """The configured rngSeed, or one random seed for the life of the process"""
+    global _process_seed
+    seed = get_rng_seed()
+    if seed is not None:
+        return seed
+    if _process_seed is None:
+        _process_seed = int.from_bytes(os.urandom(8), 'big')
+    return _process_seed
+
+def stream_key(seed: int, user_id: int) -> int:
+    """Key of a user's stream: independent per user, reproducible per seed"""
+    digest = hashlib.blake2b(f"{seed}:{user_id}".encode(), digest_size=8).digest()
+    # 63 bits, so every storage backend keeps it as a plain integer
+    return int.from_bytes(digest, 'big') >> 1
+
+def new_rng_state(user_id: int) -> List[int]:
+    """[key, counter] for a user who has no stream yet"""
+    return [stream_key(get_stream_seed(), user_id), 0]
+
+def get_user_rng(user_data: Dict[str, Any]) -> CounterRandom:
+    """The user's stream, positioned where their last roll left it"""
+    return CounterRandom(user_data['rngState'])
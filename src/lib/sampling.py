@@ -0,0 +1,144 @@
+"""
+Weighted sampling with precompiled tables
+"""
+
+import random
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Below this many rolls the per-call NumPy overhead outweighs the loop it saves
+NUMPY_MIN_ROLLS = 256
+
+class AliasTable:
+    """
+    Walker alias table over weighted outcomes: built in O(n), each draw is
+    O(1) and takes a single uniform number from the generator.
+    """
+    __slots__ = ('outcomes', 'weights', '_probability', '_alias', '_arrays')
+
+    def __init__(self, outcomes: Sequence[Any], weights: Sequence[float]):
+        total = sum(weights)
+        if not outcomes or total <= 0:
+            raise ValueError("AliasTable needs at least one outcome with a positive weight")
+        count = len(outcomes)
+        self.outcomes = tuple(outcomes)
+        self.weights = tuple(weights)
+
+        # Scale so the average column holds exactly 1.0
+        scaled = [weight * count / total for weight in weights]
+        probability = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            # The large outcome fills the rest of the small one's column
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Whatever is left is 1.0 up to rounding error and keeps its own column
+        self._probability = probability
+        self._alias = alias
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def sample_index(self, rng=random) -> int:
+        """Draw the position of one outcome"""
+        u = rng.random() * len(self.outcomes)
+        column = int(u)
+        if u - column < self._probability[column]:
+            return column
+        return self._alias[column]
+
+    def sample(self, rng=random) -> Any:
+        """Draw one outcome"""
+        return self.outcomes[self.sample_index(rng)]
+
+    def numpy_probabilities(self) -> Any:
+        """Normalized outcome probabilities as a NumPy array, built on first use"""
+        if self._arrays is None:
+            weights = numpy.array(self.weights, dtype=float)
+            self._arrays = weights / weights.sum()
+        return self._arrays
+
+class SamplerCache:
+    """
+    Compiled samplers by key, dropped together by clear(), which is registered
+    as a config listener for the sections they are built from. The whole table
+    is swapped at once, so a draw never mixes samplers from two versions.
+    """
+
+    def __init__(self, build: Callable[..., AliasTable]):
+        self._build = build
+        self._samplers: Dict[Hashable, AliasTable] = {}
+
+    def get(self, *key) -> AliasTable:
+        """The sampler for a key, compiled on first use"""
+        samplers = self._samplers
+        sampler = samplers.get(key)
+        if sampler is None:
+            sampler = samplers[key] = self._build(*key)
+        return sampler
+
+    def clear(self):
+        self._samplers = {}
+
+class RollBatch(NamedTuple):
+    """Aggregated result of many rolls against one table"""
+    counts: Dict[Any, int]  # outcome -> times drawn, drawn outcomes only
+    bites: int  # rolls that hit the golden/timber bite
+    value: int  # total value, bites counted double
+
+def roll_batch(table: AliasTable, values: Sequence[int], bite_chance: float, n: int, rng=random) -> RollBatch:
+    """
+    Roll n items from a table, each with a bite_chance of doubling its value.
+    values[i] is the value of table.outcomes[i]. Large batches are drawn with
+    NumPy when it is installed, in O(outcomes) rather than O(n), seeded from
+    rng so results stay reproducible.
+    """
+    size = len(table)
+    if numpy is not None and n >= NUMPY_MIN_ROLLS:
+        # Only the totals are returned, so draw them directly: the counts of n
+        # independent rolls are multinomial, and each outcome's bites binomial
+        generator = numpy.random.default_rng(rng.getrandbits(64))
+        drawn = generator.multinomial(n, table.numpy_probabilities())
+        counts = drawn.tolist()
+        bite_counts = generator.binomial(drawn, min(max(bite_chance, 0.0), 1.0)).tolist()
+    else:
+        counts = [0] * size
+        bite_counts = [0] * size
+        # Outcome then bite per roll, the same order as a single /fish or /chop
+        for _ in range(n):
+            index = table.sample_index(rng)
+            counts[index] += 1
+            if rng.random() < bite_chance:
+                bite_counts[index] += 1
+
+    value = sum(values[i] * (counts[i] + bite_counts[i]) for i in range(size))
+    return RollBatch(
+        {table.outcomes[i]: count for i, count in enumerate(counts) if count},
+        sum(bite_counts),
+        value
+    )
+
+def build_item_table(weights: Dict[str, float], item_types: Dict[str, List[str]]) -> AliasTable:
+    """
+    One table over (rarity, item_type): a rarity's weight is split evenly over
+    its items, matching a rarity draw followed by a uniform item choice
+    """
+    outcomes, item_weights = [], []
+    for rarity, weight in weights.items():
+        types = item_types.get(rarity)
+        if not types:
+            continue
+        for item_type in types:
+            outcomes.append((rarity, item_type))
+            item_weights.append(weight / len(types))
+    return AliasTable(outcomes, item_weights)
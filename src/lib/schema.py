@@ -0,0 +1,121 @@
+"""
+User record schema: versions and the migrations between them
+"""
+
+from typing import Dict, Any, Callable, List
+
+from .fishing import FISH_TYPES
+from .economy import UPGRADE_COSTS
+from .prices import revalue_inventory
+from .rng import new_rng_state
+from .catalog import LEGACY_ITEM_NAMES
+
+# Bump together with a new entry in MIGRATIONS
+SCHEMA_VERSION = 9
+
+RARITIES = tuple(FISH_TYPES)
+
+class SchemaVersionError(ValueError):
+    """Raised for a record written by a newer version of the bot"""
+
+def _to_v1(data: Dict[str, Any], user_id: int):
+    """v1: integer user_id and every top-level section present"""
+    # The earliest files only carry the id as a string 'id' field
+    data.pop('id', None)
+    data['user_id'] = user_id
+    data.setdefault('username', f"User{user_id}")
+    data.setdefault('currency', 0)
+    for section in ('rod', 'axe', 'upgrades', 'inventory', 'stats'):
+        data.setdefault(section, {})
+
+def _to_v2(data: Dict[str, Any], user_id: int):
+    """v2: complete nested shape, so commands can index without defaults"""
+    data['rod'].setdefault('tier', 'Starter Rod')
+    data['rod'].setdefault('level', 1)
+    data['axe'].setdefault('tier', 'Starter Axe')
+
+    for upgrade_key in UPGRADE_COSTS:
+        data['upgrades'].setdefault(upgrade_key, 0)
+
+    stats = data['stats']
+    for key in ('totalCatches', 'totalChops', 'lastFishTimestamp', 'lastChopTimestamp'):
+        stats.setdefault(key, 0)
+        # Older cogs also left cooldown timestamps at the top level
+        if key in data:
+            stats[key] = max(stats[key], data.pop(key))
+
+    inventory = data['inventory']
+    woodcutting = inventory.setdefault('woodcutting', {})
+    for rarity in RARITIES:
+        inventory.setdefault(rarity, {})
+        woodcutting.setdefault(rarity, {})
+
+def _to_v3(data: Dict[str, Any], user_id: int):
+    """v3: inventoryValue, the running sell value of the inventory"""
+    # Valued by revalue_inventory below, under whatever prices are current
+    data.setdefault('inventoryValue', 0)
+    data.setdefault('pricesVersion', None)
+
+def _to_v4(data: Dict[str, Any], user_id: int):
+    """v4: rngState, the [key, counter] of the user's random stream"""
+    data.setdefault('rngState', new_rng_state(user_id))
+
+def _to_v5(data: Dict[str, Any], user_id: int):
+    """v5: logs stored under their catalog names (ash -> ashwood, eternal -> angelwood)"""
+    for items in data['inventory']['woodcutting'].values():
+        for old_name, name in LEGACY_ITEM_NAMES['logs'].items():
+            if old_name in items:
+                items[name] = items.get(name, 0) + items.pop(old_name)
+    # The renamed stacks now have a price
+    data['pricesVersion'] = None
+
+def _to_v6(data: Dict[str, Any], user_id: int):
+    """v6: fishCreditTime/chopCreditTime, the cooldown credit buckets"""
+    stats = data['stats']
+    # Starting from the last action keeps whatever cooldown was running
+    stats.setdefault('fishCreditTime', stats['lastFishTimestamp'])
+    stats.setdefault('chopCreditTime', stats['lastChopTimestamp'])
+
+def _to_v7(data: Dict[str, Any], user_id: int):
+    """v7: expedition, the user's running idle expedition or None"""
+    data.setdefault('expedition', None)
+
+def _to_v8(data: Dict[str, Any], user_id: int):
+    """v8: inventoryStats, per-category item counts and sell value of the inventory"""
+    # Counted by revalue_inventory below
+    data['pricesVersion'] = None
+
+def _to_v9(data: Dict[str, Any], user_id: int):
+    """v9: lastExpedition, totals of an expedition that ran out, until the player sees them"""
+    data.setdefault('lastExpedition', None)
+
+# MIGRATIONS[n] upgrades a record from version n to n + 1
+MIGRATIONS: List[Callable[[Dict[str, Any], int], None]] = [
+    _to_v1,
+    _to_v2,
+    _to_v3,
+    _to_v4,
+    _to_v5,
+    _to_v6,
+    _to_v7,
+    _to_v8,
+    _to_v9,
+]
+
+def migrate_user_data(data: Dict[str, Any], user_id: int) -> bool:
+    """
+    Bring a stored record up to SCHEMA_VERSION in place, and revalue its
+    inventory if prices changed since it was last written
+    Returns whether anything changed (the record should be saved)
+    """
+    version = data.get('schemaVersion', 0)
+    if version > SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"User {user_id} has schema version {version}, this bot only knows up to {SCHEMA_VERSION}"
+        )
+
+    for migration in MIGRATIONS[version:]:
+        migration(data, user_id)
+    data['schemaVersion'] = SCHEMA_VERSION
+    revalued = revalue_inventory(data)
+    return version < SCHEMA_VERSION or revalued
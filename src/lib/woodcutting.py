@@ -4,17 +4,22 @@ Woodcutting mechanics: RNG, cooldowns, harvest calculations
 
 import random
 import time
-from typing import Dict, Tuple, Optional
-from .config import get_rates_config, get_settings_config, get_wood_cooldown, get_timber_bite_chance
+from typing import Callable, Dict, List, Tuple, Optional
+from .config import add_config_listener, get_rates_config, get_settings_config, get_wood_cooldown, get_timber_bite_chance
+from .catalog import get_catalog
+from .credits import available_credits, expedition_in_progress, spend_credits
+from .prices import add_inventory_items
+from .rng import get_user_rng
+from .sampling import AliasTable, SamplerCache, RollBatch, build_item_table, roll_batch
 
 # Log types by rarity
 LOG_TYPES = {
     'Common': ['oak', 'birch'],
-    'Uncommon': ['maple', 'ash'],
+    'Uncommon': ['maple', 'ashwood'],
     'Rare': ['spruce', 'pine'],
     'Epic': ['bloodwood', 'honeywood'],
     'Legendary': ['shadowbark'],
-    'Mythic': ['eternal']
+    'Mythic': ['angelwood']
 }
 
 # Base values per rarity
@@ -41,13 +46,13 @@ LOG_MULTIPLIERS = {
     'angelwood': 1.0
 }
 
-def check_cooldown(last_chop_timestamp: int) -> Tuple[bool, int]:
+def check_cooldown(last_chop_timestamp: int, now: int = None) -> Tuple[bool, int]:
     """
     Check if user is on cooldown
     Returns (can_chop, remaining_seconds)
     """
     cooldown = get_wood_cooldown()
-    current_time = int(time.time())
+    current_time = int(time.time()) if now is None else now
     time_passed = current_time - last_chop_timestamp
     
     if time_passed >= cooldown:
@@ -89,49 +94,83 @@ def get_harvest_weights(axe_tier: str, blade_sharpness: int, handle_strength: in
     
     return weights
 
-def roll_harvest(axe_tier: str, blade_sharpness: int, handle_strength: int) -> Tuple[str, str]:
+def _compile_harvest_table(axe_tier: str, blade_sharpness: int, handle_strength: int) -> AliasTable:
+    return build_item_table(get_harvest_weights(axe_tier, blade_sharpness, handle_strength), LOG_TYPES)
+
+# (tier, upgrade levels) -> compiled table, dropped whenever the rates change
+_harvest_tables = SamplerCache(_compile_harvest_table)
+add_config_listener(_harvest_tables.clear, ('rates',))
+
+def roll_harvest(axe_tier: str, blade_sharpness: int, handle_strength: int, rng=random) -> Tuple[str, str]:
     """
     Roll for a harvest
     Returns (rarity, log_type)
     """
-    weights = get_harvest_weights(axe_tier, blade_sharpness, handle_strength)
-    
-    # Weighted random selection
-    rarities = list(weights.keys())
-    weight_values = list(weights.values())
-    
-    rarity = random.choices(rarities, weights=weight_values)[0]
-    log_type = random.choice(LOG_TYPES[rarity])
-    
-    return rarity, log_type
+    return _harvest_tables.get(axe_tier, blade_sharpness, handle_strength).sample(rng)
 
 def calculate_log_value(rarity: str, log_type: str, is_timber_bite: bool = False) -> int:
     """
     Calculate the value of a harvested log
     """
-    base_value = BASE_VALUES[rarity]
-    multiplier = LOG_MULTIPLIERS.get(log_type, 1.0)
-    value = int(base_value * multiplier)
+    item = get_catalog().get('logs', log_type)
+    if item is not None:
+        value = item.value
+    else:
+        value = int(BASE_VALUES[rarity] * LOG_MULTIPLIERS.get(log_type, 1.0))
     
     if is_timber_bite:
         value *= 2
     
     return value
 
-def check_timber_bite() -> bool:
+def check_timber_bite(rng=random) -> bool:
     """
     Check if timber bite event triggers
     """
     chance = get_timber_bite_chance()
-    return random.random() < chance
+    return rng.random() < chance
+
+def get_harvest_sampler(axe_tier: str, blade_sharpness: int, handle_strength: int) -> Callable[..., RollBatch]:
+    """
+    Look up the table and values for one axe and upgrade combination once
+    Returns a function rolling (n, rng) harvests with them, as roll_harvests does
+    """
+    table = _harvest_tables.get(axe_tier, blade_sharpness, handle_strength)
+    values = [calculate_log_value(rarity, item_type) for rarity, item_type in table.outcomes]
+    chance = get_timber_bite_chance()
+    return lambda n, rng=random: roll_batch(table, values, chance, n, rng)
+
+def roll_harvests(axe_tier: str, blade_sharpness: int, handle_strength: int, n: int, rng=random) -> RollBatch:
+    """
+    Roll n harvests in one call
+    Returns counts per (rarity, type), the timber bite count and the total value
+    """
+    return get_harvest_sampler(axe_tier, blade_sharpness, handle_strength)(n, rng)
 
-def attempt_chop(user_data: Dict) -> Dict:
+def apply_harvest(user_data: Dict, rarity: str, log_type: str, value: int, timestamp: int):
     """
-    Perform a chopping attempt
-    Returns result dict with harvest info
+    Apply a harvest to a user's record
+    Shared by attempt_chop and journal replay
     """
-    # Check cooldown
-    can_chop, remaining = check_cooldown(user_data['stats']['lastChopTimestamp'])
+    user_data['stats']['totalChops'] += 1
+    user_data['stats']['lastChopTimestamp'] = timestamp
+    user_data['currency'] += value
+    
+    # Add to inventory
+    add_inventory_items(user_data, 'logs', rarity, log_type, 1)
+
+def attempt_chop(user_data: Dict, now: int = None) -> Dict:
+    """
+    Perform a chopping attempt, rolled from the user's own random stream
+    Returns result dict with harvest info; now overrides the clock for replays
+    """
+    blocked = expedition_in_progress(user_data, 'woodcutting')
+    if blocked:
+        return blocked
+
+    # Check cooldown: at least one credit must be banked
+    timestamp = int(time.time()) if now is None else now
+    can_chop, remaining = check_cooldown(user_data['stats']['chopCreditTime'], timestamp)
     
     if not can_chop:
         return {
@@ -146,30 +185,18 @@ def attempt_chop(user_data: Dict) -> Dict:
     handle_strength = user_data['upgrades'].get('handleStrength', 0)
     
     # Roll for harvest
-    rarity, log_type = roll_harvest(axe_tier, blade_sharpness, handle_strength)
+    rng = get_user_rng(user_data)
+    rarity, log_type = roll_harvest(axe_tier, blade_sharpness, handle_strength, rng)
     
     # Check for timber bite
-    is_timber_bite = check_timber_bite()
+    is_timber_bite = check_timber_bite(rng)
     
     # Calculate value
     value = calculate_log_value(rarity, log_type, is_timber_bite)
     
     # Update user data
-    user_data['stats']['totalChops'] += 1
-    user_data['stats']['lastChopTimestamp'] = int(time.time())
-    user_data['currency'] += value
-    
-    # Add to inventory
-    if 'woodcutting' not in user_data['inventory']:
-        user_data['inventory']['woodcutting'] = {}
-    
-    if rarity not in user_data['inventory']['woodcutting']:
-        user_data['inventory']['woodcutting'][rarity] = {}
-    
-    if log_type not in user_data['inventory']['woodcutting'][rarity]:
-        user_data['inventory']['woodcutting'][rarity][log_type] = 0
-    
-    user_data['inventory']['woodcutting'][rarity][log_type] += 1
+    apply_harvest(user_data, rarity, log_type, value, timestamp)
+    user_data['stats']['chopCreditTime'] = spend_credits(user_data['stats']['chopCreditTime'], get_wood_cooldown(), 1, timestamp)
     
     return {
         'success': True,
@@ -177,5 +204,67 @@ def attempt_chop(user_data: Dict) -> Dict:
         'rarity': rarity,
         'log_type': log_type,
         'value': value,
-        'is_timber_bite': is_timber_bite
+        'is_timber_bite': is_timber_bite,
+        'timestamp': timestamp,
+        'rng': rng.getstate(),
+        'credit': user_data['stats']['chopCreditTime']
+    }
+
+def apply_chops(user_data: Dict, items: List[Tuple[str, str, int]], value: int, timestamp: int):
+    """
+    Apply a batch of (rarity, log_type, count) harvests to a user's record in one merge
+    Shared by attempt_chop_batch and journal replay
+    """
+    stats = user_data['stats']
+    stats['totalChops'] += sum(count for _, _, count in items)
+    stats['lastChopTimestamp'] = timestamp
+    user_data['currency'] += value
+    
+    for rarity, log_type, count in items:
+        add_inventory_items(user_data, 'logs', rarity, log_type, count)
+
+def attempt_chop_batch(user_data: Dict, swings: int, now: int = None) -> Dict:
+    """
+    Spend up to swings banked credits in one go, rolled as one batch
+    Returns result dict with the aggregated harvests; now overrides the clock for replays
+    """
+    blocked = expedition_in_progress(user_data, 'woodcutting')
+    if blocked:
+        return blocked
+
+    stats = user_data['stats']
+    timestamp = int(time.time()) if now is None else now
+    cooldown = get_wood_cooldown()
+    banked = available_credits(stats['chopCreditTime'], cooldown, timestamp)
+    if banked == 0:
+        _, remaining = check_cooldown(stats['chopCreditTime'], timestamp)
+        return {
+            'success': False,
+            'on_cooldown': True,
+            'remaining_seconds': remaining
+        }
+    
+    swings = min(swings, banked)
+    rng = get_user_rng(user_data)
+    batch = roll_harvests(
+        user_data['axe']['tier'],
+        user_data['upgrades'].get('bladeSharpness', 0),
+        user_data['upgrades'].get('handleStrength', 0),
+        swings, rng
+    )
+    items = [(rarity, log_type, count) for (rarity, log_type), count in batch.counts.items()]
+    apply_chops(user_data, items, batch.value, timestamp)
+    stats['chopCreditTime'] = spend_credits(stats['chopCreditTime'], cooldown, swings, timestamp)
+    
+    return {
+        'success': True,
+        'on_cooldown': False,
+        'swings': swings,
+        'banked': banked - swings,
+        'items': items,
+        'bites': batch.bites,
+        'value': batch.value,
+        'timestamp': timestamp,
+        'rng': rng.getstate(),
+        'credit': stats['chopCreditTime']
     }
@@ -0,0 +1,3 @@
+"""
+Tests for the library modules that run without Discord
+"""
@@ -0,0 +1,45 @@
+"""
+Cooldown credit bucket math
+"""
+
+import pytest
+
+from src.lib import credits
+
+COOLDOWN = 60
+
+@pytest.fixture
+def cap(monkeypatch):
+    monkeypatch.setattr(credits, 'get_cast_credit_cap', lambda: 3)
+    return 3
+
+def test_credits_accrue_up_to_the_cap(cap):
+    assert credits.available_credits(0, COOLDOWN, 59) == 0
+    assert credits.available_credits(0, COOLDOWN, 60) == 1
+    assert credits.available_credits(0, COOLDOWN, 150) == 2
+    assert credits.available_credits(0, COOLDOWN, 10 ** 6) == cap
+
+def test_spending_moves_the_credit_time(cap):
+    # Two banked credits, one spent: one left, the next one still 30s away
+    credit_time = credits.spend_credits(0, COOLDOWN, 1, 150)
+    assert credits.available_credits(credit_time, COOLDOWN, 150) == 1
+    assert credits.available_credits(credit_time, COOLDOWN, 180) == 2
+
+def test_credits_beyond_the_cap_are_not_banked(cap):
+    now = 10 ** 6
+    credit_time = credits.spend_credits(0, COOLDOWN, cap, now)
+    assert credits.available_credits(credit_time, COOLDOWN, now) == 0
+    assert credits.available_credits(credit_time, COOLDOWN, now + COOLDOWN) == 1
+
+def test_cap_of_one_is_a_plain_cooldown(monkeypatch):
+    monkeypatch.setattr(credits, 'get_cast_credit_cap', lambda: 1)
+    credit_time = credits.spend_credits(0, COOLDOWN, 1, 1000)
+    assert credits.available_credits(credit_time, COOLDOWN, 1000 + COOLDOWN - 1) == 0
+    assert credits.available_credits(credit_time, COOLDOWN, 1000 + COOLDOWN) == 1
+
+def test_expedition_blocks_its_own_activity():
+    user_data = {'expedition': {'activity': 'fishing', 'ends': 5000}}
+    result = credits.expedition_in_progress(user_data, 'fishing')
+    assert result['on_expedition'] and not result['success'] and result['ends'] == 5000
+    assert credits.expedition_in_progress(user_data, 'woodcutting') is None
+    assert credits.expedition_in_progress({'expedition': None}, 'fishing') is None
@@ -0,0 +1,85 @@
+"""
+Journal crash recovery: snapshots plus the journal tail rebuild every user
+"""
+
+import os
+
+import pytest
+
+from src.lib import persistence
+from src.lib.journal import Journal, apply_event
+from src.lib.prices import get_item_price
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """JSON storage and journal under a temporary data directory"""
+    monkeypatch.setattr(persistence, 'LEGACY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(persistence, 'DATA_DIR', str(tmp_path / 'users'))
+    monkeypatch.setattr(persistence, 'JOURNAL_DIR', str(tmp_path / 'journal'))
+    monkeypatch.setattr(persistence, '_backend', persistence.JsonFileBackend())
+    monkeypatch.setattr(persistence, '_journal', None)
+    return tmp_path
+
+def _catch(seq, user_id, item='cod', ts=1000):
+    return {
+        'seq': seq, 'uid': user_id, 'kind': 'catch', 'rarity': 'Common', 'item': item,
+        'value': get_item_price('fish', item), 'ts': ts, 'credit': ts
+    }
+
+def _write_snapshot(user_id, user_data):
+    backend = persistence.get_backend()
+    assert not backend.write_many({user_id: backend.encode(user_id, user_data)})
+
+def test_recovery_replays_only_the_unsnapshotted_tail(storage):
+    snapshot = persistence._default_user_data(1, 'one')
+    apply_event(snapshot, _catch(1, 1))
+    apply_event(snapshot, _catch(2, 1, ts=2000))
+    _write_snapshot(1, snapshot)
+
+    # The process dies after the journal append, before the next snapshot
+    journal = Journal(persistence.JOURNAL_DIR)
+    journal.append([
+        _catch(1, 1),
+        _catch(2, 1, ts=2000),
+        _catch(3, 1, item='herring', ts=3000),
+        {'seq': 4, 'uid': 2, 'kind': 'meta', 'username': 'two'},
+        _catch(5, 2, ts=3500),
+    ])
+    segment = journal.segments()[-1]
+    journal.close()
+    with open(segment, 'ab') as f:
+        f.write(b'{"seq":6,"uid":2,"ki')
+
+    assert persistence.recover_journal() == 2
+
+    one, migrated = persistence._read_user_data(1)
+    assert not migrated
+    assert one['journalSeq'] == 3
+    assert one['stats']['totalCatches'] == 3
+    assert one['stats']['fishCreditTime'] == 3000
+    assert one['inventory']['Common'] == {'cod': 2, 'herring': 1}
+    assert one['inventoryValue'] == 2 * get_item_price('fish', 'cod') + get_item_price('fish', 'herring')
+
+    two, _ = persistence._read_user_data(2)
+    assert two['username'] == 'two'
+    assert two['journalSeq'] == 5
+    assert two['inventory']['Common'] == {'cod': 1}
+
+    # Folded segments are gone and sequence numbers keep increasing
+    assert Journal(persistence.JOURNAL_DIR).segments() == []
+    assert Journal(persistence.JOURNAL_DIR).next_seq() == 6
+
+def test_recovery_is_idempotent(storage):
+    journal = Journal(persistence.JOURNAL_DIR)
+    journal.append([{'seq': 1, 'uid': 7, 'kind': 'meta', 'username': 'seven'}, _catch(2, 7)])
+    journal.close()
+
+    assert persistence.recover_journal() == 1
+    first, _ = persistence._read_user_data(7)
+    assert persistence.recover_journal() == 0
+    second, _ = persistence._read_user_data(7)
+    assert first == second
+
+def test_no_journal_directory(storage):
+    assert not os.path.exists(persistence.JOURNAL_DIR)
+    assert persistence.recover_journal() == 0
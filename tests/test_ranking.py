@@ -0,0 +1,47 @@
+"""
+RankedSet rank/select against a sorted list
+"""
+
+import random
+
+import pytest
+
+from src.lib.ranking import RankedSet
+
+def test_rank_and_select_follow_sorted_order():
+    rng = random.Random(7)
+    keys = rng.sample(range(10000), 500)
+    ranked = RankedSet(keys)
+    expected = sorted(keys)
+
+    assert len(ranked) == len(expected)
+    assert list(ranked) == expected
+    for position, key in enumerate(expected):
+        assert ranked.rank(key) == position
+        assert ranked.select(position) == key
+
+def test_remove_keeps_positions_consistent():
+    rng = random.Random(11)
+    keys = list(range(300))
+    ranked = RankedSet(keys)
+    removed = set(rng.sample(keys, 120))
+    for key in removed:
+        assert ranked.discard(key)
+    assert not ranked.discard(next(iter(removed)))
+
+    expected = [key for key in keys if key not in removed]
+    assert len(ranked) == len(expected)
+    for position, key in enumerate(expected):
+        assert ranked.rank(key) == position
+        assert ranked.select(position) == key
+    for key in removed:
+        assert key not in ranked
+        assert ranked.rank(key) is None
+
+def test_slice_and_out_of_range():
+    ranked = RankedSet([(-score, user_id) for user_id, score in enumerate([5, 9, 1, 9, 3])])
+    assert ranked.slice(1, 2) == [(-9, 3), (-5, 0)]
+    assert ranked.slice(4, 10) == [(-1, 2)]
+    assert ranked.slice(5, 10) == []
+    with pytest.raises(IndexError):
+        ranked.select(5)
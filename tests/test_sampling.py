@@ -0,0 +1,46 @@
+"""
+Alias tables draw each outcome with its weight's probability
+"""
+
+import pytest
+
+from src.lib.sampling import AliasTable
+
+def _column_probabilities(table):
+    """Exact probability of each outcome from the table's columns"""
+    count = len(table)
+    probabilities = [0.0] * count
+    for column in range(count):
+        probabilities[column] += table._probability[column] / count
+        probabilities[table._alias[column]] += (1.0 - table._probability[column]) / count
+    return probabilities
+
+@pytest.mark.parametrize('weights', [
+    [1],
+    [1, 1, 1, 1],
+    [70, 20, 7, 2.5, 0.4, 0.1],
+    [0, 5, 0, 1],
+])
+def test_columns_match_the_weights(weights):
+    table = AliasTable(list(range(len(weights))), weights)
+    total = sum(weights)
+    for probability, weight in zip(_column_probabilities(table), weights):
+        assert probability == pytest.approx(weight / total, abs=1e-12)
+
+def test_zero_weight_is_never_drawn():
+    class Fixed:
+        def __init__(self, values):
+            self.values = iter(values)
+
+        def random(self):
+            return next(self.values)
+
+    table = AliasTable(['a', 'b', 'c'], [1, 0, 1])
+    steps = [i / 300 for i in range(300)]
+    assert 'b' not in [table.sample(Fixed([u])) for u in steps]
+
+def test_needs_a_positive_weight():
+    with pytest.raises(ValueError):
+        AliasTable(['a'], [0])
+    with pytest.raises(ValueError):
+        AliasTable([], [])
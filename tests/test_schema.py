@@ -0,0 +1,87 @@
+"""
+User record migrations from the oldest stored shape up to SCHEMA_VERSION
+"""
+
+import copy
+
+import pytest
+
+from src.lib.persistence import _default_user_data
+from src.lib.prices import get_item_price, get_prices_version
+from src.lib.rng import new_rng_state
+from src.lib.schema import MIGRATIONS, SCHEMA_VERSION, SchemaVersionError, migrate_user_data
+
+USER_ID = 123456789
+
+def _v0_record():
+    """A record as the first versions of the bot wrote it"""
+    return {
+        'id': str(USER_ID),
+        'username': 'angler',
+        'currency': 50,
+        'lastFishTimestamp': 1000,
+        'stats': {'totalCatches': 3, 'lastFishTimestamp': 400},
+        'inventory': {
+            'Common': {'cod': 2},
+            'woodcutting': {'Common': {'ash': 1, 'ashwood': 2}, 'Mythic': {'eternal': 1}}
+        }
+    }
+
+def test_every_version_has_a_migration():
+    assert len(MIGRATIONS) == SCHEMA_VERSION
+
+def test_v0_record_reaches_the_current_shape():
+    data = _v0_record()
+    assert migrate_user_data(data, USER_ID)
+
+    assert data['schemaVersion'] == SCHEMA_VERSION
+    assert set(data) == set(_default_user_data(USER_ID))
+    # _to_v1: integer id replaces the string one
+    assert 'id' not in data and data['user_id'] == USER_ID
+    # _to_v2: top-level timestamps move into stats, keeping the latest
+    assert 'lastFishTimestamp' not in data
+    assert data['stats']['lastFishTimestamp'] == 1000
+    assert data['upgrades']['hookSharpness'] == 0
+    assert data['inventory']['Mythic'] == {}
+    # _to_v4: a fresh random stream
+    assert data['rngState'] == new_rng_state(USER_ID)
+    # _to_v5: logs renamed to their catalog names and merged
+    assert data['inventory']['woodcutting']['Common'] == {'ashwood': 3}
+    assert data['inventory']['woodcutting']['Mythic'] == {'angelwood': 1}
+    # _to_v6: credit buckets start from the last action
+    assert data['stats']['fishCreditTime'] == 1000
+    assert data['stats']['chopCreditTime'] == 0
+    # _to_v7, _to_v9: no expedition running or waiting to be seen
+    assert data['expedition'] is None
+    assert data['lastExpedition'] is None
+    # _to_v3, _to_v8: valued under the current prices
+    expected_value = (
+        2 * get_item_price('fish', 'cod')
+        + 3 * get_item_price('logs', 'ashwood')
+        + get_item_price('logs', 'angelwood')
+    )
+    assert data['inventoryValue'] == expected_value
+    assert data['inventoryStats']['logs']['items'] == 4
+    assert data['pricesVersion'] == get_prices_version()
+
+def test_each_intermediate_version_upgrades():
+    for version in range(SCHEMA_VERSION):
+        data = _v0_record()
+        for migration in MIGRATIONS[:version]:
+            migration(data, USER_ID)
+        data['schemaVersion'] = version
+        assert migrate_user_data(data, USER_ID)
+        assert data['schemaVersion'] == SCHEMA_VERSION
+        assert set(data) == set(_default_user_data(USER_ID))
+
+def test_current_record_is_left_alone():
+    data = _default_user_data(USER_ID, 'angler')
+    before = copy.deepcopy(data)
+    assert not migrate_user_data(data, USER_ID)
+    assert data == before
+
+def test_newer_record_is_refused():
+    data = _default_user_data(USER_ID)
+    data['schemaVersion'] = SCHEMA_VERSION + 1
+    with pytest.raises(SchemaVersionError):
+        migrate_user_data(data, USER_ID)